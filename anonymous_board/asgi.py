@@ -12,14 +12,16 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from board.routing import websocket_urlpatterns
+from board.tiered_cache import InvalidationListenerMiddleware
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "anonymous_board.settings")
 
-application = ProtocolTypeRouter({
+# 워커마다 2단계 캐시 무효화 메시지를 받는 작업을 띄운다.
+application = InvalidationListenerMiddleware(ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
         URLRouter(
             websocket_urlpatterns
         )
     ),
-})
+}))
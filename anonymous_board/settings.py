@@ -42,6 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "board.metrics.PerformanceMiddleware",
+    "board.profiling.ProfilingMiddleware",
+    "board.querybudget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -127,15 +130,65 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 ASGI_APPLICATION = "anonymous_board.asgi.application"
 
 # Redis 설정 (실시간 업데이트용)
+# Redis가 느리거나 꺼져 있으면 프로세스 내 전달로 자동 전환 (board/channel_layers.py)
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "BACKEND": "board.channel_layers.ResilientChannelLayer",
         "CONFIG": {
             "hosts": [("127.0.0.1", 6379)],
+            "timeout": 0.5,  # Redis 호출 타임아웃 (초)
+            "failure_threshold": 3,  # 연속 실패가 이만큼이면 서킷 열림
+            "reset_timeout": 10,  # 서킷이 열린 뒤 Redis 재시도까지 (초)
         },
     },
 }
 
+# 캐시 설정 (방문자별 반응 상태 등)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "anonymous-board",
+    },
+}
+
+# 쓰기 API 요청 제한 (방문자/IP별 토큰 버킷, "횟수/s|m|h")
+RATE_LIMITS = {
+    "create_post": {"visitor": "5/m", "ip": "20/m"},
+    "create_comment": {"visitor": "20/m", "ip": "60/m"},
+    "delete_post": {"visitor": "10/m", "ip": "30/m"},
+    "reaction": {"visitor": "60/m", "ip": "240/m"},
+}
+# 쓰기 요청에서 가장 느린 쿼리의 지연(초)이 이 값을 넘으면 동시 처리 한도를 줄여 503으로 조기 거절
+RATE_LIMIT_DB_LATENCY_THRESHOLD = 0.25
+
+# 게시글 보관 (archive_posts 명령)
+ARCHIVE_DELETED_GRACE_DAYS = 30  # 삭제 후 이 기간이 지나면 보관
+ARCHIVE_POSTS_OLDER_THAN_DAYS = None  # 설정하면 이 기간보다 오래된 게시글도 보관
+
+# 개발 모드 쿼리 예산 검사 (QueryBudgetMiddleware)
+QUERY_BUDGET_RAISE = False  # True면 예산 초과 / N+1에서 로그 대신 예외
+QUERY_BUDGET_REPEAT_THRESHOLD = 5  # 같은 모양의 쿼리가 이만큼 반복되면 N+1로 판단
+
+# 샘플링 프로파일러 (X-Board-Profile 헤더 / 관리자 구간 프로파일링)
+PROFILE_DIR = BASE_DIR / "profiles"  # collapsed stack 파일 저장 위치
+PROFILE_MAX_FILES = 200  # 이보다 많으면 오래된 프로파일부터 지움
+PROFILE_SAMPLE_INTERVAL = 0.005  # 샘플 간격 (초)
+PROFILE_TOKEN_MAX_AGE = 3600  # 헤더 토큰 유효 기간 (초)
+
+# /metrics 접근 토큰 (설정하면 "Authorization: Bearer <토큰>" 필요)
+METRICS_TOKEN = None
+
+# 접속자 수 집계 (board/presence.py)
+PRESENCE_INTERVAL = 10  # 하트비트 / 접속자 수 전송 주기 (초)
+PRESENCE_REDIS_URL = None  # 설정하면 모든 워커가 Redis HyperLogLog로 함께 집계
+
+# 쓰기 후처리 작업 큐 (board/jobs.py)
+# 개발 서버는 작업 큐 워커 없이 커밋 직후 요청 안에서 바로 실행 (프로덕션은 serve --job-workers / run_jobs 필요)
+JOB_QUEUE_INLINE = True
+
+# 시간대별 활동 집계 (board/activity.py)
+ACTIVITY_FLUSH_INTERVAL = 10  # 프로세스에 모인 증가량을 작업 큐로 넘기는 주기 (초)
+
 # 정적 파일 설정
 STATICFILES_DIRS = [
     BASE_DIR / "static",
@@ -10,8 +10,8 @@ from .settings import *
 SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-j$$icw@pcx)vw3+$-wwi-f1veqz-d*u^a$@6fpwlfb1xkynloo')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-# Temporarily enable DEBUG to see error details
-DEBUG = True
+# DEBUG=False여야 템플릿이 해시된 정적 파일 URL을 사용한다. (오류 상세가 필요할 때만 DEBUG=True로 실행)
+DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 
 ALLOWED_HOSTS = ['*']  # Railway에서 사용할 도메인 허용
 
@@ -33,10 +33,20 @@ STATICFILES_DIRS = [
 ]
 
 # WhiteNoise configuration for static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# 빌드 시 minify → 해시 → gzip/brotli 사전 압축 (Django 5에서는 STORAGES로 지정)
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "board.storage.MinifiedCompressedManifestStaticFilesStorage",
+    },
+}
 
 # Ensure static files are served correctly
 MIDDLEWARE = [
+    'board.metrics.PerformanceMiddleware',
+    'board.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Must be after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -48,28 +58,60 @@ MIDDLEWARE = [
 ]
 
 # WhiteNoise settings
-WHITENOISE_USE_FINDERS = True
-WHITENOISE_AUTOREFRESH = True
+# 시작 시 STATIC_ROOT를 한 번만 읽어 메모리 인덱스로 서빙 (요청마다 파일 시스템을 검사하지 않음)
+# 해시가 붙은 파일은 WhiteNoise가 immutable + 1년 캐시로 응답한다.
+WHITENOISE_USE_FINDERS = False
+WHITENOISE_AUTOREFRESH = False
 
 # Redis 설정 (Railway에서 제공하는 Redis 사용)
 REDIS_URL = os.environ.get('REDIS_URL')
 if REDIS_URL:
+    # Redis 장애 시에는 서킷 브레이커가 워커 내 전달로 전환하고, 복구되면 그룹을 재등록
     CHANNEL_LAYERS = {
         "default": {
-            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "BACKEND": "board.channel_layers.ResilientChannelLayer",
             "CONFIG": {
                 "hosts": [REDIS_URL],
+                "timeout": 0.5,
+                "failure_threshold": 3,
+                "reset_timeout": 10,
             },
         },
     }
+    # 캐시도 같은 Redis를 사용 (워커 간 공유)
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+    # 요청 제한 버킷도 Redis에서 워커 간 공유
+    RATE_LIMIT_REDIS_URL = REDIS_URL
+    # 접속자 수 하트비트도 같은 Redis의 HyperLogLog에 모음
+    PRESENCE_REDIS_URL = REDIS_URL
 else:
-    # Redis가 없는 경우 InMemory 채널 레이어 사용
+    # Redis가 없으면 같은 서버의 워커끼리 Unix 소켓 허브로 채널 레이어 공유
     CHANNEL_LAYERS = {
         "default": {
-            "BACKEND": "channels.layers.InMemoryChannelLayer"
+            "BACKEND": "board.channel_layers.UnixSocketChannelLayer",
+            "CONFIG": {
+                "path": os.environ.get('CHANNEL_SOCKET_PATH'),
+            },
         },
     }
 
+# 작업은 큐에 쌓고 serve --job-workers(Procfile) 또는 run_jobs 워커가 처리
+JOB_QUEUE_INLINE = False
+
+# Railway 프록시 뒤에서 실제 클라이언트 IP로 요청 제한
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = True
+
+# /metrics는 토큰을 아는 수집기만 읽을 수 있게 제한 (토큰이 없으면 아무도 읽을 수 없음)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# 프로파일 파일은 영구 볼륨 등 지정한 경로에 저장
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles')
+
 # 보안 설정
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
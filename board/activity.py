@@ -0,0 +1,188 @@
+"""
+시간대별 활동 집계 (HourlyActivity)
+
+- 쓰기 경로(글 / 댓글 / 조회 / 반응)는 record()로 프로세스 메모리의 카운터만 올린다.
+- 백그라운드 스레드가 ACTIVITY_FLUSH_INTERVAL마다 모인 증가량을 작업 큐에 한 건으로 넘기고
+  (프로세스가 끝날 때도 atexit로 남은 증가량을 넘긴다),
+  작업 큐 워커가 여러 프로세스의 증가량을 합쳐 시간 행마다 UPDATE 1회로 반영한다.
+  (요청마다 같은 시간 행을 UPDATE하면 모든 쓰기가 한 행에서 경합한다.)
+- 게시글 / 댓글 수는 backfill_activity 명령으로 원본 테이블에서 다시 계산할 수 있다.
+  조회 / 반응은 시각이 남지 않으므로 집계 테이블이 유일한 기록이다.
+- 통계 API는 요청한 구간의 시간 행(pk 범위)만 읽는다.
+"""
+import atexit
+import logging
+import operator
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from functools import reduce
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, TruncDay, TruncHour
+from django.utils import timezone
+
+from .models import REACTION_TYPES, ArchivedComment, ArchivedPost, Comment, HourlyActivity, Post
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FIELDS = ('posts', 'comments', 'views', *[f'{reaction_type}s' for reaction_type in REACTION_TYPES])
+# "가장 활발한 시간"은 쓰기 활동(글 / 댓글 / 반응)으로 판단
+WRITE_FIELDS = tuple(field for field in ACTIVITY_FIELDS if field != 'views')
+
+
+def flush_interval():
+    return getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 10)
+
+
+def hour_start(value):
+    """UTC 정시"""
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+class ActivityBuffer:
+    """프로세스 하나의 (시간, 항목)별 증가량"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.flusher = None
+        self.pid = None
+
+    def add(self, field, count=1):
+        key = (hour_start(timezone.now()).isoformat(), field)
+        with self.lock:
+            self.counts[key] += count
+        self.ensure_flusher()
+
+    def take(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def ensure_flusher(self):
+        # fork된 워커는 부모의 스레드를 물려받지 않으므로 프로세스마다 새로 띄운다.
+        if self.flusher is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.flusher is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.flusher = threading.Thread(target=self.run_flusher, name='activity-flush', daemon=True)
+                self.flusher.start()
+
+    def run_flusher(self):
+        while True:
+            time.sleep(flush_interval())
+            self.flush()
+            # 이 스레드의 DB 연결은 다음 주기까지 쓰지 않으므로 닫는다.
+            connection.close()
+
+    def flush(self):
+        """모인 증가량을 작업 큐에 등록 (실패하면 다음 주기에 다시 시도)"""
+        from .jobs import submit_jobs
+
+        counts = self.take()
+        if not counts:
+            return
+        deltas = defaultdict(dict)
+        for (hour, field), count in counts.items():
+            deltas[hour][field] = count
+        try:
+            submit_jobs([('activity', {'deltas': deltas})])
+        except Exception:
+            logger.warning('활동 집계 기록 실패, 다음 주기에 재시도', exc_info=True)
+            with self.lock:
+                self.counts.update(counts)
+
+
+activity_buffer = ActivityBuffer()
+# runserver / 관리 명령 / 다른 ASGI 서버로 실행해도 종료 시 남은 증가량을 잃지 않도록
+# (os._exit로 끝나는 serve 워커는 server.flush_activity에서 직접 넘긴다)
+atexit.register(activity_buffer.flush)
+
+
+def record(field, count=1):
+    """활동 하나 기록 (트랜잭션 안이면 커밋된 뒤에 센다)"""
+    transaction.on_commit(lambda: activity_buffer.add(field, count))
+
+
+def add_to_hour(hour, fields):
+    """시간 행에 증가량 더하기 (없으면 생성)"""
+    rows = HourlyActivity.objects.filter(hour=hour)
+    increments = {field: F(field) + count for field, count in fields.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            HourlyActivity.objects.create(hour=hour, **fields)
+    except IntegrityError:
+        # 다른 워커가 먼저 행을 만든 경우
+        rows.update(**increments)
+
+
+def apply_deltas(payloads):
+    """작업 큐의 activity 작업들을 합쳐 시간 행마다 한 번씩 반영"""
+    totals = defaultdict(Counter)
+    for payload in payloads:
+        for hour, fields in payload['deltas'].items():
+            totals[hour].update(fields)
+    with transaction.atomic():
+        for hour, fields in sorted(totals.items()):
+            add_to_hour(datetime.fromisoformat(hour), fields)
+
+
+def backfill(start=None, end=None):
+    """게시글 / 댓글 수를 원본(보관 포함)에서 다시 계산 / 반환값: 갱신한 시간 행 수
+
+    진행 중인 시간은 아직 넘어오지 않은 증가량과 겹치므로 end 기본값은 현재 시간의 정시.
+    """
+    end = hour_start(end or timezone.now())
+    hours = defaultdict(Counter)
+    sources = ((Post, 'posts'), (ArchivedPost, 'posts'), (Comment, 'comments'), (ArchivedComment, 'comments'))
+    for model, field in sources:
+        rows = model.objects.filter(created_at__lt=end)
+        if start is not None:
+            rows = rows.filter(created_at__gte=hour_start(start))
+        rows = rows.annotate(bucket=TruncHour('created_at', tzinfo=dt_timezone.utc)).values('bucket').annotate(
+            total=Count('pk')
+        ).order_by()
+        for row in rows:
+            hours[row['bucket']][field] += row['total']
+
+    existing = HourlyActivity.objects.filter(hour__lt=end)
+    if start is not None:
+        existing = existing.filter(hour__gte=hour_start(start))
+    with transaction.atomic():
+        # 원본이 모두 지워진 시간대는 0으로
+        existing.exclude(hour__in=list(hours)).update(posts=0, comments=0)
+        HourlyActivity.objects.bulk_create(
+            [HourlyActivity(hour=hour, posts=fields['posts'], comments=fields['comments']) for hour, fields in hours.items()],
+            update_conflicts=True, unique_fields=['hour'], update_fields=['posts', 'comments'], batch_size=500,
+        )
+    return len(hours)
+
+
+def activity_stats(start, end, bucket='hour'):
+    """구간 통계: 버킷별 값 / 합계 / 가장 활발한 시간대 (쿼리 2회)"""
+    rows = HourlyActivity.objects.filter(hour__gte=hour_start(start), hour__lt=end)
+    if bucket == 'day':
+        series = rows.annotate(start=TruncDay('hour')).values('start').annotate(
+            **{field: Sum(field) for field in ACTIVITY_FIELDS}
+        ).order_by('start')
+    else:
+        series = rows.annotate(start=F('hour')).values('start', *ACTIVITY_FIELDS)
+    series = [{**row, 'start': timezone.localtime(row['start']).isoformat()} for row in series]
+
+    totals = {field: sum(row[field] for row in series) for field in ACTIVITY_FIELDS}
+
+    # 현지 시각의 시(0~23)별 쓰기 활동 합계
+    write_total = reduce(operator.add, (F(field) for field in WRITE_FIELDS))
+    by_hour = rows.annotate(hour_of_day=ExtractHour('hour')).values('hour_of_day').annotate(
+        total=Sum(write_total)
+    ).order_by('-total', 'hour_of_day')[:5]
+    top_hours = [{'hour': row['hour_of_day'], 'activity': row['total']} for row in by_hour if row['total']]
+    return {'series': series, 'totals': totals, 'top_hours': top_hours}
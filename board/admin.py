@@ -1,38 +1,156 @@
-from django.contrib import admin
-from .models import Post, Comment, PostReaction, CommentReaction
+import uuid
+
+from django.contrib import admin, messages
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from .lookups import invalidate_comments, invalidate_posts
+from .models import Post, Comment, Visitor
+from .pagination import EstimatedCountPaginator
+
+
+def parse_uuid(value):
+    try:
+        return uuid.UUID(value.strip())
+    except ValueError:
+        return None
+
+
+def prefix_range(field, term):
+    """인덱스 범위 스캔으로 처리되는 접두어 검색 조건"""
+    return Q(**{f'{field}__gte': term, f'{field}__lt': term + '\U0010ffff', f'{field}__startswith': term})
+
+
+class ScalableAdminMixin:
+    """큰 테이블용 목록 설정: 추정 개수, 목록 컬럼만 조회, 인덱스를 타는 검색"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    list_only = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if self.list_only and match and match.url_name.endswith('_changelist'):
+            queryset = queryset.only(*self.list_only)
+        return queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(self.search_condition(search_term)), False
+
+    def search_condition(self, term):
+        raise NotImplementedError
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author_nickname', 'created_at', 'view_count', 'likes_count', 'hearts_count')
-    list_filter = ('created_at', 'is_anonymous')
-    search_fields = ('title', 'content', 'author_nickname')
-    readonly_fields = ('id', 'created_at', 'updated_at', 'view_count')
+class PostAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('title', 'author_nickname', 'created_at', 'view_count', 'likes_count', 'hearts_count', 'is_deleted')
+    list_only = ('title', 'author_nickname', 'created_at', 'view_count', 'likes_count', 'hearts_count', 'is_deleted')
+    list_filter = ('created_at', 'is_deleted', 'is_anonymous')
+    # 실제 검색은 search_condition: ID 일치 / 제목 접두어 / 닉네임 일치
+    search_fields = ('title', 'author_nickname')
+    search_help_text = '게시글 ID, 제목 앞부분, 닉네임(정확히 일치)으로 검색'
+    readonly_fields = ('id', 'created_at', 'updated_at', 'view_count', 'reactions_link')
     ordering = ('-created_at',)
+    actions = ('soft_delete_posts', 'restore_posts')
+
+    def search_condition(self, term):
+        post_id = parse_uuid(term)
+        if post_id:
+            return Q(pk=post_id)
+        return prefix_range('title', term) | Q(author_nickname=term)
+
+    @admin.display(description='반응')
+    def reactions_link(self, obj):
+        url = reverse('board:reaction_rows', args=['post'])
+        return format_html('<a href="{}?target={}">반응 목록 보기</a>', url, obj.pk)
+
+    def get_actions(self, request):
+        # 기본 삭제 액션은 객체마다 삭제 확인 목록을 만들어 큰 선택에서 느리므로 소프트 삭제로 대체
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_posts([obj.pk])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_posts([obj.pk])
+
+    @admin.action(description='선택한 게시글 삭제 처리 (소프트 삭제)')
+    def soft_delete_posts(self, request, queryset):
+        post_ids = list(queryset.filter(is_deleted=False).values_list('pk', flat=True))
+        updated = Post.objects.filter(pk__in=post_ids).update(is_deleted=True, deleted_at=timezone.now())
+        invalidate_posts(post_ids)
+        self.message_user(request, f'게시글 {updated}개를 삭제 처리했습니다.', messages.SUCCESS)
+
+    @admin.action(description='선택한 게시글 복구')
+    def restore_posts(self, request, queryset):
+        post_ids = list(queryset.filter(is_deleted=True).values_list('pk', flat=True))
+        updated = Post.objects.filter(pk__in=post_ids).update(is_deleted=False, deleted_at=None)
+        invalidate_posts(post_ids)
+        self.message_user(request, f'게시글 {updated}개를 복구했습니다.', messages.SUCCESS)
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = ('post', 'author_nickname', 'created_at', 'likes_count', 'hearts_count')
+    list_select_related = ('post',)  # 행마다 게시글을 따로 조회하지 않도록 JOIN
+    list_only = ('content', 'author_nickname', 'created_at', 'likes_count', 'hearts_count', 'post__title')
     list_filter = ('created_at', 'is_anonymous')
-    search_fields = ('content', 'author_nickname')
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    # 실제 검색은 search_condition: 댓글/게시글 ID 일치 / 닉네임 일치
+    search_fields = ('author_nickname',)
+    search_help_text = '댓글 ID, 게시글 ID, 닉네임(정확히 일치)으로 검색'
+    readonly_fields = ('id', 'created_at', 'updated_at', 'reactions_link')
+    raw_id_fields = ('post',)
     ordering = ('-created_at',)
+    actions = ('delete_comments',)
 
+    def search_condition(self, term):
+        object_id = parse_uuid(term)
+        if object_id:
+            return Q(pk=object_id) | Q(post_id=object_id)
+        return Q(author_nickname=term)
+
+    @admin.display(description='반응')
+    def reactions_link(self, obj):
+        url = reverse('board:reaction_rows', args=['comment'])
+        return format_html('<a href="{}?target={}">반응 목록 보기</a>', url, obj.pk)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_comments([obj.pk])
+
+    @admin.action(description='선택한 댓글 바로 삭제 (일괄 DELETE)')
+    def delete_comments(self, request, queryset):
+        comment_ids = list(queryset.values_list('pk', flat=True))
+        deleted, per_model = Comment.objects.filter(pk__in=comment_ids).delete()
+        invalidate_comments(comment_ids)
+        self.message_user(request, f'댓글 {per_model.get(Comment._meta.label, 0)}개를 삭제했습니다.', messages.SUCCESS)
 
-@admin.register(PostReaction)
-class PostReactionAdmin(admin.ModelAdmin):
-    list_display = ('post', 'session_id', 'reaction_type', 'created_at')
-    list_filter = ('reaction_type', 'created_at')
-    search_fields = ('post__title', 'session_id')
-    readonly_fields = ('id', 'created_at')
-    ordering = ('-created_at',)
 
+# PostReaction / CommentReaction은 복합 기본키 모델이라 admin 등록이 불가능하다.
+# 대신 키셋 페이지네이션 목록(board:reaction_rows)으로 조회한다.
+@admin.register(Visitor)
+class VisitorAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ('id', 'session_key', 'created_at')
+    search_fields = ('session_key',)
+    search_help_text = '방문자 번호 또는 세션 키(정확히 일치)로 검색'
+    readonly_fields = ('id', 'session_key', 'created_at')
+    ordering = ('-id',)
 
-@admin.register(CommentReaction)
-class CommentReactionAdmin(admin.ModelAdmin):
-    list_display = ('comment', 'session_id', 'reaction_type', 'created_at')
-    list_filter = ('reaction_type', 'created_at')
-    search_fields = ('comment__content', 'session_id')
-    readonly_fields = ('id', 'created_at')
-    ordering = ('-created_at',)
\ No newline at end of file
+    def search_condition(self, term):
+        if term.isdigit():
+            return Q(pk=int(term))
+        return Q(session_key=term)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BoardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "board"
+
+    def ready(self):
+        from . import querybudget  # noqa: F401 (쿼리 예산 시스템 체크 등록)
+        from .metrics import install_template_timer
+
+        install_template_timer()
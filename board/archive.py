@@ -0,0 +1,112 @@
+"""
+게시글 보관 (hot/cold 분리)
+
+삭제 후 유예 기간이 지난 게시글과 (선택적으로) 아주 오래된 게시글을
+댓글과 함께 보관 테이블로 옮기고, 반응 행은 최종 카운트로 접는다.
+라이브 테이블(Post/Comment/반응)은 작게 유지된다.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .lookups import invalidate_comments, invalidate_posts
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, CommentReaction, Post, PostReaction,
+    ReactionSet,
+)
+
+
+def archive_candidates(grace_days, older_than_days=None):
+    """보관 대상 게시글 ID 쿼리셋"""
+    now = timezone.now()
+    candidates = Post.objects.filter(is_deleted=True, deleted_at__lt=now - timedelta(days=grace_days))
+    if older_than_days:
+        candidates = candidates | Post.objects.filter(created_at__lt=now - timedelta(days=older_than_days))
+    return candidates.order_by('id').values_list('id', flat=True)
+
+
+def final_counts(reaction_model, target_field, target_ids):
+    """반응 행을 대상별 최종 카운트로 접기 (GROUP BY 1회)"""
+    rows = (
+        reaction_model.objects.filter(**{f'{target_field}_id__in': target_ids})
+        .values(f'{target_field}_id')
+        .annotate(**ReactionSet.count_aggregates())
+    )
+    return {row[f'{target_field}_id']: ReactionSet.counts_from_totals(row) for row in rows}
+
+
+def archive_batch(post_ids):
+    """게시글 한 묶음을 보관 테이블로 이동 / 반환값: (게시글 수, 댓글 수)"""
+    with transaction.atomic():
+        posts = list(Post.objects.filter(pk__in=post_ids))
+        comments = list(Comment.objects.filter(post_id__in=post_ids))
+        post_counts = final_counts(PostReaction, 'post', post_ids)
+        comment_counts = final_counts(CommentReaction, 'comment', [comment.id for comment in comments])
+
+        archived_posts = []
+        for post in posts:
+            archived = ArchivedPost(
+                id=post.id,
+                title=post.title,
+                content=post.content,
+                content_html=post.content_html,
+                content_render_version=post.content_render_version,
+                author_nickname=post.author_nickname,
+                created_at=post.created_at,
+                view_count=post.view_count,
+                is_deleted=post.is_deleted,
+                deleted_at=post.deleted_at,
+                likes_count=post.likes_count,
+            )
+            for field, value in post_counts.get(post.id, ReactionSet.counts_from_totals({})).items():
+                setattr(archived, field, value)
+            archived_posts.append(archived)
+
+        archived_comments = []
+        for comment in comments:
+            archived = ArchivedComment(
+                id=comment.id,
+                post_id=comment.post_id,
+                content=comment.content,
+                content_html=comment.content_html,
+                content_render_version=comment.content_render_version,
+                author_nickname=comment.author_nickname,
+                created_at=comment.created_at,
+                likes_count=comment.likes_count,
+            )
+            for field, value in comment_counts.get(comment.id, ReactionSet.counts_from_totals({})).items():
+                setattr(archived, field, value)
+            archived_comments.append(archived)
+
+        ArchivedPost.objects.bulk_create(archived_posts)
+        ArchivedComment.objects.bulk_create(archived_comments)
+
+        # 반응 행은 최종 카운트로 접었으니 직접 지우고, 게시글 삭제가 댓글까지 정리한다.
+        CommentReaction.objects.filter(comment__post_id__in=post_ids).delete()
+        PostReaction.objects.filter(post_id__in=post_ids).delete()
+        Post.objects.filter(pk__in=post_ids).delete()
+
+    # 쓰기 API의 존재 확인 캐시에서도 제거
+    invalidate_posts(post_ids)
+    invalidate_comments([comment.id for comment in comments])
+    return len(archived_posts), len(archived_comments)
+
+
+def archive_posts(grace_days, older_than_days=None, batch_size=200, limit=None):
+    """보관 대상이 없어질 때까지 묶음 단위로 보관 / 반환값: (게시글 수, 댓글 수)"""
+    total_posts = total_comments = 0
+    while limit is None or total_posts < limit:
+        size = batch_size if limit is None else min(batch_size, limit - total_posts)
+        post_ids = list(archive_candidates(grace_days, older_than_days)[:size])
+        if not post_ids:
+            break
+        archived_posts, archived_comments = archive_batch(post_ids)
+        total_posts += archived_posts
+        total_comments += archived_comments
+    return total_posts, total_comments
+
+
+def get_archived_post(post_id):
+    """보관된 게시글 조회 (삭제되지 않은 것만, 느린 경로)"""
+    return ArchivedPost.objects.filter(pk=post_id, is_deleted=False).first()
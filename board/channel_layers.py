@@ -0,0 +1,647 @@
+"""
+채널 레이어 백엔드
+
+ResilientChannelLayer: 장애에 강한 Redis 채널 레이어
+    Redis 채널 레이어 앞에 타임아웃과 서킷 브레이커를 두고,
+    Redis가 느리거나 죽어 있으면 프로세스 안의 InMemory 레이어로 대신 전달한다.
+    (그동안은 같은 워커에 연결된 클라이언트끼리만 실시간 알림을 주고받는다.)
+    Redis가 돌아오면 이 워커의 그룹 멤버십을 다시 등록한다.
+
+    CHANNEL_LAYERS = {"default": {
+        "BACKEND": "board.channel_layers.ResilientChannelLayer",
+        "CONFIG": {"hosts": [REDIS_URL], "timeout": 0.5, "failure_threshold": 3, "reset_timeout": 10},
+    }}
+
+UnixSocketChannelLayer: Redis 없이 한 서버의 여러 워커 프로세스가 공유하는 채널 레이어
+    잠금 파일을 먼저 잡은 프로세스가 백그라운드 스레드에서 허브(Unix 소켓 서버)를 띄우고,
+    모든 워커가 그 소켓으로 send / receive / 그룹 요청을 보낸다.
+    허브 프로세스가 죽으면 다른 워커가 잠금을 넘겨받아 허브를 다시 띄우고 그룹을 재등록한다.
+    (그 사이 허브에 쌓여 있던 메시지는 사라진다.)
+    허브는 워커들의 접속자 하트비트도 모아 서버 전체 접속자 수를 센다 (board/presence.py).
+    capacity / expiry / group_expiry / channel_capacity는 channels_redis와 같은 의미다.
+    path를 주지 않으면 현재 사용자 전용(0700) 디렉터리에 소켓을 만든다.
+    ($XDG_RUNTIME_DIR 또는 임시 디렉터리의 anonymous_board-<uid>, 다른 사용자가 먼저 만들었으면 거부)
+
+    CHANNEL_LAYERS = {"default": {
+        "BACKEND": "board.channel_layers.UnixSocketChannelLayer",
+        "CONFIG": {"path": "/run/anonymous_board/channels.sock"},
+    }}
+"""
+import asyncio
+import fcntl
+import itertools
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict, deque
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer, InMemoryChannelLayer
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import CounterFamily, GaugeFamily, register
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """연속 실패가 임계값을 넘으면 열리고, reset_timeout 뒤 시험 호출로 닫힌다"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+
+    def allow(self):
+        """지금 Redis를 호출해도 되는지"""
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self.trial_started_at = now
+            return True
+        # 시험 호출이 타임아웃 없이 멈춘 경우를 대비해 다음 시험을 허용
+        if self.state == HALF_OPEN and now - self.trial_started_at >= self.reset_timeout:
+            self.trial_started_at = now
+            return True
+        return False
+
+    def record_success(self):
+        """반환값: 방금 다시 닫혔는지 (그룹 재등록 필요)"""
+        recovered = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        return recovered
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning('채널 레이어 서킷 열림: 프로세스 내 전달로 전환')
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class ResilientChannelLayer(BaseChannelLayer):
+    """Redis 채널 레이어 + 타임아웃 + 서킷 브레이커 + InMemory 대체 전달"""
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, timeout=0.5, failure_threshold=3, reset_timeout=10.0, expiry=60, capacity=100,
+                 channel_capacity=None, **redis_config):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        from channels_redis.core import RedisChannelLayer
+
+        self.timeout = timeout
+        self.primary = RedisChannelLayer(
+            expiry=expiry, capacity=capacity, channel_capacity=channel_capacity, **redis_config,
+        )
+        self.fallback = InMemoryChannelLayer(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # 이 워커에서 가입한 그룹 (Redis 복구 시 재등록용)
+        self.memberships = defaultdict(set)
+        self.stats = Counter()
+        LAYERS.append(self)
+
+    async def call_primary(self, operation, coroutine_factory):
+        """Redis 호출 (타임아웃 포함) / 반환값: (성공 여부, 결과)"""
+        if not self.breaker.allow():
+            self.stats['fallback'] += 1
+            return False, None
+        try:
+            result = await asyncio.wait_for(coroutine_factory(), self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats['failure'] += 1
+            self.stats['fallback'] += 1
+            logger.debug('채널 레이어 %s 실패', operation, exc_info=True)
+            self.breaker.record_failure()
+            return False, None
+        self.record_success()
+        return True, result
+
+    def record_success(self):
+        if self.breaker.record_success():
+            logger.info('채널 레이어 서킷 닫힘: 그룹 %d개 재등록', len(self.memberships))
+            asyncio.ensure_future(self.resubscribe())
+
+    async def resubscribe(self):
+        for group, channels in list(self.memberships.items()):
+            for channel in list(channels):
+                ok, _ = await self.call_primary('group_add', lambda: self.primary.group_add(group, channel))
+                if not ok:
+                    return
+        self.stats['resubscribe'] += 1
+
+    # 채널
+
+    async def new_channel(self, prefix='specific'):
+        # 이름 생성만 하고 Redis에는 접속하지 않는다.
+        return await self.primary.new_channel(prefix)
+
+    async def send(self, channel, message):
+        ok, _ = await self.call_primary('send', lambda: self.primary.send(channel, message))
+        if not ok:
+            await self.fallback.send(channel, message)
+
+    async def receive(self, channel):
+        """Redis와 프로세스 내 대체 채널 중 먼저 도착한 메시지 반환"""
+        fallback_task = asyncio.ensure_future(self.fallback.receive(channel))
+        try:
+            while True:
+                primary_task = None
+                if self.breaker.allow():
+                    primary_task = asyncio.ensure_future(self.primary.receive(channel))
+                tasks = {fallback_task} | ({primary_task} if primary_task else set())
+                # 서킷이 열려 있으면 reset_timeout마다 깨어나 Redis 복구를 확인
+                done, pending = await asyncio.wait(
+                    tasks, timeout=None if primary_task else self.breaker.reset_timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if primary_task in done:
+                    if primary_task.exception() is not None:
+                        self.stats['failure'] += 1
+                        self.breaker.record_failure()
+                        continue
+                    self.record_success()
+                    if fallback_task in done:
+                        # 둘 다 도착했으면 대체 채널 메시지는 되돌려 놓는다.
+                        await self.fallback.send(channel, fallback_task.result())
+                    else:
+                        fallback_task.cancel()
+                    return primary_task.result()
+                if primary_task is not None:
+                    primary_task.cancel()
+                if fallback_task in done:
+                    return fallback_task.result()
+        except BaseException:
+            fallback_task.cancel()
+            raise
+
+    # 그룹
+
+    async def group_add(self, group, channel):
+        self.memberships[group].add(channel)
+        await self.fallback.group_add(group, channel)
+        await self.call_primary('group_add', lambda: self.primary.group_add(group, channel))
+
+    async def group_discard(self, group, channel):
+        self.memberships[group].discard(channel)
+        if not self.memberships[group]:
+            del self.memberships[group]
+        await self.fallback.group_discard(group, channel)
+        await self.call_primary('group_discard', lambda: self.primary.group_discard(group, channel))
+
+    async def group_send(self, group, message):
+        ok, _ = await self.call_primary('group_send', lambda: self.primary.group_send(group, message))
+        if not ok:
+            await self.fallback.group_send(group, message)
+
+    async def flush(self):
+        await self.fallback.flush()
+        await self.call_primary('flush', self.primary.flush)
+
+    async def close_pools(self):
+        await self.primary.close_pools()
+
+
+# Unix 소켓 채널 레이어
+
+FRAME_HEADER_SIZE = 4
+CONNECT_RETRY_DELAYS = (0.05, 0.1, 0.2, 0.5, 1, 2)  # 초
+HUB_SWEEP_INTERVAL = 10  # 초
+
+
+def runtime_dir():
+    """현재 사용자만 접근할 수 있는 디렉터리 (같은 서버의 다른 사용자가 소켓을 가로채지 못하도록)"""
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if base:
+        path = os.path.join(base, 'anonymous_board')
+    else:
+        path = os.path.join(tempfile.gettempdir(), f'anonymous_board-{os.getuid()}')
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    # 미리 만들어 둔 심볼릭 링크 / 다른 사용자 소유 / 열린 권한의 디렉터리는 쓰지 않는다.
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise ImproperlyConfigured(
+            f'채널 소켓 디렉터리 {path}는 현재 사용자 소유의 0700 디렉터리여야 합니다. '
+            '(CHANNEL_LAYERS의 path로 다른 경로를 지정할 수 있음)'
+        )
+    return path
+
+
+def default_socket_path():
+    return os.path.join(runtime_dir(), 'channels.sock')
+
+
+def write_frame(writer, frame):
+    body = msgpack.packb(frame, use_bin_type=True)
+    writer.write(len(body).to_bytes(FRAME_HEADER_SIZE, 'big') + body)
+
+
+async def read_frame(reader):
+    """프레임 하나 읽기 (연결이 끊기면 asyncio.IncompleteReadError)"""
+    size = int.from_bytes(await reader.readexactly(FRAME_HEADER_SIZE), 'big')
+    return msgpack.unpackb(await reader.readexactly(size), raw=False)
+
+
+class ChannelHub:
+    """채널 큐와 그룹을 보관하는 허브 (허브 프로세스의 백그라운드 스레드 이벤트 루프에서 실행)"""
+
+    def __init__(self, path, lock_file, get_capacity, expiry, group_expiry):
+        self.path = path
+        self.lock_file = lock_file
+        self.get_capacity = get_capacity
+        self.expiry = expiry
+        self.group_expiry = group_expiry
+        self.channels = {}  # 채널 -> deque[(만료 시각, 메시지)]
+        self.waiters = defaultdict(deque)  # 채널 -> deque[(writer, 요청 id)]
+        self.groups = defaultdict(dict)  # 그룹 -> {채널: 만료 시각}
+        self.presence = {}  # (범위, 버킷) -> 방문자 집합
+        self.pid = os.getpid()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='channel-hub', daemon=True)
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(asyncio.start_unix_server(self.handle, path=self.path))
+        # 같은 사용자로 실행되는 워커만 접속
+        os.chmod(self.path, 0o600)
+        loop.create_task(self.sweep())
+        logger.info('채널 허브 시작: %s (pid %d)', self.path, self.pid)
+        self.ready.set()
+        loop.run_forever()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                frame = await read_frame(reader)
+                reply = self.dispatch(frame, writer)
+                if reply is not None:
+                    reply['id'] = frame['id']
+                    write_frame(writer, reply)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # 끊긴 워커의 대기 중인 receive는 버린다 (메시지는 다른 대기자나 큐로)
+            for channel, waiters in list(self.waiters.items()):
+                remaining = deque(waiter for waiter in waiters if waiter[0] is not writer)
+                if remaining:
+                    self.waiters[channel] = remaining
+                else:
+                    del self.waiters[channel]
+            writer.close()
+
+    def dispatch(self, frame, writer):
+        """요청 처리 / 반환값: 응답 프레임 (receive 대기나 requeue면 None)"""
+        op = frame['op']
+        if op == 'send':
+            return {'ok': self.deliver(frame['channel'], frame['message'])}
+        if op == 'requeue':
+            # 취소된 receive로 늦게 도착한 메시지를 큐 앞에 되돌림
+            if not self.hand_to_waiter(frame['channel'], frame['message']):
+                queue = self.channels.setdefault(frame['channel'], deque())
+                queue.appendleft((time.time() + self.expiry, frame['message']))
+            return None
+        if op == 'receive':
+            message = self.pop_message(frame['channel'])
+            if message is not None:
+                return {'message': message}
+            self.waiters[frame['channel']].append((writer, frame['id']))
+            return None
+        if op == 'cancel':
+            # 이미 메시지를 보냈다면 그 응답이 이 응답보다 먼저 도착한다.
+            waiters = self.waiters.get(frame['channel'])
+            if waiters and (writer, frame['id']) in waiters:
+                waiters.remove((writer, frame['id']))
+            return {'cancelled': True}
+        if op == 'group_add':
+            self.groups[frame['group']][frame['channel']] = time.time() + self.group_expiry
+            return {'ok': True}
+        if op == 'group_discard':
+            members = self.groups.get(frame['group'])
+            if members is not None:
+                members.pop(frame['channel'], None)
+                if not members:
+                    del self.groups[frame['group']]
+            return {'ok': True}
+        if op == 'group_send':
+            now = time.time()
+            members = self.groups.get(frame['group'], {})
+            for channel, expires in list(members.items()):
+                if expires < now:
+                    del members[channel]
+                elif not self.deliver(channel, frame['message']):
+                    # channels_redis처럼 가득 찬 채널은 건너뛴다.
+                    logger.info('채널 %s 가득 참: 그룹 %s 메시지 버림', channel, frame['group'])
+            return {'ok': True}
+        if op == 'presence':
+            return {'counts': self.exchange_presence(frame['bucket'], frame['members'], frame['scopes'])}
+        if op == 'flush':
+            self.channels.clear()
+            self.groups.clear()
+            self.presence.clear()
+            return {'ok': True}
+        return {'error': f'unknown op {op}'}
+
+    def exchange_presence(self, bucket, members_by_scope, scopes):
+        """하트비트 추가 후 범위별 접속자 수 (현재 + 직전 버킷의 합집합 크기)"""
+        for scope, members in members_by_scope.items():
+            self.presence.setdefault((scope, bucket), set()).update(members)
+        for key in [key for key in self.presence if key[1] < bucket - 1]:
+            del self.presence[key]
+        return {
+            scope: len(self.presence.get((scope, bucket), set()) | self.presence.get((scope, bucket - 1), set()))
+            for scope in scopes
+        }
+
+    def hand_to_waiter(self, channel, message):
+        """대기 중인 receive가 있으면 바로 전달"""
+        waiters = self.waiters.get(channel)
+        while waiters:
+            writer, request_id = waiters.popleft()
+            if not writer.is_closing():
+                if not waiters:
+                    del self.waiters[channel]
+                write_frame(writer, {'id': request_id, 'message': message})
+                return True
+        self.waiters.pop(channel, None)
+        return False
+
+    def deliver(self, channel, message):
+        """반환값: 전달 / 보관 성공 여부 (채널이 가득 차면 False)"""
+        if self.hand_to_waiter(channel, message):
+            return True
+        queue = self.channels.setdefault(channel, deque())
+        self.drop_expired(channel, queue)
+        if len(queue) >= self.get_capacity(channel):
+            return False
+        queue.append((time.time() + self.expiry, message))
+        return True
+
+    def pop_message(self, channel):
+        queue = self.channels.get(channel)
+        if queue is None:
+            return None
+        self.drop_expired(channel, queue)
+        message = queue.popleft()[1] if queue else None
+        if not queue:
+            del self.channels[channel]
+        return message
+
+    def drop_expired(self, channel, queue):
+        now = time.time()
+        expired = False
+        while queue and queue[0][0] < now:
+            queue.popleft()
+            expired = True
+        if expired:
+            # 메시지가 만료될 만큼 읽지 않는 채널은 죽은 것으로 보고 그룹에서 뺀다.
+            for members in self.groups.values():
+                members.pop(channel, None)
+
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(HUB_SWEEP_INTERVAL)
+            for channel, queue in list(self.channels.items()):
+                self.drop_expired(channel, queue)
+                if not queue:
+                    del self.channels[channel]
+            now = time.time()
+            for group, members in list(self.groups.items()):
+                for channel, expires in list(members.items()):
+                    if expires < now:
+                        del members[channel]
+                if not members:
+                    del self.groups[group]
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def start_hub_if_free(layer):
+    """허브 잠금이 비어 있으면 이 프로세스에서 허브를 띄움 / 반환값: 이 프로세스의 허브 (다른 프로세스가 허브면 None)
+
+    허브가 준비될 때까지 최대 5초 기다리므로 이벤트 루프에서는 executor로 호출한다.
+    """
+    global _hub
+    with _hub_lock:
+        if _hub is not None and _hub.pid == os.getpid() and _hub.thread.is_alive():
+            return _hub
+        lock_file = open(layer.path + '.lock', 'a+')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        # 잠금을 잡았으면 남아 있는 소켓 파일은 죽은 허브의 것
+        try:
+            os.unlink(layer.path)
+        except FileNotFoundError:
+            pass
+        # 잠금 파일은 프로세스가 끝날 때까지 열어 둔다 (닫히면 다른 워커가 허브를 넘겨받음).
+        _hub = ChannelHub(layer.path, lock_file, layer.get_capacity, layer.expiry, layer.group_expiry)
+        _hub.thread.start()
+        _hub.ready.wait(5)
+        return _hub
+
+
+class HubConnection:
+    """이벤트 루프 하나에서 허브로 가는 연결 (요청 id로 응답을 짝지음)"""
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.writer = None
+        self.pending = {}  # 요청 id -> Future
+        self.cancelled = {}  # 취소된 receive 요청 id -> 채널
+        self.request_ids = itertools.count(1)
+        self.connect_lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self.connect_lock:
+            if self.writer is not None and not self.writer.is_closing():
+                return
+            for delay in CONNECT_RETRY_DELAYS:
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self.layer.path)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    # 허브 준비를 기다리는 동안 이 워커의 다른 요청이 멈추지 않도록 스레드에서 실행
+                    await asyncio.get_running_loop().run_in_executor(None, start_hub_if_free, self.layer)
+                    await asyncio.sleep(delay)
+            else:
+                raise ConnectionError(f'채널 허브에 연결할 수 없음: {self.layer.path}')
+            self.writer = writer
+            asyncio.ensure_future(self.read_replies(reader, writer))
+        # 허브가 새로 떴을 수 있으므로 이 워커의 그룹 멤버십을 다시 등록
+        for group, channels in list(self.layer.memberships.items()):
+            for channel in list(channels):
+                await self.request({'op': 'group_add', 'group': group, 'channel': channel})
+
+    async def read_replies(self, reader, writer):
+        try:
+            while True:
+                reply = await read_frame(reader)
+                future = self.pending.pop(reply['id'], None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+                else:
+                    channel = self.cancelled.pop(reply['id'], None)
+                    if channel is not None and 'message' in reply:
+                        write_frame(writer, {'op': 'requeue', 'id': 0, 'channel': channel, 'message': reply['message']})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning('채널 허브 연결 끊김: %s', self.layer.path)
+        finally:
+            writer.close()
+            if self.writer is writer:
+                self.writer = None
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('채널 허브 연결 끊김'))
+            self.pending.clear()
+            self.cancelled.clear()
+
+    async def request(self, frame):
+        if self.writer is None or self.writer.is_closing():
+            await self.connect()
+        request_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        write_frame(self.writer, {**frame, 'id': request_id})
+        try:
+            return await future
+        except asyncio.CancelledError:
+            self.pending.pop(request_id, None)
+            if frame['op'] == 'receive' and self.writer is not None:
+                self.cancelled[request_id] = frame['channel']
+                write_frame(self.writer, {'op': 'cancel', 'id': request_id, 'channel': frame['channel']})
+            raise
+
+
+class UnixSocketChannelLayer(BaseChannelLayer):
+    """한 서버의 워커 프로세스끼리 Unix 소켓 허브로 메시지와 그룹을 공유"""
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, path=None, expiry=60, group_expiry=86400, capacity=100, channel_capacity=None):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.path = path or default_socket_path()
+        self.group_expiry = group_expiry
+        self.client_prefix = os.urandom(6).hex()
+        # 이 워커에서 가입한 그룹 (허브가 바뀌면 재등록)
+        self.memberships = defaultdict(set)
+        self.connections = weakref.WeakKeyDictionary()  # 이벤트 루프 -> HubConnection
+
+    def connection(self):
+        loop = asyncio.get_running_loop()
+        connection = self.connections.get(loop)
+        if connection is None:
+            connection = self.connections[loop] = HubConnection(self)
+        return connection
+
+    async def request(self, frame):
+        """허브 요청 (연결이 끊겼으면 다시 연결해 한 번 재시도)"""
+        try:
+            return await self.connection().request(frame)
+        except ConnectionError:
+            return await self.connection().request(frame)
+
+    async def new_channel(self, prefix='specific'):
+        return f'{prefix}.{self.client_prefix}!{os.urandom(8).hex()}'
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_channel_name(channel)
+        reply = await self.request({'op': 'send', 'channel': channel, 'message': message})
+        if not reply['ok']:
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        while True:
+            try:
+                reply = await self.connection().request({'op': 'receive', 'channel': channel})
+            except ConnectionError:
+                # 허브가 넘어가는 중이면 다시 연결해서 계속 기다린다.
+                await asyncio.sleep(CONNECT_RETRY_DELAYS[0])
+                continue
+            return reply['message']
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self.memberships[group].add(channel)
+        await self.request({'op': 'group_add', 'group': group, 'channel': channel})
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self.memberships[group].discard(channel)
+        if not self.memberships[group]:
+            del self.memberships[group]
+        await self.request({'op': 'group_discard', 'group': group, 'channel': channel})
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        self.require_valid_group_name(group)
+        await self.request({'op': 'group_send', 'group': group, 'message': message})
+
+    async def flush(self):
+        await self.request({'op': 'flush'})
+
+    async def presence(self, bucket, members_by_scope, scopes):
+        """접속자 하트비트를 허브에 보내고 범위별 접속자 수를 받음 (members_by_scope가 비면 조회만)"""
+        reply = await self.request({
+            'op': 'presence', 'bucket': bucket, 'scopes': list(scopes),
+            'members': {scope: list(members) for scope, members in members_by_scope.items()},
+        })
+        return reply['counts']
+
+    async def close(self):
+        connection = self.connections.pop(asyncio.get_running_loop(), None)
+        if connection is not None and connection.writer is not None:
+            connection.writer.close()
+
+
+LAYERS = []
+
+
+def breaker_states():
+    for index, layer in enumerate(LAYERS):
+        yield (str(index),), STATE_VALUES[layer.breaker.state]
+
+
+def layer_event_counts():
+    for index, layer in enumerate(LAYERS):
+        for event in ('failure', 'fallback', 'resubscribe'):
+            yield (str(index), event), layer.stats[event]
+
+
+register(GaugeFamily(
+    'board_channel_layer_circuit_state', '채널 레이어 서킷 상태 (0 닫힘, 1 열림, 2 시험 중)', ('layer',), breaker_states,
+))
+register(CounterFamily(
+    'board_channel_layer_events_total', '채널 레이어 실패 / 대체 전달 / 그룹 재등록 횟수', ('layer', 'event'),
+    layer_event_counts,
+))
@@ -1,28 +1,54 @@
 import json
+import uuid
+from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from . import presence
+from .metrics import timed_channel_layer
 from .models import Post, Comment
 
 
+# 새 글 / 새 댓글 알림을 받는 그룹 (board/jobs.py의 broadcast 작업도 여기로 보냄)
+BOARD_GROUP_NAME = 'board_board_updates'
+
+
+def parse_post_id(value):
+    """게시글 id 문자열 검증 (잘못되면 None)"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
 class BoardConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.room_name = 'board_updates'
-        self.room_group_name = f'board_{self.room_name}'
+        self.room_group_name = BOARD_GROUP_NAME
 
         # 그룹에 참가
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
+        async with timed_channel_layer('group_add'):
+            await self.channel_layer.group_add(
+                self.room_group_name,
+                self.channel_name
+            )
 
         await self.accept()
 
+        # 접속자 수 집계: 같은 세션의 여러 탭은 한 명으로 센다.
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        session = self.scope.get('session')
+        visitor = (session.session_key if session is not None else None) or self.channel_name
+        await presence.tracker.join(self, visitor, parse_post_id(query.get('post', [''])[0]))
+
     async def disconnect(self, close_code):
+        presence.tracker.leave(self)
+
         # 그룹에서 나가기
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        async with timed_channel_layer('group_discard'):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
 
     # 클라이언트에서 메시지 받기
     async def receive(self, text_data):
@@ -38,42 +64,48 @@ class BoardConsumer(AsyncWebsocketConsumer):
             await self.handle_new_comment(text_data_json)
         elif message_type == 'update_reaction':
             await self.handle_update_reaction(text_data_json)
+        elif message_type == 'watch':
+            # 보고 있는 게시글 변경 (post_id 없으면 목록 화면)
+            presence.tracker.watch(self, parse_post_id(text_data_json.get('post_id')))
 
     async def handle_new_post(self, data):
         # 새 게시글 그룹에 브로드캐스트
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'broadcast_update',
-                'update_type': 'new_post',
-                'message': '새로운 게시글이 작성되었습니다.',
-                'data': data
-            }
-        )
+        async with timed_channel_layer('group_send'):
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                {
+                    'type': 'broadcast_update',
+                    'update_type': 'new_post',
+                    'message': '새로운 게시글이 작성되었습니다.',
+                    'data': data
+                }
+            )
 
     async def handle_new_comment(self, data):
         # 새 댓글 그룹에 브로드캐스트
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'broadcast_update',
-                'update_type': 'new_comment',
-                'message': '새로운 댓글이 작성되었습니다.',
-                'data': data
-            }
-        )
+        async with timed_channel_layer('group_send'):
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                {
+                    'type': 'broadcast_update',
+                    'update_type': 'new_comment',
+                    'message': '새로운 댓글이 작성되었습니다.',
+                    'data': data
+                }
+            )
 
     async def handle_update_reaction(self, data):
         # 반응 업데이트 그룹에 브로드캐스트
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                'type': 'broadcast_update',
-                'update_type': 'reaction_update',
-                'message': '반응이 업데이트되었습니다.',
-                'data': data
-            }
-        )
+        async with timed_channel_layer('group_send'):
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                {
+                    'type': 'broadcast_update',
+                    'update_type': 'reaction_update',
+                    'message': '반응이 업데이트되었습니다.',
+                    'data': data
+                }
+            )
 
     # 그룹에서 메시지 받기
     async def broadcast_update(self, event):
@@ -83,3 +115,7 @@ class BoardConsumer(AsyncWebsocketConsumer):
             'message': event['message'],
             'data': event['data']
         }))
+
+    async def send_presence(self, payload):
+        # 접속자 수 (presence.tracker가 바뀐 경우에만 호출)
+        await self.send(text_data=json.dumps(payload))
@@ -0,0 +1,96 @@
+"""
+반응 카운트 재계산 (drift 보정)
+
+Post / Comment의 비정규화된 반응 카운트를 반응 테이블에서 다시 계산한다.
+대상 테이블을 기본키 순서로 잘라 읽으면서 묶음마다 GROUP BY 쿼리 1회로
+저장된 카운트와 실제 카운트를 함께 읽고, 어긋난 행만 bulk_update로 고친다.
+"""
+from collections import Counter
+
+from django.db.models import F, Sum
+
+from .models import REACTION_BITS, Comment, Post
+
+COUNT_FIELDS = {f'{reaction_type}s_count': bit for reaction_type, bit in REACTION_BITS.items()}
+RECONCILE_MODELS = {'post': Post, 'comment': Comment}
+
+
+class DriftReport:
+    """모델 하나의 카운트 drift 통계"""
+
+    def __init__(self, model):
+        self.model = model
+        self.scanned = 0
+        self.drifted = 0
+        self.fixed = 0
+        self.rows_by_field = Counter()
+        self.absolute_by_field = Counter()
+        self.net_by_field = Counter()
+        self.max_by_field = Counter()
+
+    def add(self, deltas):
+        self.scanned += 1
+        if not deltas:
+            return
+        self.drifted += 1
+        for field, delta in deltas.items():
+            self.rows_by_field[field] += 1
+            self.absolute_by_field[field] += abs(delta)
+            self.net_by_field[field] += delta
+            self.max_by_field[field] = max(self.max_by_field[field], abs(delta))
+
+
+def actual_count_annotations():
+    """대상별 실제 반응 합계 (비트 값으로 나누면 개수, 반응 테이블 LEFT JOIN + GROUP BY)"""
+    return {f'actual_{field}': Sum(F('reactions__reactions').bitand(bit)) for field, bit in COUNT_FIELDS.items()}
+
+
+def compare_chunk(model, after_pk, chunk_size):
+    """기본키 after_pk 다음부터 chunk_size개의 (pk, 필드별 차이) 목록 (쿼리 1회)"""
+    rows = model.objects.order_by('pk')
+    if after_pk is not None:
+        rows = rows.filter(pk__gt=after_pk)
+    rows = rows.values('pk', *COUNT_FIELDS).annotate(**actual_count_annotations())[:chunk_size]
+
+    result = []
+    for row in rows:
+        deltas = {}
+        for field, bit in COUNT_FIELDS.items():
+            delta = (row[f'actual_{field}'] or 0) // bit - row[field]
+            if delta:
+                deltas[field] = delta
+        result.append((row['pk'], deltas))
+    return result
+
+
+def apply_fixes(model, fixes):
+    """차이만큼 카운트를 더하는 bulk UPDATE 1회 (읽은 뒤 들어온 토글의 증감은 보존)"""
+    fields = sorted({field for pk, deltas in fixes for field in deltas})
+    objs = []
+    for pk, deltas in fixes:
+        obj = model(pk=pk)
+        for field in fields:
+            setattr(obj, field, F(field) + deltas[field] if field in deltas else F(field))
+        objs.append(obj)
+    model.objects.bulk_update(objs, fields)
+
+
+def reconcile_counters(model, chunk_size=1000, apply=True):
+    """모델 전체의 반응 카운트를 검사하고 (apply=True면) 보정 / 반환값: DriftReport"""
+    report = DriftReport(model)
+    after_pk = None
+    while True:
+        chunk = compare_chunk(model, after_pk, chunk_size)
+        if not chunk:
+            break
+        after_pk = chunk[-1][0]
+
+        fixes = []
+        for pk, deltas in chunk:
+            report.add(deltas)
+            if deltas:
+                fixes.append((pk, deltas))
+        if apply and fixes:
+            apply_fixes(model, fixes)
+            report.fixed += len(fixes)
+    return report
@@ -0,0 +1,55 @@
+"""
+시간 순서 UUID (UUIDv7, RFC 9562)
+
+앞 48비트가 밀리초 타임스탬프라 새 행이 기본키 / FK 인덱스의 끝에 쌓이고,
+id 순서가 곧 작성 순서가 된다. 같은 밀리초 안에서는 카운터로 단조 증가를 보장한다.
+"""
+import os
+import threading
+import time
+import uuid
+
+RANDOM_BITS = 74  # 버전(4비트) / 변형(2비트)을 뺀 타임스탬프 뒤 비트 수
+RANDOM_MASK = (1 << RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_timestamp = 0
+_last_random = 0
+
+
+def build_uuid7(timestamp_ms, random_bits):
+    """타임스탬프와 74비트 값으로 UUIDv7 조립"""
+    rand_a = random_bits >> 62  # 12비트
+    rand_b = random_bits & ((1 << 62) - 1)
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80 | 0x7 << 76 | rand_a << 64 | 0b10 << 62 | rand_b
+    return uuid.UUID(int=value)
+
+
+def uuid7(timestamp_ms=None):
+    """
+    UUIDv7 생성 (모델 기본키 default)
+    timestamp_ms를 주면 그 시각의 id를 만든다 (기존 행 재발급용, 단조성 보장 없음).
+    """
+    if timestamp_ms is not None:
+        return build_uuid7(timestamp_ms, int.from_bytes(os.urandom(10), 'big') & RANDOM_MASK)
+
+    global _last_timestamp, _last_random
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms <= _last_timestamp:
+            # 같은 밀리초(또는 시계 역행): 직전 값에서 증가
+            timestamp_ms = _last_timestamp
+            random_bits = _last_random + 1
+            if random_bits > RANDOM_MASK:
+                timestamp_ms += 1
+                random_bits = int.from_bytes(os.urandom(10), 'big') & (RANDOM_MASK >> 1)
+        else:
+            # 증가 여유를 남기도록 최상위 비트는 0으로 시작
+            random_bits = int.from_bytes(os.urandom(10), 'big') & (RANDOM_MASK >> 1)
+        _last_timestamp, _last_random = timestamp_ms, random_bits
+    return build_uuid7(timestamp_ms, random_bits)
+
+
+def uuid7_from_datetime(value):
+    """datetime 시각의 UUIDv7"""
+    return uuid7(int(value.timestamp() * 1000))
@@ -0,0 +1,336 @@
+"""
+쓰기 후처리 작업 큐 (DB 테이블, 외부 브로커 불필요)
+
+- 뷰는 enqueue()로 작업을 등록한다. 트랜잭션 커밋 뒤에 INSERT되므로 롤백된 쓰기의 작업은 남지 않는다.
+- run_jobs 명령(워커)이 실행할 작업을 묶음으로 점유하고, 같은 종류끼리 모아 핸들러를 한 번 호출한다.
+  (예: 같은 게시글의 인기 점수 증가 여러 건 → UPDATE 1회)
+- 점유는 locked_by / locked_until 조건부 UPDATE라 SKIP LOCKED 없이도 워커 여러 개가 안전하다.
+  워커가 죽으면 점유가 만료된 뒤 다른 워커가 다시 가져간다.
+- 실패한 묶음은 한 건씩 다시 실행해 그래도 실패한 작업만 지수 백오프로 재시도하고,
+  MAX_ATTEMPTS를 넘으면 failed_at을 채워 남겨 둔다. (잘못된 작업 하나가 묶음 전체를 실패시키지 않도록)
+  되돌릴 수 없는 핸들러(WebSocket 알림)는 어디까지 처리했는지 PartialBatchError로 알려 이미 보낸 작업은 다시 실행하지 않고,
+  한 건씩 다시 실행할 때는 성공한 작업을 다음 작업 전에 지운다.
+- 작업 큐 워커(run_jobs / serve --job-workers)가 없는 개발 서버는 JOB_QUEUE_INLINE = True로
+  커밋 직후 요청 안에서 바로 실행한다. (실패한 작업만 큐에 남김)
+- 종류별 대기 / 재시도 / 처리 중 / 실패 작업 수와 가장 오래 기다린 작업의 나이는 /metrics에 노출
+"""
+import logging
+import os
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from . import activity
+from .consumers import BOARD_GROUP_NAME
+from .metrics import GaugeFamily, register
+from .models import Job, Post
+from .ranking import hot_weight, invalidate_trending_posts
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 2  # 초, 시도마다 두 배
+RETRY_MAX_DELAY = 600  # 초
+LEASE_SECONDS = 60  # 점유 유지 시간 (이 안에 끝내지 못하면 다른 워커가 가져감)
+
+HANDLERS = {}
+
+
+class PartialBatchError(Exception):
+    """핸들러가 payload를 앞에서부터 처리하다 실패 (앞의 completed건은 이미 반영되어 다시 실행하면 안 됨)"""
+
+    def __init__(self, completed, error):
+        super().__init__(completed, error)
+        self.completed = completed
+        self.error = error
+
+
+def job_handler(kind):
+    """작업 종류의 핸들러 등록 (핸들러는 같은 종류 작업들의 payload 목록을 한 번에 받음)"""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(*jobs):
+    """(종류, payload) 작업들을 커밋 후 INSERT 1회로 등록"""
+    for kind, payload in jobs:
+        assert kind in HANDLERS, f'unknown job kind {kind}'
+    transaction.on_commit(lambda: submit_jobs_after_commit(jobs))
+
+
+def runs_inline():
+    return getattr(settings, 'JOB_QUEUE_INLINE', False)
+
+
+def submit_jobs(jobs):
+    """작업 등록 (JOB_QUEUE_INLINE이면 바로 실행하고 실패한 작업만 등록)"""
+    if runs_inline():
+        jobs = run_inline(jobs)
+    if jobs:
+        insert_jobs(jobs)
+
+
+def submit_jobs_after_commit(jobs):
+    """쓰기는 이미 커밋되었으므로 등록에 실패해도 요청은 실패시키지 않고 로그만 남김"""
+    try:
+        submit_jobs(jobs)
+    except Exception:
+        logger.error('작업 등록 실패: %s', ', '.join(kind for kind, payload in jobs), exc_info=True)
+
+
+def run_inline(jobs):
+    """작업 큐 워커 없이 종류별로 핸들러를 바로 호출 / 반환값: 큐에 남길 (실패한) 작업"""
+    by_kind = defaultdict(list)
+    for kind, payload in jobs:
+        by_kind[kind].append(payload)
+    remaining = []
+    for kind, payloads in by_kind.items():
+        try:
+            HANDLERS[kind](payloads)
+        except Exception as e:
+            completed = e.completed if isinstance(e, PartialBatchError) else 0
+            logger.warning('작업 즉시 실행 실패, 큐에 등록: %s %d건', kind, len(payloads) - completed, exc_info=True)
+            remaining.extend((kind, payload) for payload in payloads[completed:])
+    return remaining
+
+
+def insert_jobs(jobs):
+    if len(jobs) == 1:
+        # bulk_create는 한 건이어도 트랜잭션으로 감싸므로 단건은 create
+        kind, payload = jobs[0]
+        Job.objects.create(kind=kind, payload=payload)
+    else:
+        Job.objects.bulk_create([Job(kind=kind, payload=payload) for kind, payload in jobs])
+
+
+def retry_delay(attempts):
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY ** attempts)
+
+
+def due_jobs(now):
+    return Job.objects.filter(failed_at__isnull=True, run_after__lte=now).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+
+
+def claim_jobs(worker_id, limit):
+    """실행할 작업을 최대 limit개 점유 / 반환값: 점유한 Job 목록"""
+    now = timezone.now()
+    ids = list(due_jobs(now).order_by('run_after', 'id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    # 그 사이 다른 워커가 가져간 작업은 조건에서 빠진다.
+    due_jobs(now).filter(id__in=ids).update(
+        locked_by=worker_id, locked_until=now + timedelta(seconds=LEASE_SECONDS), attempts=F('attempts') + 1,
+    )
+    return list(Job.objects.filter(id__in=ids, locked_by=worker_id))
+
+
+def run_claimed(jobs):
+    """점유한 작업을 종류별로 처리 / 반환값: 종류별 (성공 수, 실패 수)"""
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job)
+
+    results = {}
+    for kind, batch in by_kind.items():
+        done = run_batch(kind, batch)
+        results[kind] = (done, len(batch) - done)
+    return results
+
+
+def complete(jobs):
+    if jobs:
+        Job.objects.filter(id__in=[job.id for job in jobs]).delete()
+
+
+def run_batch(kind, batch):
+    """같은 종류 작업들을 핸들러 한 번으로 실행하고 성공한 작업을 지움 / 반환값: 성공한 작업 수
+
+    묶음이 실패하면 (이미 반영된 작업을 빼고) 한 건씩 다시 실행해 실패한 작업만 재시도 대상으로 남긴다.
+    """
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        record_failure(batch, LookupError(f'unknown job kind {kind}'))
+        return 0
+    try:
+        handler([job.payload for job in batch])
+        complete(batch)
+        return len(batch)
+    except PartialBatchError as e:
+        logger.warning('작업 실패: %s %d건 중 %d건 처리', kind, len(batch), e.completed, exc_info=True)
+        done, failed, rest = batch[:e.completed], batch[e.completed], batch[e.completed + 1:]
+        # 이미 보낸 작업은 나머지를 실행하기 전에 지워 다시 보내지 않는다.
+        complete(done)
+        record_failure([failed], e.error)
+        done = len(done)
+    except Exception as e:
+        logger.warning('작업 실패: %s %d건', kind, len(batch), exc_info=True)
+        if len(batch) == 1:
+            record_failure(batch, e)
+            return 0
+        done, rest = 0, batch
+
+    for job in rest:
+        try:
+            handler([job.payload])
+        except Exception as e:
+            logger.warning('작업 실패: %s %s', kind, job.id, exc_info=True)
+            record_failure([job], e.error if isinstance(e, PartialBatchError) else e)
+        else:
+            # 다음 작업이 실패하거나 워커가 죽어도 이 작업은 다시 실행되지 않도록 바로 지운다.
+            complete([job])
+            done += 1
+    return done
+
+
+def record_failure(batch, error):
+    now = timezone.now()
+    for job in batch:
+        update = {'locked_by': None, 'locked_until': None, 'last_error': repr(error)[:2000]}
+        if job.attempts >= MAX_ATTEMPTS:
+            update['failed_at'] = now
+        else:
+            update['run_after'] = now + timedelta(seconds=retry_delay(job.attempts))
+        Job.objects.filter(id=job.id).update(**update)
+
+
+class JobWorker:
+    """run_jobs 명령의 폴링 루프"""
+
+    def __init__(self, batch_size=100, poll_interval=1.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.worker_id = f'{os.uname().nodename[:16]}:{os.getpid()}'
+        self.processed = Counter()
+        self.failed = Counter()
+        self.stopping = False
+
+    def run_once(self):
+        """한 묶음 처리 / 반환값: 처리한 작업 수"""
+        jobs = claim_jobs(self.worker_id, self.batch_size)
+        for kind, (succeeded, failed) in run_claimed(jobs).items():
+            self.processed[kind] += succeeded
+            self.failed[kind] += failed
+        return len(jobs)
+
+    def run(self, until_empty=False):
+        while not self.stopping:
+            if self.run_once():
+                continue
+            if until_empty:
+                return
+            time.sleep(self.poll_interval)
+
+
+# 핸들러
+
+@job_handler('hot_score')
+def apply_hot_score_bumps(payloads):
+    """게시글별 증가량을 합쳐 같은 증가량끼리 UPDATE 1회"""
+    totals = Counter()
+    for payload in payloads:
+        totals[payload['post_id']] += hot_weight(payload['event']) * payload.get('count', 1)
+    by_delta = defaultdict(list)
+    for post_id, delta in totals.items():
+        by_delta[delta].append(post_id)
+    with transaction.atomic():
+        for delta, post_ids in by_delta.items():
+            Post.objects.filter(pk__in=post_ids).update(hot_score=F('hot_score') + delta)
+
+
+@job_handler('activity')
+def apply_activity_rollups(payloads):
+    """여러 프로세스의 시간대별 증가량을 합쳐 시간 행마다 UPDATE 1회"""
+    activity.apply_deltas(payloads)
+
+
+@job_handler('invalidate_trending')
+def flush_trending_cache(payloads):
+    """묶음에 몇 건이 있든 인기글 캐시 무효화는 한 번"""
+    invalidate_trending_posts()
+
+
+@job_handler('broadcast')
+def broadcast_events(payloads):
+    """새 글 / 새 댓글 알림을 WebSocket 그룹에 전송 (댓글의 게시글 제목은 묶음당 쿼리 1회)
+
+    보낸 알림은 되돌릴 수 없으므로 중간에 실패하면 보낸 건수를 PartialBatchError로 알린다.
+    """
+    post_ids = {payload['data']['post_id'] for payload in payloads if payload['update_type'] == 'new_comment'}
+    titles = {str(pk): title for pk, title in Post.objects.filter(pk__in=post_ids).values_list('id', 'title')}
+    channel_layer = get_channel_layer()
+    sent = 0
+
+    async def send_all():
+        nonlocal sent
+        for payload in payloads:
+            data = payload['data']
+            if payload['update_type'] == 'new_comment':
+                data = {**data, 'post_title': titles.get(data['post_id'], '')}
+            await channel_layer.group_send(BOARD_GROUP_NAME, {
+                'type': 'broadcast_update',
+                'update_type': payload['update_type'],
+                'message': payload['message'],
+                'data': data,
+            })
+            sent += 1
+
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(send_all)()
+    except Exception as e:
+        raise PartialBatchError(sent, e) from e
+
+
+_depth_snapshot = (0.0, [])
+
+
+def queue_depths():
+    """종류별 작업 수 (쿼리 1회, /metrics 한 번 수집 동안은 재사용)"""
+    global _depth_snapshot
+    taken_at, rows = _depth_snapshot
+    if time.monotonic() - taken_at < 1:
+        return rows
+    now = timezone.now()
+    due = Q(failed_at__isnull=True, run_after__lte=now) & (Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+    rows = list(Job.objects.values('kind').annotate(
+        ready=Count('id', filter=due),
+        scheduled=Count('id', filter=Q(failed_at__isnull=True, run_after__gt=now)),
+        running=Count('id', filter=Q(failed_at__isnull=True, locked_until__gte=now)),
+        dead=Count('id', filter=Q(failed_at__isnull=False)),
+        oldest_ready=Min('created_at', filter=due),
+    ).order_by('kind'))
+    _depth_snapshot = (time.monotonic(), rows)
+    return rows
+
+
+def job_depth_metrics():
+    for row in queue_depths():
+        for state in ('ready', 'scheduled', 'running', 'dead'):
+            yield (row['kind'], state), row[state]
+
+
+def job_lag_metrics():
+    now = timezone.now()
+    for row in queue_depths():
+        lag = (now - row['oldest_ready']).total_seconds() if row['oldest_ready'] else 0
+        yield (row['kind'],), round(lag, 3)
+
+
+register(GaugeFamily(
+    'board_job_queue_depth', '작업 큐 종류 / 상태별 작업 수', ('kind', 'state'), job_depth_metrics,
+))
+register(GaugeFamily(
+    'board_job_queue_lag_seconds', '가장 오래 기다린 실행 가능 작업의 대기 시간', ('kind',), job_lag_metrics,
+))
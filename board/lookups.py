@@ -0,0 +1,55 @@
+"""
+쓰기 API용 게시글/댓글 존재 확인
+
+쓰기 요청은 대상이 있는지만 알면 id로 바로 INSERT/UPDATE할 수 있으므로
+전체 행 대신 작은 메타데이터만 2단계 캐시에 보관한다.
+삭제/보관처럼 메타데이터가 바뀌는 쓰기는 invalidate_*로 모든 워커에서 지운다.
+없는 id는 캐시하지 않는다 (방금 만든 글이 "없음"으로 남지 않도록).
+"""
+from .models import Comment, Post
+from .tiered_cache import MISSING, TieredCache
+
+post_meta_cache = TieredCache('post_meta', l1_max_entries=10000, l1_ttl=30, l2_ttl=3600)
+comment_meta_cache = TieredCache('comment_meta', l1_max_entries=10000, l1_ttl=30, l2_ttl=3600)
+
+
+def cached_meta(tiered, object_id, load):
+    key = str(object_id)
+    meta = tiered.get(key, MISSING)
+    if meta is MISSING:
+        meta = load()
+        if meta is not None:
+            tiered.set(key, meta)
+    return meta
+
+
+def get_post_meta(post_id):
+    """게시글 메타데이터 {'is_deleted': bool} (없으면 None)"""
+    return cached_meta(
+        post_meta_cache, post_id,
+        lambda: Post.objects.filter(pk=post_id).values('is_deleted').first(),
+    )
+
+
+def get_live_post_meta(post_id):
+    """삭제되지 않은 게시글의 메타데이터 (없거나 삭제되었으면 None)"""
+    meta = get_post_meta(post_id)
+    return None if meta is None or meta['is_deleted'] else meta
+
+
+def get_comment_meta(comment_id):
+    """댓글 메타데이터 {'post_id': UUID} (없으면 None)"""
+    return cached_meta(
+        comment_meta_cache, comment_id,
+        lambda: Comment.objects.filter(pk=comment_id).values('post_id').first(),
+    )
+
+
+def invalidate_posts(post_ids):
+    if post_ids:
+        post_meta_cache.delete(*[str(post_id) for post_id in post_ids])
+
+
+def invalidate_comments(comment_ids):
+    if comment_ids:
+        comment_meta_cache.delete(*[str(comment_id) for comment_id in comment_ids])
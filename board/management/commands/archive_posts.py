@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from board.archive import archive_candidates, archive_posts
+
+
+class Command(BaseCommand):
+    help = '삭제 후 유예 기간이 지난 게시글(및 오래된 게시글)을 보관 테이블로 옮깁니다. (주기적으로 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-days', type=int, default=getattr(settings, 'ARCHIVE_DELETED_GRACE_DAYS', 30),
+            help='삭제된 게시글을 보관하기 전 유예 기간 (일)',
+        )
+        parser.add_argument(
+            '--older-than-days', type=int, default=getattr(settings, 'ARCHIVE_POSTS_OLDER_THAN_DAYS', None),
+            help='이 기간보다 오래된 게시글도 보관 (일, 기본값: 보관하지 않음)',
+        )
+        parser.add_argument('--batch-size', type=int, default=200, help='한 트랜잭션에서 옮길 게시글 수')
+        parser.add_argument('--limit', type=int, default=None, help='이번 실행에서 옮길 최대 게시글 수')
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archive_candidates(options['grace_days'], options['older_than_days']).count()
+            self.stdout.write(f'보관 대상 게시글: {count}개')
+            return
+
+        posts, comments = archive_posts(
+            options['grace_days'],
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'게시글 {posts}개, 댓글 {comments}개를 보관했습니다.'))
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from board.activity import backfill
+
+
+class Command(BaseCommand):
+    help = '시간대별 활동 집계의 게시글/댓글 수를 원본 테이블(보관 포함)에서 다시 계산합니다. (조회/반응 수는 유지)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='최근 N일만 다시 계산 (기본: 전체 기간)')
+        parser.add_argument('--since', help='이 시각(ISO 8601)부터 다시 계산')
+
+    def handle(self, *args, **options):
+        start = None
+        if options['since']:
+            start = parse_datetime(options['since'])
+            if start is None:
+                raise CommandError('--since는 ISO 8601 시각이어야 합니다.')
+            if timezone.is_naive(start):
+                start = timezone.make_aware(start)
+        elif options['days'] is not None:
+            start = timezone.now() - timedelta(days=options['days'])
+
+        hours = backfill(start=start)
+        self.stdout.write(self.style.SUCCESS(f'시간대 {hours}개의 게시글/댓글 수를 다시 계산했습니다.'))
@@ -0,0 +1,41 @@
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+FINGERPRINT_FILE = '.source-fingerprint'
+
+
+def source_fingerprint():
+    """정적 파일 원본 전체(경로 + 내용)의 해시"""
+    digest = hashlib.sha256()
+    entries = []
+    for finder in get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            entries.append((path, storage))
+    for path, storage in sorted(entries, key=lambda entry: entry[0]):
+        digest.update(path.encode('utf-8'))
+        with storage.open(path) as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = '정적 파일 원본이 바뀌었을 때만 collectstatic을 실행합니다. (배포 시작 시 사용)'
+
+    def handle(self, *args, **options):
+        static_root = Path(settings.STATIC_ROOT)
+        fingerprint_path = static_root / FINGERPRINT_FILE
+        manifest_path = static_root / 'staticfiles.json'
+
+        fingerprint = source_fingerprint()
+        if manifest_path.exists() and fingerprint_path.exists() and fingerprint_path.read_text() == fingerprint:
+            self.stdout.write('정적 파일이 바뀌지 않아 collectstatic을 건너뜁니다.')
+            return
+
+        call_command('collectstatic', interactive=False, verbosity=options['verbosity'])
+        fingerprint_path.write_text(fingerprint)
+        self.stdout.write(self.style.SUCCESS('정적 파일을 수집했습니다.'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from board.ranking import decay_hot_scores, half_life_hours, rebuild_hot_scores
+
+
+class Command(BaseCommand):
+    help = '인기글 점수를 시간에 따라 감쇠시킵니다. (주기적으로 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=float, default=1.0,
+            help='마지막 실행 이후 경과 시간 (실행 주기와 맞출 것, 기본 1시간)',
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='감쇠 대신 현재 카운트와 작성 시각으로 전체 점수를 다시 계산',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuilt = rebuild_hot_scores()
+            self.stdout.write(self.style.SUCCESS(f'{rebuilt}개 게시글의 인기 점수를 다시 계산했습니다.'))
+            return
+
+        decayed = decay_hot_scores(options['hours'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{decayed}개 게시글의 인기 점수를 {options["hours"]}시간만큼 감쇠했습니다. '
+            f'(반감기 {half_life_hours()}시간)'
+        ))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from board import profiling
+from board.tiered_cache import l2_is_local
+
+
+class Command(BaseCommand):
+    help = '샘플링 프로파일을 조회/요약하고, 프로파일링 헤더 토큰이나 구간 프로파일링을 관리합니다.'
+
+    def add_arguments(self, parser):
+        subcommands = parser.add_subparsers(dest='action', required=True)
+
+        list_parser = subcommands.add_parser('list', help='저장된 프로파일 목록')
+        list_parser.add_argument('--limit', type=int, default=20, help='출력할 최대 개수')
+
+        show_parser = subcommands.add_parser('show', help='프로파일 요약 (self / inclusive 상위 프레임)')
+        show_parser.add_argument('name', help='프로파일 파일 이름 (list 출력 참고, "latest"는 가장 최근 파일)')
+        show_parser.add_argument('--top', type=int, default=15, help='출력할 프레임 수')
+
+        subcommands.add_parser('token', help=f'{profiling.PROFILE_HEADER} 헤더 값 생성')
+
+        start_parser = subcommands.add_parser('start', help='모든 워커의 구간 프로파일링 시작 (Redis 캐시가 없으면 같은 서버의 워커만)')
+        start_parser.add_argument('--seconds', type=int, default=30, help='프로파일링 기간 (초)')
+
+        subcommands.add_parser('stop', help='구간 프로파일링 종료')
+
+    def handle(self, *args, **options):
+        getattr(self, f"handle_{options['action']}")(options)
+
+    def handle_list(self, options):
+        paths = profiling.list_profiles(limit=options['limit'])
+        if not paths:
+            self.stdout.write(f'{profiling.profile_dir()}에 저장된 프로파일이 없습니다.')
+            return
+        for path in paths:
+            samples = sum(profiling.read_profile(path).values())
+            self.stdout.write(f'{path.name}  (샘플 {samples}개)')
+
+    def handle_show(self, options):
+        paths = profiling.list_profiles()
+        if options['name'] == 'latest':
+            path = paths[0] if paths else None
+        else:
+            path = next((p for p in paths if p.name == options['name']), None)
+        if path is None:
+            raise CommandError(f"프로파일을 찾을 수 없습니다: {options['name']}")
+
+        total, self_frames, inclusive_frames = profiling.summarize(profiling.read_profile(path), options['top'])
+        self.stdout.write(f'{path}\n전체 샘플: {total}개\n')
+        for heading, frames in (('self (직접 실행 중)', self_frames), ('inclusive (호출 스택 포함)', inclusive_frames)):
+            self.stdout.write(heading)
+            for name, count in frames:
+                self.stdout.write(f'  {count / total:6.1%}  {count:6d}  {name}')
+            self.stdout.write('')
+
+    def handle_token(self, options):
+        self.stdout.write(profiling.make_token())
+
+    def handle_start(self, options):
+        profiling.start_window(options['seconds'])
+        if l2_is_local():
+            # 플래그 파일은 PROFILE_DIR을 함께 쓰는 같은 서버의 워커만 본다.
+            self.stdout.write(f'플래그 파일: {profiling.window_flag_path()}')
+        self.stdout.write(self.style.SUCCESS('구간 프로파일링을 시작했습니다. 각 워커는 다음 요청부터 샘플링합니다.'))
+
+    def handle_stop(self, options):
+        profiling.stop_window()
+        self.stdout.write(self.style.SUCCESS('구간 프로파일링을 종료했습니다.'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from board.counters import COUNT_FIELDS, RECONCILE_MODELS, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = '게시글/댓글의 반응 카운트를 반응 테이블에서 다시 계산해 어긋난 값을 보정합니다. (야간 실행 권장)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', choices=[*RECONCILE_MODELS, 'all'], default='all',
+            help='검사할 대상 (기본: 게시글과 댓글 모두)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='GROUP BY 한 번에 검사할 행 수')
+        parser.add_argument('--dry-run', action='store_true', help='보정하지 않고 drift 통계만 출력')
+
+    def handle(self, *args, **options):
+        names = list(RECONCILE_MODELS) if options['model'] == 'all' else [options['model']]
+        for name in names:
+            report = reconcile_counters(
+                RECONCILE_MODELS[name], chunk_size=options['chunk_size'], apply=not options['dry_run'],
+            )
+            self.write_report(report)
+
+    def write_report(self, report):
+        verbose_name = report.model._meta.verbose_name
+        self.stdout.write(f'{verbose_name}: {report.scanned}개 검사, {report.drifted}개 불일치, {report.fixed}개 보정')
+        for field in COUNT_FIELDS:
+            if report.rows_by_field[field]:
+                self.stdout.write(
+                    f'  {field}: {report.rows_by_field[field]}행, '
+                    f'차이 합계 {report.absolute_by_field[field]} (순 {report.net_by_field[field]:+d}), '
+                    f'최대 {report.max_by_field[field]}'
+                )
+        if report.drifted and report.fixed:
+            self.stdout.write(self.style.SUCCESS(f'{verbose_name} 카운트를 보정했습니다.'))
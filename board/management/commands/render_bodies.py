@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from board.models import ArchivedComment, ArchivedPost, Comment, Post
+from board.rendering import RENDERER_VERSION
+
+
+class Command(BaseCommand):
+    help = '게시글/댓글 본문 HTML을 현재 렌더러 버전으로 다시 렌더링합니다. (배포 후 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='버전과 관계없이 모든 행을 다시 렌더링')
+        parser.add_argument('--batch-size', type=int, default=500, help='한 번에 갱신할 행 수')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in (Post, Comment, ArchivedPost, ArchivedComment):
+            rows = model.objects.only('pk', 'content')
+            if not options['all']:
+                rows = rows.filter(~Q(content_render_version=RENDERER_VERSION))
+
+            rendered = 0
+            batch = []
+            for obj in rows.iterator(chunk_size=batch_size):
+                obj.render_content()
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    rendered += model.objects.bulk_update(batch, ['content_html', 'content_render_version'])
+                    batch = []
+            if batch:
+                rendered += model.objects.bulk_update(batch, ['content_html', 'content_render_version'])
+
+            self.stdout.write(f'{model._meta.verbose_name}: {rendered}개 렌더링')
+
+        self.stdout.write(self.style.SUCCESS(f'렌더링을 마쳤습니다. (렌더러 버전 {RENDERER_VERSION})'))
@@ -0,0 +1,27 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from board.jobs import JobWorker
+
+
+class Command(BaseCommand):
+    help = '쓰기 후처리 작업 큐를 처리합니다. (serve --job-workers로 함께 띄우거나 별도 프로세스로 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='한 번에 점유할 작업 수')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='큐가 비었을 때 다시 확인할 간격 (초)')
+        parser.add_argument('--once', action='store_true', help='큐가 빌 때까지만 처리하고 종료')
+
+    def handle(self, *args, **options):
+        worker = JobWorker(batch_size=options['batch_size'], poll_interval=options['poll_interval'])
+
+        # 처리 중인 묶음은 끝내고 종료
+        def stop(signum, frame):
+            worker.stopping = True
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        worker.run(until_empty=options['once'])
+        for kind in sorted(set(worker.processed) | set(worker.failed)):
+            self.stdout.write(f'{kind}: {worker.processed[kind]}건 처리, {worker.failed[kind]}건 실패')
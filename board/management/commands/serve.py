@@ -0,0 +1,59 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from board import presence
+from board.server import PreforkServer
+
+
+class Command(BaseCommand):
+    help = '프로덕션 ASGI 서버를 실행합니다. 워커를 미리 fork해 한 포트를 공유하고, SIGTERM에 graceful 종료합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bind', default=f"0.0.0.0:{os.environ.get('PORT', '8000')}",
+            help='host:port (기본: 0.0.0.0:$PORT)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1)),
+            help='워커 프로세스 수 (기본: $WEB_CONCURRENCY 또는 CPU 수)',
+        )
+        parser.add_argument('--max-requests', type=int, default=0, help='이만큼 처리한 워커를 재시작 (0이면 무제한)')
+        parser.add_argument(
+            '--max-requests-jitter', type=int, default=0, help='워커마다 max-requests에 더할 0~N 사이 난수',
+        )
+        parser.add_argument('--graceful-timeout', type=int, default=30, help='종료 시 처리 중인 요청을 기다릴 시간 (초)')
+        parser.add_argument('--no-warmup', action='store_true', help='워커 워밍업 생략')
+        parser.add_argument(
+            '--job-workers', type=int, default=0, help='함께 띄울 작업 큐 워커 수 (run_jobs를 따로 실행하지 않을 때)',
+        )
+        parser.add_argument('--access-log', action='store_true', help='요청마다 접근 로그 출력')
+
+    def handle(self, *args, **options):
+        host, _, port = options['bind'].rpartition(':')
+        if not host or not port.isdigit():
+            raise CommandError('--bind는 host:port 형식이어야 합니다.')
+        if options['workers'] < 1:
+            raise CommandError('--workers는 1 이상이어야 합니다.')
+        if options['workers'] > 1 and not presence.is_shared():
+            self.stderr.write(self.style.WARNING(
+                'PRESENCE_REDIS_URL(REDIS_URL)도 Unix 소켓 채널 레이어도 없어 접속자 수를 워커마다 따로 셉니다. '
+                '워커가 여럿이면 각 워커가 자기 연결만 센 숫자를 보냅니다.'
+            ))
+
+        # fork 전에 앱을 불러와 워커들이 메모리를 공유
+        from anonymous_board.asgi import application
+
+        PreforkServer(
+            application,
+            host=host.strip('[]'),
+            port=int(port),
+            workers=options['workers'],
+            max_requests=options['max_requests'],
+            max_requests_jitter=options['max_requests_jitter'],
+            graceful_timeout=options['graceful_timeout'],
+            warmup=not options['no_warmup'],
+            access_log=options['access_log'],
+            job_workers=options['job_workers'],
+            log=self.stdout.write,
+        ).run()
@@ -0,0 +1,230 @@
+"""
+요청 성능 계측
+
+뷰 이름별로 쿼리 수, DB 시간, 템플릿 렌더링 시간, 전체 지연을 기록해
+Server-Timing 헤더로 내보내고, 히스토그램으로 모아 /metrics(Prometheus 형식)에서 노출한다.
+값은 프로세스(워커)별로 집계된다.
+스트리밍 응답은 본문에서 실행된 쿼리와 렌더링까지 마친 뒤 히스토그램에 기록한다.
+(Server-Timing 헤더는 본문보다 먼저 나가므로 본문 전까지의 값)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection
+
+from .streaming import is_generated_stream, wrap_streaming_content
+
+# 초 단위 지연 버킷
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 요청당 쿼리 수 버킷
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """라벨별 누적 히스토그램 (Prometheus histogram과 같은 의미)"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self.series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            label_text = ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = f'{label_text},' if label_text else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+class CounterFamily:
+    """다른 모듈이 세는 누적 카운터 (collector가 [(라벨 튜플, 값)]을 반환)"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name, help_text, label_names, collector):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.collector = collector
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.metric_type}']
+        for labels, value in self.collector():
+            label_text = ','.join(f'{name}="{escape_label(v)}"' for name, v in zip(self.label_names, labels))
+            lines.append(f'{self.name}{{{label_text}}} {value}')
+        return lines
+
+
+class GaugeFamily(CounterFamily):
+    """다른 모듈이 보고하는 현재 값"""
+
+    metric_type = 'gauge'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+request_duration = register(Histogram(
+    'board_request_duration_seconds', '뷰별 전체 처리 시간', ('view',), LATENCY_BUCKETS,
+))
+db_duration = register(Histogram(
+    'board_db_duration_seconds', '뷰별 요청당 DB 쿼리 시간 합계', ('view',), LATENCY_BUCKETS,
+))
+db_queries = register(Histogram(
+    'board_db_queries', '뷰별 요청당 쿼리 수', ('view',), QUERY_COUNT_BUCKETS,
+))
+render_duration = register(Histogram(
+    'board_template_render_seconds', '뷰별 요청당 템플릿 렌더링 시간 합계', ('view',), LATENCY_BUCKETS,
+))
+channel_layer_duration = register(Histogram(
+    'board_channel_layer_seconds', '채널 레이어 호출 지연', ('operation',), LATENCY_BUCKETS,
+))
+
+
+def render_prometheus():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 출력"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
+
+
+class RequestStats:
+    """요청 하나의 계측 값"""
+
+    __slots__ = ('queries', 'db_time', 'render_time', 'render_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper로 쓰여 쿼리 수와 시간을 센다.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+current_stats = ContextVar('board_request_stats', default=None)
+
+
+@contextmanager
+def measuring(stats):
+    """이 스레드의 쿼리와 템플릿 렌더링을 stats에 기록"""
+    # 스트리밍 본문에서는 들어가고 나오는 sync_to_async 호출의 Context가 달라 토큰 reset 대신 이전 값을 되돌린다.
+    previous = current_stats.get()
+    current_stats.set(stats)
+    try:
+        with connection.execute_wrapper(stats):
+            yield
+    finally:
+        current_stats.set(previous)
+
+
+def install_template_timer():
+    """템플릿 백엔드의 render를 감싸 요청별 렌더링 시간을 잰다 (앱 로딩 시 1회)"""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'is_timed', False):
+        return
+    original_render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        stats = current_stats.get()
+        if stats is None:
+            return original_render(self, context, request)
+        # include 등 중첩 렌더링은 바깥 렌더링 시간에 이미 포함된다.
+        stats.render_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            stats.render_depth -= 1
+            if not stats.render_depth:
+                stats.render_time += time.perf_counter() - start
+
+    timed_render.is_timed = True
+    Template.render = timed_render
+
+
+class PerformanceMiddleware:
+    """뷰별 쿼리 수 / DB 시간 / 렌더링 시간 / 전체 지연 기록 + Server-Timing 헤더"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        start = time.perf_counter()
+        with measuring(stats):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = (
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+            f'tpl;dur={stats.render_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        if is_generated_stream(response):
+            wrap_streaming_content(response, lambda: measuring(stats), lambda: self.observe(request, stats, start))
+        else:
+            self.observe(request, stats, start)
+        return response
+
+    def observe(self, request, stats, start):
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        request_duration.observe((view,), time.perf_counter() - start)
+        db_duration.observe((view,), stats.db_time)
+        db_queries.observe((view,), stats.queries)
+        render_duration.observe((view,), stats.render_time)
+
+
+class timed_channel_layer:
+    """채널 레이어 호출 지연 기록 (async with timed_channel_layer('group_send'): ...)"""
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    async def __aenter__(self):
+        self.start = time.perf_counter()
+
+    async def __aexit__(self, *exc_info):
+        channel_layer_duration.observe((self.operation,), time.perf_counter() - self.start)
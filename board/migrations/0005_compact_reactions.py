@@ -0,0 +1,222 @@
+# 반응 테이블을 (대상, 방문자) 복합 기본키 + 비트마스크 형태로 전환
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+REACTION_BITS = {
+    'heart': 1,
+    'laugh': 2,
+    'wow': 4,
+    'sad': 8,
+}
+
+
+def _visitor_ids(Visitor, session_keys):
+    """세션 키 목록에 대한 방문자 ID 매핑 (없으면 생성)"""
+    existing = dict(
+        Visitor.objects.filter(session_key__in=session_keys).values_list('session_key', 'id')
+    )
+    missing = [key for key in session_keys if key not in existing]
+    Visitor.objects.bulk_create([Visitor(session_key=key) for key in missing], batch_size=500)
+    existing.update(
+        Visitor.objects.filter(session_key__in=missing).values_list('session_key', 'id')
+    )
+    return existing
+
+
+def _pack(apps, legacy_name, new_name, target):
+    Visitor = apps.get_model('board', 'Visitor')
+    Legacy = apps.get_model('board', legacy_name)
+    Reaction = apps.get_model('board', new_name)
+
+    masks = {}
+    for target_id, session_id, reaction_type in Legacy.objects.values_list(
+        f'{target}_id', 'session_id', 'reaction_type'
+    ).iterator(chunk_size=2000):
+        bit = REACTION_BITS.get(reaction_type)
+        if not bit or not session_id:
+            continue
+        key = (target_id, session_id[:40])
+        masks[key] = masks.get(key, 0) | bit
+
+    visitor_ids = _visitor_ids(Visitor, sorted({session_key for _, session_key in masks}))
+    Reaction.objects.bulk_create(
+        [
+            Reaction(**{f'{target}_id': target_id}, visitor_id=visitor_ids[session_key], reactions=mask)
+            for (target_id, session_key), mask in masks.items()
+        ],
+        batch_size=500,
+    )
+
+
+def _unpack(apps, legacy_name, new_name, target):
+    Visitor = apps.get_model('board', 'Visitor')
+    Legacy = apps.get_model('board', legacy_name)
+    Reaction = apps.get_model('board', new_name)
+
+    session_keys = dict(Visitor.objects.values_list('id', 'session_key'))
+    rows = []
+    for target_id, visitor_id, mask in Reaction.objects.values_list(
+        f'{target}_id', 'visitor_id', 'reactions'
+    ).iterator(chunk_size=2000):
+        for reaction_type, bit in REACTION_BITS.items():
+            if mask & bit:
+                rows.append(Legacy(
+                    **{f'{target}_id': target_id},
+                    session_id=session_keys[visitor_id],
+                    reaction_type=reaction_type,
+                ))
+    Legacy.objects.bulk_create(rows, batch_size=500)
+
+
+def pack_reactions(apps, schema_editor):
+    _pack(apps, 'LegacyPostReaction', 'PostReaction', 'post')
+    _pack(apps, 'LegacyCommentReaction', 'CommentReaction', 'comment')
+
+
+def unpack_reactions(apps, schema_editor):
+    _unpack(apps, 'LegacyPostReaction', 'PostReaction', 'post')
+    _unpack(apps, 'LegacyCommentReaction', 'CommentReaction', 'comment')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0004_alter_commentreaction_unique_together_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Visitor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "session_key",
+                    models.CharField(max_length=40, unique=True, verbose_name="세션 키"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="생성일"),
+                ),
+            ],
+            options={
+                "verbose_name": "방문자",
+                "verbose_name_plural": "방문자들",
+            },
+        ),
+        # 기존 테이블은 이름을 바꿔 두고 데이터 이전 후 삭제한다.
+        migrations.RenameModel("PostReaction", "LegacyPostReaction"),
+        migrations.RenameModel("CommentReaction", "LegacyCommentReaction"),
+        migrations.AlterField(
+            model_name="legacypostreaction",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="board.post",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="legacycommentreaction",
+            name="comment",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="board.comment",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PostReaction",
+            fields=[
+                (
+                    "pk",
+                    models.CompositePrimaryKey(
+                        "post_id",
+                        "visitor_id",
+                        blank=True,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "reactions",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="반응 비트마스크"),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reactions",
+                        to="board.post",
+                        verbose_name="게시글",
+                    ),
+                ),
+                (
+                    "visitor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="board.visitor",
+                        verbose_name="방문자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "게시글 반응",
+                "verbose_name_plural": "게시글 반응들",
+            },
+        ),
+        migrations.CreateModel(
+            name="CommentReaction",
+            fields=[
+                (
+                    "pk",
+                    models.CompositePrimaryKey(
+                        "comment_id",
+                        "visitor_id",
+                        blank=True,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "reactions",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="반응 비트마스크"),
+                ),
+                (
+                    "comment",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reactions",
+                        to="board.comment",
+                        verbose_name="댓글",
+                    ),
+                ),
+                (
+                    "visitor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="board.visitor",
+                        verbose_name="방문자",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "댓글 반응",
+                "verbose_name_plural": "댓글 반응들",
+            },
+        ),
+        migrations.RunPython(pack_reactions, unpack_reactions),
+        migrations.DeleteModel(name="LegacyPostReaction"),
+        migrations.DeleteModel(name="LegacyCommentReaction"),
+    ]
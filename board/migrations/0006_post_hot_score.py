@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0005_compact_reactions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="hot_score",
+            field=models.FloatField(default=0, verbose_name="인기 점수"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-hot_score", "-created_at"],
+                name="board_post_hot_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0006_post_hot_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedPost",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("title", models.CharField(max_length=200, verbose_name="제목")),
+                ("content", models.TextField(verbose_name="내용")),
+                (
+                    "author_nickname",
+                    models.CharField(max_length=50, verbose_name="닉네임"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="작성일")),
+                (
+                    "view_count",
+                    models.PositiveIntegerField(default=0, verbose_name="조회수"),
+                ),
+                (
+                    "likes_count",
+                    models.PositiveIntegerField(default=0, verbose_name="좋아요 수"),
+                ),
+                (
+                    "hearts_count",
+                    models.PositiveIntegerField(default=0, verbose_name="하트 수"),
+                ),
+                (
+                    "laughs_count",
+                    models.PositiveIntegerField(default=0, verbose_name="웃음 수"),
+                ),
+                (
+                    "wows_count",
+                    models.PositiveIntegerField(default=0, verbose_name="놀람 수"),
+                ),
+                (
+                    "sads_count",
+                    models.PositiveIntegerField(default=0, verbose_name="슬픔 수"),
+                ),
+                (
+                    "is_deleted",
+                    models.BooleanField(default=False, verbose_name="삭제 여부"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="삭제일"),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="보관일"),
+                ),
+            ],
+            options={
+                "verbose_name": "보관된 게시글",
+                "verbose_name_plural": "보관된 게시글들",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedComment",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                ("content", models.TextField(verbose_name="댓글 내용")),
+                (
+                    "author_nickname",
+                    models.CharField(max_length=50, verbose_name="닉네임"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="작성일")),
+                (
+                    "likes_count",
+                    models.PositiveIntegerField(default=0, verbose_name="좋아요 수"),
+                ),
+                (
+                    "hearts_count",
+                    models.PositiveIntegerField(default=0, verbose_name="하트 수"),
+                ),
+                (
+                    "laughs_count",
+                    models.PositiveIntegerField(default=0, verbose_name="웃음 수"),
+                ),
+                (
+                    "wows_count",
+                    models.PositiveIntegerField(default=0, verbose_name="놀람 수"),
+                ),
+                (
+                    "sads_count",
+                    models.PositiveIntegerField(default=0, verbose_name="슬픔 수"),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="comments",
+                        to="board.archivedpost",
+                        verbose_name="게시글",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "보관된 댓글",
+                "verbose_name_plural": "보관된 댓글들",
+                "ordering": ["created_at"],
+            },
+        ),
+    ]
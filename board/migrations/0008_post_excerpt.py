@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:08
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model("board", "Post")
+    batch = []
+    for post in Post.objects.only("id", "content").iterator(chunk_size=500):
+        post.excerpt = Truncator(Truncator(post.content).words(30, truncate=" …")).chars(300)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ["excerpt"])
+            batch = []
+    Post.objects.bulk_update(batch, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0007_archived_posts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.CharField(
+                blank=True, default="", max_length=300, verbose_name="요약"
+            ),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
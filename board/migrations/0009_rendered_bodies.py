@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0008_post_excerpt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="content_html",
+            field=models.TextField(
+                blank=True, default="", verbose_name="렌더링된 내용"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedcomment",
+            name="content_render_version",
+            field=models.PositiveSmallIntegerField(
+                default=0, verbose_name="렌더러 버전"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedpost",
+            name="content_html",
+            field=models.TextField(
+                blank=True, default="", verbose_name="렌더링된 내용"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedpost",
+            name="content_render_version",
+            field=models.PositiveSmallIntegerField(
+                default=0, verbose_name="렌더러 버전"
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="content_html",
+            field=models.TextField(
+                blank=True, default="", verbose_name="렌더링된 내용"
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="content_render_version",
+            field=models.PositiveSmallIntegerField(
+                default=0, verbose_name="렌더러 버전"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="content_html",
+            field=models.TextField(
+                blank=True, default="", verbose_name="렌더링된 내용"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="content_render_version",
+            field=models.PositiveSmallIntegerField(
+                default=0, verbose_name="렌더러 버전"
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0009_rendered_bodies"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["-created_at"], name="board_comment_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["author_nickname"], name="board_comment_author_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["-created_at"], name="board_post_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["title"], name="board_post_title_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author_nickname"], name="board_post_author_idx"
+            ),
+        ),
+    ]
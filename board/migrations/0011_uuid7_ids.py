@@ -0,0 +1,146 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:18
+
+import board.ids
+from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+from django.db.models import OuterRef, Subquery
+
+
+def rekey_ids(apps, schema_editor):
+    """기존 게시글/댓글 ID를 작성 시각의 UUIDv7로 재발급 (이전 ID는 Legacy*Id에 보관)"""
+    Post = apps.get_model("board", "Post")
+    Comment = apps.get_model("board", "Comment")
+    PostReaction = apps.get_model("board", "PostReaction")
+    CommentReaction = apps.get_model("board", "CommentReaction")
+    LegacyPostId = apps.get_model("board", "LegacyPostId")
+    LegacyCommentId = apps.get_model("board", "LegacyCommentId")
+
+    for model, map_model in ((Post, LegacyPostId), (Comment, LegacyCommentId)):
+        batch = []
+        rows = model.objects.order_by().values_list("id", "created_at")
+        for old_id, created_at in rows.iterator(chunk_size=1000):
+            new_id = board.ids.uuid7_from_datetime(created_at)
+            batch.append(map_model(old_id=old_id, new_id=new_id))
+            if len(batch) >= 1000:
+                map_model.objects.bulk_create(batch)
+                batch = []
+        map_model.objects.bulk_create(batch)
+
+    def new_post_id(column):
+        return Subquery(
+            LegacyPostId.objects.filter(old_id=OuterRef(column)).values("new_id")[:1]
+        )
+
+    def new_comment_id(column):
+        return Subquery(
+            LegacyCommentId.objects.filter(old_id=OuterRef(column)).values("new_id")[:1]
+        )
+
+    # FK 제약은 커밋 시점에 확인되므로 참조하는 쪽부터 바꾼다.
+    PostReaction.objects.update(post_id=new_post_id("post_id"))
+    CommentReaction.objects.update(comment_id=new_comment_id("comment_id"))
+    Comment.objects.update(post_id=new_post_id("post_id"))
+    Comment.objects.update(id=new_comment_id("id"))
+    Post.objects.update(id=new_post_id("id"))
+
+
+def refuse_reverse(apps, schema_editor):
+    # 되돌려도 UUIDv7 키가 그대로 남아 스키마 버전과 데이터가 어긋나므로 명시적으로 막는다.
+    raise IrreversibleError(
+        "게시글/댓글 ID 재발급은 되돌릴 수 없습니다. "
+        "이전 ID는 board_legacypostid / board_legacycommentid에 남아 있습니다."
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0010_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LegacyPostId",
+            fields=[
+                (
+                    "old_id",
+                    models.UUIDField(
+                        primary_key=True, serialize=False, verbose_name="이전 ID"
+                    ),
+                ),
+                ("new_id", models.UUIDField(verbose_name="새 ID")),
+            ],
+            options={
+                "verbose_name": "이전 게시글 ID",
+                "verbose_name_plural": "이전 게시글 ID들",
+            },
+        ),
+        migrations.CreateModel(
+            name="LegacyCommentId",
+            fields=[
+                (
+                    "old_id",
+                    models.UUIDField(
+                        primary_key=True, serialize=False, verbose_name="이전 ID"
+                    ),
+                ),
+                ("new_id", models.UUIDField(verbose_name="새 ID")),
+            ],
+            options={
+                "verbose_name": "이전 댓글 ID",
+                "verbose_name_plural": "이전 댓글 ID들",
+            },
+        ),
+        migrations.RunPython(rekey_ids, refuse_reverse),
+        migrations.AlterModelOptions(
+            name="comment",
+            options={
+                "ordering": ["id"],
+                "verbose_name": "댓글",
+                "verbose_name_plural": "댓글들",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="post",
+            options={
+                "ordering": ["-id"],
+                "verbose_name": "게시글",
+                "verbose_name_plural": "게시글들",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="board_post_hot_idx",
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="id",
+            field=models.UUIDField(
+                default=board.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="id",
+            field=models.UUIDField(
+                default=board.ids.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["post", "id"], name="board_comment_thread_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-hot_score", "-id"],
+                name="board_post_hot_idx",
+            ),
+        ),
+    ]
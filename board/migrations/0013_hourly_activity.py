@@ -0,0 +1,58 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("board", "0012_jobs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HourlyActivity",
+            fields=[
+                (
+                    "hour",
+                    models.DateTimeField(
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="시간 (UTC 정시)",
+                    ),
+                ),
+                (
+                    "posts",
+                    models.PositiveIntegerField(default=0, verbose_name="게시글 수"),
+                ),
+                (
+                    "comments",
+                    models.PositiveIntegerField(default=0, verbose_name="댓글 수"),
+                ),
+                (
+                    "views",
+                    models.PositiveIntegerField(default=0, verbose_name="조회 수"),
+                ),
+                (
+                    "hearts",
+                    models.PositiveIntegerField(default=0, verbose_name="하트 수"),
+                ),
+                (
+                    "laughs",
+                    models.PositiveIntegerField(default=0, verbose_name="웃음 수"),
+                ),
+                (
+                    "wows",
+                    models.PositiveIntegerField(default=0, verbose_name="놀람 수"),
+                ),
+                (
+                    "sads",
+                    models.PositiveIntegerField(default=0, verbose_name="슬픔 수"),
+                ),
+            ],
+            options={
+                "verbose_name": "시간대별 활동",
+                "verbose_name_plural": "시간대별 활동들",
+                "ordering": ["hour"],
+            },
+        ),
+    ]
@@ -1,13 +1,47 @@
 from django.db import models
+from django.db.models import F, Sum
 from django.utils import timezone
-import uuid
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
 
+from .ids import uuid7
+from .rendering import RENDERER_VERSION, render_body
 
-class Post(models.Model):
+
+class RenderedBody(models.Model):
+    """저장 시 렌더링된 본문 HTML을 함께 보관하는 모델"""
+    content_html = models.TextField(blank=True, default='', verbose_name='렌더링된 내용')
+    content_render_version = models.PositiveSmallIntegerField(default=0, verbose_name='렌더러 버전')
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'content_html', 'content_render_version'}
+        super().save(*args, **kwargs)
+    
+    def render_content(self):
+        self.content_html = render_body(self.content)
+        self.content_render_version = RENDERER_VERSION
+    
+    @property
+    def rendered_content(self):
+        """템플릿 출력용 본문 HTML (다시 렌더링되지 않은 행은 즉석에서 렌더링)"""
+        if self.content_render_version != RENDERER_VERSION:
+            return mark_safe(render_body(self.content))
+        return mark_safe(self.content_html)
+
+
+class Post(RenderedBody):
     """게시글 모델"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     title = models.CharField(max_length=200, verbose_name='제목')
     content = models.TextField(verbose_name='내용')
+    excerpt = models.CharField(max_length=300, blank=True, default='', verbose_name='요약')  # 목록 카드용 (저장 시 계산)
     author_nickname = models.CharField(max_length=50, verbose_name='닉네임', default='익명')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='작성일')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
@@ -21,19 +55,54 @@ class Post(models.Model):
     wows_count = models.PositiveIntegerField(default=0, verbose_name='놀람 수')
     sads_count = models.PositiveIntegerField(default=0, verbose_name='슬픔 수')
     
+    # 인기글 점수 (조회/반응/댓글 시 증분 갱신, 주기적으로 감쇠)
+    hot_score = models.FloatField(default=0, verbose_name='인기 점수')
+    
     # 삭제 관련
     is_deleted = models.BooleanField(default=False, verbose_name='삭제 여부')
     deleted_at = models.DateTimeField(null=True, blank=True, verbose_name='삭제일')
     delete_password = models.CharField(max_length=100, null=True, blank=True, verbose_name='삭제 비밀번호')
     
     class Meta:
-        ordering = ['-created_at']
+        # id가 UUIDv7이라 id 순서가 곧 작성 순서
+        ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['-hot_score', '-id'],
+                condition=models.Q(is_deleted=False),
+                name='board_post_hot_idx',
+            ),
+            # admin 정렬 / 검색용 (제목 접두어 범위 검색, 닉네임 일치)
+            models.Index(fields=['-created_at'], name='board_post_created_idx'),
+            models.Index(fields=['title'], name='board_post_title_idx'),
+            models.Index(fields=['author_nickname'], name='board_post_author_idx'),
+        ]
         verbose_name = '게시글'
         verbose_name_plural = '게시글들'
     
+    # 목록 카드에 필요한 컬럼만 (content 제외)
+    LIST_FIELDS = (
+        'id', 'title', 'excerpt', 'author_nickname', 'created_at', 'view_count',
+        'hearts_count', 'laughs_count', 'wows_count', 'sads_count',
+    )
+    EXCERPT_WORDS = 30
+    
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.excerpt = self.make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def make_excerpt(cls, content):
+        """목록 카드용 요약 (truncatewords:30과 같은 결과, 최대 300자)"""
+        return Truncator(Truncator(content).words(cls.EXCERPT_WORDS, truncate=' …')).chars(300)
+    
     def get_reactions_summary(self):
         """반응 요약 정보 반환"""
         return {
@@ -43,9 +112,9 @@ class Post(models.Model):
         }
 
 
-class Comment(models.Model):
+class Comment(RenderedBody):
     """댓글 모델"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments', verbose_name='게시글')
     content = models.TextField(verbose_name='댓글 내용')
     author_nickname = models.CharField(max_length=50, verbose_name='닉네임', default='익명')
@@ -61,16 +130,47 @@ class Comment(models.Model):
     sads_count = models.PositiveIntegerField(default=0, verbose_name='슬픔 수')
     
     class Meta:
-        ordering = ['created_at']
+        ordering = ['id']
+        indexes = [
+            # 게시글별 댓글을 id(작성) 순으로 읽고 키셋 페이지네이션
+            models.Index(fields=['post', 'id'], name='board_comment_thread_idx'),
+            # admin 정렬 / 검색용
+            models.Index(fields=['-created_at'], name='board_comment_created_idx'),
+            models.Index(fields=['author_nickname'], name='board_comment_author_idx'),
+        ]
         verbose_name = '댓글'
         verbose_name_plural = '댓글들'
     
     def __str__(self):
-        return f"{self.post.title} - {self.content[:30]}"
+        # 게시글을 추가로 조회하지 않도록 댓글 자신의 필드만 사용
+        return f"{self.author_nickname} - {self.content[:30]}"
+
 
+class Visitor(models.Model):
+    """익명 방문자 모델 (세션 키를 정수 ID로 매핑)"""
+    session_key = models.CharField(max_length=40, unique=True, verbose_name='세션 키')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+    
+    class Meta:
+        verbose_name = '방문자'
+        verbose_name_plural = '방문자들'
+    
+    def __str__(self):
+        return f"Visitor #{self.pk}"
 
-class PostReaction(models.Model):
-    """게시글 반응 모델 (다양한 이모지 반응)"""
+
+# 반응 타입별 비트 (한 행의 reactions 비트마스크에 모든 이모지 반응을 저장)
+REACTION_BITS = {
+    'heart': 1,
+    'laugh': 2,
+    'wow': 4,
+    'sad': 8,
+}
+REACTION_TYPES = tuple(REACTION_BITS)
+
+
+class ReactionSet(models.Model):
+    """방문자 한 명이 대상 하나에 누른 반응 집합 (비트마스크)"""
     REACTION_CHOICES = [
         ('heart', '하트'),
         ('laugh', '웃음'),
@@ -78,34 +178,185 @@ class PostReaction(models.Model):
         ('sad', '슬픔'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    visitor = models.ForeignKey(Visitor, on_delete=models.CASCADE, related_name='+', verbose_name='방문자')
+    reactions = models.PositiveSmallIntegerField(default=0, verbose_name='반응 비트마스크')
+    
+    class Meta:
+        abstract = True
+    
+    @staticmethod
+    def types_from_mask(mask):
+        """비트마스크를 반응 타입 목록으로 변환"""
+        return [reaction_type for reaction_type, bit in REACTION_BITS.items() if mask & bit]
+    
+    @staticmethod
+    def mask_from_types(reaction_types):
+        """반응 타입 목록을 비트마스크로 변환"""
+        mask = 0
+        for reaction_type in reaction_types:
+            mask |= REACTION_BITS[reaction_type]
+        return mask
+    
+    @staticmethod
+    def count_aggregates():
+        """반응 타입별 합계 집계식 (비트 값으로 나누면 개수)"""
+        return {
+            f'{reaction_type}s_count': Sum(F('reactions').bitand(bit))
+            for reaction_type, bit in REACTION_BITS.items()
+        }
+    
+    @staticmethod
+    def counts_from_totals(totals):
+        """count_aggregates() 결과를 반응 타입별 개수로 변환"""
+        return {
+            f'{reaction_type}s_count': (totals.get(f'{reaction_type}s_count') or 0) // bit
+            for reaction_type, bit in REACTION_BITS.items()
+        }
+    
+    @property
+    def reaction_types(self):
+        return self.types_from_mask(self.reactions)
+
+
+class PostReaction(ReactionSet):
+    """게시글 반응 모델 (방문자당 한 행, 이모지 반응은 비트마스크)"""
+    pk = models.CompositePrimaryKey('post_id', 'visitor_id')
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='reactions', verbose_name='게시글')
-    session_id = models.CharField(max_length=100, verbose_name='세션 ID')  # 익명 사용자 식별용
-    reaction_type = models.CharField(max_length=10, choices=REACTION_CHOICES, verbose_name='반응 타입')
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
     
     class Meta:
-        unique_together = ['post', 'session_id', 'reaction_type']  # 한 사용자는 게시글당 반응 타입별로 하나씩 가능
         verbose_name = '게시글 반응'
         verbose_name_plural = '게시글 반응들'
 
 
-class CommentReaction(models.Model):
-    """댓글 반응 모델 (다양한 이모지 반응)"""
-    REACTION_CHOICES = [
-        ('heart', '하트'),
-        ('laugh', '웃음'),
-        ('wow', '놀람'),
-        ('sad', '슬픔'),
-    ]
-    
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+class CommentReaction(ReactionSet):
+    """댓글 반응 모델 (방문자당 한 행, 이모지 반응은 비트마스크)"""
+    pk = models.CompositePrimaryKey('comment_id', 'visitor_id')
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='reactions', verbose_name='댓글')
-    session_id = models.CharField(max_length=100, verbose_name='세션 ID')  # 익명 사용자 식별용
-    reaction_type = models.CharField(max_length=10, choices=REACTION_CHOICES, verbose_name='반응 타입')
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
     
     class Meta:
-        unique_together = ['comment', 'session_id', 'reaction_type']  # 한 사용자는 댓글당 반응 타입별로 하나씩 가능
         verbose_name = '댓글 반응'
-        verbose_name_plural = '댓글 반응들'
\ No newline at end of file
+        verbose_name_plural = '댓글 반응들'
+
+
+class ArchivedPost(RenderedBody):
+    """보관된 게시글 모델 (삭제 후 유예 기간이 지났거나 오래된 게시글)"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    title = models.CharField(max_length=200, verbose_name='제목')
+    content = models.TextField(verbose_name='내용')
+    author_nickname = models.CharField(max_length=50, verbose_name='닉네임')
+    created_at = models.DateTimeField(verbose_name='작성일')
+    view_count = models.PositiveIntegerField(default=0, verbose_name='조회수')
+    
+    # 보관 시점의 최종 반응 수 (반응 행은 보관하지 않음)
+    likes_count = models.PositiveIntegerField(default=0, verbose_name='좋아요 수')
+    hearts_count = models.PositiveIntegerField(default=0, verbose_name='하트 수')
+    laughs_count = models.PositiveIntegerField(default=0, verbose_name='웃음 수')
+    wows_count = models.PositiveIntegerField(default=0, verbose_name='놀람 수')
+    sads_count = models.PositiveIntegerField(default=0, verbose_name='슬픔 수')
+    
+    is_deleted = models.BooleanField(default=False, verbose_name='삭제 여부')
+    deleted_at = models.DateTimeField(null=True, blank=True, verbose_name='삭제일')
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='보관일')
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = '보관된 게시글'
+        verbose_name_plural = '보관된 게시글들'
+    
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(RenderedBody):
+    """보관된 댓글 모델"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE, related_name='comments', verbose_name='게시글')
+    content = models.TextField(verbose_name='댓글 내용')
+    author_nickname = models.CharField(max_length=50, verbose_name='닉네임')
+    created_at = models.DateTimeField(verbose_name='작성일')
+    
+    likes_count = models.PositiveIntegerField(default=0, verbose_name='좋아요 수')
+    hearts_count = models.PositiveIntegerField(default=0, verbose_name='하트 수')
+    laughs_count = models.PositiveIntegerField(default=0, verbose_name='웃음 수')
+    wows_count = models.PositiveIntegerField(default=0, verbose_name='놀람 수')
+    sads_count = models.PositiveIntegerField(default=0, verbose_name='슬픔 수')
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = '보관된 댓글'
+        verbose_name_plural = '보관된 댓글들'
+
+
+class LegacyPostId(models.Model):
+    """UUIDv7로 재발급되기 전의 게시글 ID (예전 링크를 새 주소로 보내기 위함)"""
+    old_id = models.UUIDField(primary_key=True, verbose_name='이전 ID')
+    new_id = models.UUIDField(verbose_name='새 ID')
+    
+    class Meta:
+        verbose_name = '이전 게시글 ID'
+        verbose_name_plural = '이전 게시글 ID들'
+    
+    def __str__(self):
+        return f"{self.old_id} → {self.new_id}"
+
+
+class LegacyCommentId(models.Model):
+    """UUIDv7로 재발급되기 전의 댓글 ID (재발급 이전 기록과 대조하기 위함)"""
+    old_id = models.UUIDField(primary_key=True, verbose_name='이전 ID')
+    new_id = models.UUIDField(verbose_name='새 ID')
+    
+    class Meta:
+        verbose_name = '이전 댓글 ID'
+        verbose_name_plural = '이전 댓글 ID들'
+    
+    def __str__(self):
+        return f"{self.old_id} → {self.new_id}"
+
+
+class Job(models.Model):
+    """쓰기 후처리 작업 큐 (board/jobs.py, run_jobs 명령이 처리)"""
+    kind = models.CharField(max_length=50, verbose_name='종류')
+    payload = models.JSONField(default=dict, verbose_name='내용')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='시도 횟수')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='실행 가능 시각')
+    locked_by = models.CharField(max_length=32, null=True, blank=True, verbose_name='처리 중인 워커')
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='점유 만료')
+    last_error = models.TextField(blank=True, default='', verbose_name='마지막 오류')
+    failed_at = models.DateTimeField(null=True, blank=True, verbose_name='실패 확정일')  # 재시도 한도 초과
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일')
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = '작업'
+        verbose_name_plural = '작업들'
+        indexes = [
+            # 실행할 작업 찾기 (실패 확정된 작업 제외)
+            models.Index(
+                fields=['run_after', 'id'], name='board_job_due_idx', condition=models.Q(failed_at__isnull=True),
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.id}"
+
+
+class HourlyActivity(models.Model):
+    """시간대별 활동 집계 (board/activity.py, 작업 큐가 증분 갱신 / backfill_activity 명령으로 재계산)"""
+    hour = models.DateTimeField(primary_key=True, verbose_name='시간 (UTC 정시)')
+    posts = models.PositiveIntegerField(default=0, verbose_name='게시글 수')
+    comments = models.PositiveIntegerField(default=0, verbose_name='댓글 수')
+    views = models.PositiveIntegerField(default=0, verbose_name='조회 수')
+    
+    # 반응 타입별로 새로 누른 횟수 (취소는 빼지 않음)
+    hearts = models.PositiveIntegerField(default=0, verbose_name='하트 수')
+    laughs = models.PositiveIntegerField(default=0, verbose_name='웃음 수')
+    wows = models.PositiveIntegerField(default=0, verbose_name='놀람 수')
+    sads = models.PositiveIntegerField(default=0, verbose_name='슬픔 수')
+    
+    class Meta:
+        ordering = ['hour']
+        verbose_name = '시간대별 활동'
+        verbose_name_plural = '시간대별 활동들'
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}시"
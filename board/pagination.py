@@ -0,0 +1,84 @@
+"""
+큰 테이블용 페이지네이션
+
+- EstimatedCountPaginator: 전체 COUNT(*) 대신 통계 기반 추정치 / 상한이 있는 COUNT 사용
+  (추정치가 없는 SQLite 등에서는 정확한 COUNT를 잠시 캐시해 재사용, 상한에 걸리면 페이지가 조용히 끊기므로)
+- keyset_page: OFFSET 없이 정렬 키 다음부터 읽는 키셋 페이지네이션
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# 조건이 있는 목록은 이 개수까지만 센다 (그 이상은 "COUNT_CAP개 이상"으로 취급)
+COUNT_CAP = 10000
+# 추정치가 없는 DB에서 같은 목록의 정확한 COUNT를 재사용하는 시간 (초)
+COUNT_CACHE_SECONDS = 60
+
+
+def estimated_table_rows(model, using='default'):
+    """DB 통계의 테이블 행 수 추정치 (지원하지 않는 DB거나 통계가 없으면 None)"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # reltuples는 ANALYZE 전이면 -1
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+def capped_count(queryset, cap=COUNT_CAP):
+    """최대 cap개까지만 세는 COUNT (LIMIT이 붙은 서브쿼리)"""
+    return queryset.order_by().values('pk')[:cap].count()
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_SECONDS):
+    """같은 쿼리의 정확한 COUNT를 timeout초 동안 캐시 (그동안 추가/삭제된 행은 반영되지 않음)"""
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    key = 'pagination:count:' + hashlib.sha256(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """정확한 전체 개수 대신 추정치를 쓰는 Paginator (admin 목록용)"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connections[queryset.db].vendor != 'postgresql':
+            return cached_count(queryset)
+        if not queryset.query.where:
+            estimate = estimated_table_rows(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return capped_count(queryset)
+
+
+def keyset_page(queryset, key_fields, after=None, size=50):
+    """
+    key_fields 순서(오름차순)로 after 다음 행부터 size개 반환
+    반환값: (행 목록, 다음 페이지 키 또는 None)
+    """
+    queryset = queryset.order_by(*key_fields)
+    if after is not None:
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+        condition = Q()
+        for i, field in enumerate(key_fields):
+            equal = {key_fields[j]: after[j] for j in range(i)}
+            condition |= Q(**equal, **{f'{field}__gt': after[i]})
+        queryset = queryset.filter(condition)
+
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, tuple(getattr(last, field) for field in key_fields)
@@ -0,0 +1,231 @@
+"""
+접속자 수 집계 (presence)
+
+- 워커는 자기 WebSocket 연결을 메모리에만 들고 있고, PRESENCE_INTERVAL마다
+  범위(board / post:<id>)별 방문자 키를 현재 시간 버킷 키에 한 번에 추가한다(하트비트).
+- Redis에서는 버킷 키가 HyperLogLog(PFADD / PFCOUNT)라 방문자 수와 무관하게 키당 12KB 이하이고,
+  여러 탭 / 여러 워커에 걸친 같은 방문자는 한 명으로 센다 (오차 약 1%).
+- 접속자 수 = 현재 + 직전 버킷의 합집합 크기. 연결이 끊기면 하트비트에서 빠지고 버킷 키는 만료된다.
+- 같은 주기에 워커가 자기 연결에 바뀐 숫자만 직접 보낸다 (채널 레이어 fan-out 없음).
+- Redis 없이 Unix 소켓 채널 레이어를 쓰면 같은 서버의 워커가 허브에 하트비트를 보내 정확한 집합으로 함께 센다.
+- 둘 다 없거나 장애면 프로세스 로컬 집합으로 센다 (그 워커의 연결만 반영).
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .channel_layers import UnixSocketChannelLayer
+
+from .metrics import GaugeFamily, register
+
+logger = logging.getLogger(__name__)
+
+BOARD_SCOPE = 'board'
+
+
+def interval():
+    return getattr(settings, 'PRESENCE_INTERVAL', 10)
+
+
+def current_bucket():
+    return int(time.time() // interval())
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+class LocalPresenceStore:
+    """프로세스 로컬 버킷 (정확한 집합)"""
+
+    def __init__(self):
+        self.buckets = {}  # (범위, 버킷) -> 방문자 집합
+        self.lock = threading.Lock()
+
+    def exchange(self, bucket, members_by_scope):
+        """하트비트 추가 후 범위별 접속자 수 반환"""
+        with self.lock:
+            for scope, members in members_by_scope.items():
+                self.buckets.setdefault((scope, bucket), set()).update(members)
+            for key in [key for key in self.buckets if key[1] < bucket - 1]:
+                del self.buckets[key]
+        return self.count(members_by_scope, bucket)
+
+    def count(self, scopes, bucket):
+        with self.lock:
+            return {
+                scope: len(self.buckets.get((scope, bucket), set()) | self.buckets.get((scope, bucket - 1), set()))
+                for scope in scopes
+            }
+
+
+class RedisPresenceStore:
+    """Redis HyperLogLog 버킷 (모든 워커가 공유, 하트비트 1회 = 파이프라인 1회 왕복)"""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def key(self, scope, bucket):
+        return f'presence:{scope}:{bucket}'
+
+    def exchange(self, bucket, members_by_scope):
+        ttl = interval() * 3
+        pipe = self.client.pipeline(transaction=False)
+        for scope, members in members_by_scope.items():
+            pipe.pfadd(self.key(scope, bucket), *members)
+            pipe.expire(self.key(scope, bucket), ttl)
+        self.queue_counts(pipe, members_by_scope, bucket)
+        results = pipe.execute()
+        return dict(zip(members_by_scope, results[len(members_by_scope) * 2:]))
+
+    def count(self, scopes, bucket):
+        pipe = self.client.pipeline(transaction=False)
+        self.queue_counts(pipe, scopes, bucket)
+        return dict(zip(scopes, pipe.execute()))
+
+    def queue_counts(self, pipe, scopes, bucket):
+        for scope in scopes:
+            pipe.pfcount(self.key(scope, bucket), self.key(scope, bucket - 1))
+
+
+class HubPresenceStore:
+    """Unix 소켓 채널 레이어 허브의 정확한 집합 (같은 서버의 모든 워커가 공유)"""
+
+    def __init__(self, layer):
+        self.layer = layer
+
+    def exchange(self, bucket, members_by_scope):
+        return async_to_sync(self.layer.presence)(bucket, members_by_scope, list(members_by_scope))
+
+    def count(self, scopes, bucket):
+        return async_to_sync(self.layer.presence)(bucket, {}, scopes)
+
+
+local_store = LocalPresenceStore()
+redis_store = None
+hub_store = None
+
+
+def get_store():
+    global redis_store, hub_store
+    url = getattr(settings, 'PRESENCE_REDIS_URL', None)
+    if url:
+        if redis_store is None:
+            redis_store = RedisPresenceStore(url)
+        return redis_store
+    layer = get_channel_layer()
+    if isinstance(layer, UnixSocketChannelLayer):
+        if hub_store is None or hub_store.layer is not layer:
+            hub_store = HubPresenceStore(layer)
+        return hub_store
+    return local_store
+
+
+def is_shared():
+    """워커들이 접속자 수를 함께 세는지 (아니면 워커마다 자기 연결만 셈)"""
+    return get_store() is not local_store
+
+
+def exchange(bucket, members_by_scope):
+    try:
+        return get_store().exchange(bucket, members_by_scope)
+    except Exception:
+        logger.warning('공유 접속자 집계 실패, 로컬 집계 사용', exc_info=True)
+        return local_store.exchange(bucket, members_by_scope)
+
+
+def presence_counts(post_id=None):
+    """HTTP API용 현재 접속자 수 {'online': n, 'reading': n | None}"""
+    scopes = [BOARD_SCOPE] + ([post_scope(post_id)] if post_id else [])
+    try:
+        counts = get_store().count(scopes, current_bucket())
+    except Exception:
+        logger.warning('공유 접속자 수 조회 실패, 로컬 집계 사용', exc_info=True)
+        counts = local_store.count(scopes, current_bucket())
+    return {'online': counts[BOARD_SCOPE], 'reading': counts[post_scope(post_id)] if post_id else None}
+
+
+class PresenceTracker:
+    """워커 하나의 WebSocket 연결 목록과 하트비트 / 접속자 수 전송 작업"""
+
+    def __init__(self):
+        self.connections = {}  # consumer -> (방문자 키, 게시글 id)
+        self.sent = {}  # consumer -> 마지막으로 보낸 payload
+        self.counts = {}
+        self.task = None
+
+    async def join(self, consumer, visitor, post_id=None):
+        self.connections[consumer] = (visitor, post_id)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        elif self.counts:
+            # 다음 주기를 기다리지 않고 마지막으로 집계한 숫자를 바로 보냄
+            await self.push(consumer, post_id)
+
+    def watch(self, consumer, post_id):
+        if consumer in self.connections:
+            self.connections[consumer] = (self.connections[consumer][0], post_id)
+
+    def leave(self, consumer):
+        self.connections.pop(consumer, None)
+        self.sent.pop(consumer, None)
+
+    def payload(self, post_id):
+        return {
+            'type': 'presence',
+            'online': self.counts.get(BOARD_SCOPE, 0),
+            'reading': self.counts.get(post_scope(post_id), 0) if post_id else None,
+        }
+
+    async def run(self):
+        # 첫 하트비트는 바로 보내 새로 뜬 워커의 연결도 곧 집계되게 한다.
+        while self.connections:
+            try:
+                await self.tick()
+            except Exception:
+                logger.warning('접속자 하트비트 실패', exc_info=True)
+            await asyncio.sleep(interval())
+
+    async def tick(self):
+        members_by_scope = defaultdict(set)
+        for visitor, post_id in self.connections.values():
+            members_by_scope[BOARD_SCOPE].add(visitor)
+            if post_id:
+                members_by_scope[post_scope(post_id)].add(visitor)
+        self.counts = await sync_to_async(exchange, thread_sensitive=False)(current_bucket(), dict(members_by_scope))
+
+        for consumer, (visitor, post_id) in list(self.connections.items()):
+            await self.push(consumer, post_id)
+
+    async def push(self, consumer, post_id):
+        """숫자가 바뀐 경우에만 전송"""
+        payload = self.payload(post_id)
+        if self.sent.get(consumer) == payload:
+            return
+        self.sent[consumer] = payload
+        try:
+            await consumer.send_presence(payload)
+        except Exception:
+            # 끊기는 중인 연결은 disconnect에서 정리된다.
+            self.sent.pop(consumer, None)
+
+
+tracker = PresenceTracker()
+
+
+def tracker_sizes():
+    yield ('connections',), len(tracker.connections)
+    yield ('posts',), len({post_id for visitor, post_id in tracker.connections.values() if post_id})
+
+
+register(GaugeFamily(
+    'board_presence_local', '이 워커의 WebSocket 연결 수 / 보고 있는 게시글 수', ('kind',), tracker_sizes,
+))
@@ -0,0 +1,319 @@
+"""
+요청 단위 / 시간 구간 샘플링 프로파일러
+
+- 서명된 X-Board-Profile 헤더가 붙은 요청 하나만 프로파일링
+- 관리자가 켠 시간 구간 동안 프로세스의 모든 스레드(ASGI 이벤트 루프의 WebSocket 컨슈머 포함)를 프로파일링
+- 결과는 PROFILE_DIR에 collapsed stack 형식(flamegraph.pl, speedscope에서 바로 열림)으로 저장
+  (요청 경로 밖의 쓰기 스레드가 저장하고, PROFILE_MAX_FILES개를 넘으면 오래된 파일부터 지움)
+- 구간 프로파일링 플래그는 공유 캐시(Redis)에 두고, 캐시가 워커마다 따로(LocMem)면
+  같은 서버의 워커가 함께 보는 PROFILE_DIR의 플래그 파일에 둔다.
+"""
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from .tiered_cache import l2_is_local
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Board-Profile'
+TOKEN_SALT = 'board.profiling'
+WINDOW_CACHE_KEY = 'profiling:window_until'
+WINDOW_FLAG_FILE = 'window.flag'
+MAX_STACK_DEPTH = 128
+MAX_WINDOW_SECONDS = 300
+# 구간 프로파일링 플래그는 워커마다 이 간격(초)으로만 확인
+WINDOW_CHECK_INTERVAL = 1.0
+
+
+def sample_interval():
+    return getattr(settings, 'PROFILE_SAMPLE_INTERVAL', 0.005)
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def max_profiles():
+    return getattr(settings, 'PROFILE_MAX_FILES', 200)
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+
+
+def collapse_stack(frame):
+    """프레임을 루트부터 'module:func;module:func' 한 줄로 변환"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """일정 간격으로 대상 스레드의 스택을 찍어 집계 (대상이 없으면 모든 스레드)"""
+
+    def __init__(self, interval, thread_ids=None):
+        super().__init__(name='board-profiler', daemon=True)
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.counts = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids and thread_id not in self.thread_ids):
+                    continue
+                self.counts[collapse_stack(frame)] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.counts
+
+
+def profile_path(label):
+    safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'profile'
+    return profile_dir() / f"{timezone.now():%Y%m%dT%H%M%S%f}-{safe_label}.collapsed"
+
+
+def write_file(path, counts):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        for stack, count in counts.most_common():
+            f.write(f'{stack} {count}\n')
+
+
+def prune_profiles():
+    """가장 최근 PROFILE_MAX_FILES개만 남기고 지움"""
+    for path in list_profiles()[max_profiles():]:
+        path.unlink(missing_ok=True)
+
+
+class ProfileWriter:
+    """프로파일 파일을 요청 경로 밖의 스레드에서 저장"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def submit(self, path, counts):
+        self.ensure_thread()
+        self.queue.put((path, counts))
+
+    def drain(self):
+        """맡긴 파일을 모두 저장할 때까지 대기"""
+        self.queue.join()
+
+    def ensure_thread(self):
+        # fork된 워커는 부모의 스레드를 물려받지 않으므로 프로세스마다 새로 띄운다.
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self.run, name='board-profile-writer', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            path, counts = self.queue.get()
+            try:
+                write_file(path, counts)
+                prune_profiles()
+            except OSError:
+                logger.exception('프로파일 저장 실패: %s', path)
+            finally:
+                self.queue.task_done()
+
+
+profile_writer = ProfileWriter()
+
+
+def write_profile(label, counts):
+    """collapsed stack 파일 저장을 쓰기 스레드에 맡기고 저장될 경로 반환 (샘플이 없으면 None)"""
+    if not counts:
+        return None
+    path = profile_path(label)
+    profile_writer.submit(path, counts)
+    return path
+
+
+def list_profiles(limit=None):
+    """저장된 프로파일 파일 목록 (최신순)"""
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    paths = sorted(directory.glob('*.collapsed'), reverse=True)
+    return paths[:limit] if limit else paths
+
+
+def read_profile(path):
+    """collapsed stack 파일을 Counter로 읽기"""
+    counts = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                counts[stack] += int(count)
+    return counts
+
+
+def summarize(counts, top=15):
+    """(전체 샘플 수, self 상위 프레임, inclusive 상위 프레임)"""
+    total = sum(counts.values())
+    self_counts = Counter()
+    inclusive_counts = Counter()
+    for stack, count in counts.items():
+        frames = stack.split(';')
+        self_counts[frames[-1]] += count
+        for name in set(frames):
+            inclusive_counts[name] += count
+    return total, self_counts.most_common(top), inclusive_counts.most_common(top)
+
+
+def make_token():
+    """X-Board-Profile 헤더 값 생성 (PROFILE_TOKEN_MAX_AGE 동안 유효)"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def is_valid_token(token):
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=getattr(settings, 'PROFILE_TOKEN_MAX_AGE', 3600),
+        )
+        return True
+    except signing.BadSignature:
+        return False
+
+
+def window_flag_path():
+    return profile_dir() / WINDOW_FLAG_FILE
+
+
+def read_window_flag():
+    """구간 프로파일링 종료 시각 플래그 (없으면 0)"""
+    if not l2_is_local():
+        return cache.get(WINDOW_CACHE_KEY) or 0.0
+    try:
+        return float(window_flag_path().read_text())
+    except (OSError, ValueError):
+        return 0.0
+
+
+def start_window(seconds):
+    """모든 워커에 구간 프로파일링 시작 요청 (종료 시각 반환)"""
+    seconds = max(1, min(int(seconds), MAX_WINDOW_SECONDS))
+    until = time.time() + seconds
+    if not l2_is_local():
+        cache.set(WINDOW_CACHE_KEY, until, seconds)
+        return until
+    # 워커가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 바꿔 넣음
+    path = window_flag_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f'{path.name}.{os.getpid()}')
+    temp.write_text(repr(until))
+    os.replace(temp, path)
+    return until
+
+
+def stop_window():
+    if not l2_is_local():
+        cache.delete(WINDOW_CACHE_KEY)
+        return
+    window_flag_path().unlink(missing_ok=True)
+
+
+def window_until():
+    """진행 중인 구간 프로파일링 종료 시각 (없으면 None)"""
+    until = read_window_flag()
+    return until if until > time.time() else None
+
+
+class WindowProfiler:
+    """프로세스 단위 구간 프로파일링 상태 (워커마다 하나)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.until = 0.0
+        self.next_check = 0.0
+
+    def poll(self):
+        """요청마다 호출: 플래그를 가끔 확인해 구간 샘플러를 시작/종료"""
+        now = time.time()
+        if now < self.next_check:
+            return
+        with self.lock:
+            if now < self.next_check:
+                return
+            self.next_check = now + WINDOW_CHECK_INTERVAL
+            until = read_window_flag()
+            if self.sampler is None and until > now:
+                self.until = until
+                self.sampler = StackSampler(sample_interval())
+                self.sampler.start()
+                timer = threading.Timer(until - now, self.finish)
+                timer.daemon = True
+                timer.start()
+                return
+            # 관리자가 구간을 일찍 끝낸 경우
+            stopped_early = self.sampler is not None and until < self.until
+        if stopped_early:
+            self.finish()
+
+    def finish(self):
+        with self.lock:
+            sampler, self.sampler = self.sampler, None
+        if sampler is not None:
+            path = write_profile('window', sampler.stop())
+            logger.info('구간 프로파일 저장 요청: %s', path)
+
+
+window_profiler = WindowProfiler()
+
+
+class ProfilingMiddleware:
+    """서명된 헤더가 있는 요청만 샘플링하고, 켜진 구간 프로파일링을 확인"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        window_profiler.poll()
+
+        token = request.headers.get(PROFILE_HEADER)
+        if not token or not is_valid_token(token):
+            return self.get_response(request)
+
+        sampler = StackSampler(sample_interval(), thread_ids={threading.get_ident()})
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            counts = sampler.stop()
+
+        match = request.resolver_match
+        path = write_profile(match.view_name if match else 'unmatched', counts)
+        if path is not None:
+            response['X-Board-Profile-File'] = path.name
+        return response
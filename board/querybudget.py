@@ -0,0 +1,162 @@
+"""
+쿼리 예산 / N+1 감지
+
+- @query_budget(n): 뷰의 요청당 최대 쿼리 수 선언 (board/urls.py의 모든 뷰에 필수, 시스템 체크로 확인)
+- assert_query_budget(n): 테스트용 컨텍스트 매니저 (예산 초과나 N+1이면 QueryBudgetExceeded)
+- QueryBudgetMiddleware: 개발 모드에서 요청별 쿼리를 기록하고 예산 초과 / N+1을 로그로 남기거나 예외 발생
+"""
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core import checks
+from django.db import connection
+
+from .streaming import is_generated_stream, wrap_streaming_content
+
+logger = logging.getLogger(__name__)
+
+# 같은 모양의 쿼리가 이 횟수 이상 반복되면 N+1로 본다.
+DEFAULT_REPEAT_THRESHOLD = 5
+
+# IN (%s, %s, ...)처럼 인자 개수만 다른 쿼리는 같은 모양으로 취급
+IN_LIST_PATTERN = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+NUMBER_PATTERN = re.compile(r'\b\d+\b')
+# 트랜잭션 제어문은 반복되어도 N+1이 아니다.
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """쿼리 예산 초과 또는 N+1 감지"""
+
+
+def normalize_sql(sql):
+    """파라미터 개수와 숫자 리터럴을 지워 쿼리 모양만 남김"""
+    return NUMBER_PATTERN.sub('N', IN_LIST_PATTERN.sub('(...)', sql))
+
+
+class QueryRecorder:
+    """실행된 쿼리 모양 기록 (connection.execute_wrapper용)"""
+
+    def __init__(self):
+        self.shapes = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes.append(normalize_sql(sql))
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return len(self.shapes)
+
+    def repeated(self, threshold=None):
+        """임계값 이상 반복된 쿼리 모양 [(모양, 횟수)]"""
+        threshold = threshold or repeat_threshold()
+        return [
+            (shape, times) for shape, times in Counter(self.shapes).most_common()
+            if times >= threshold and not shape.startswith(TRANSACTION_STATEMENTS)
+        ]
+
+    def problems(self, budget, allow_repeats=False):
+        """예산 초과 / N+1 설명 목록 (문제가 없으면 빈 목록)"""
+        problems = []
+        if budget is not None and self.count > budget:
+            problems.append(f'쿼리 {self.count}개 실행 (예산 {budget}개)')
+        if not allow_repeats:
+            for shape, times in self.repeated():
+                problems.append(f'같은 쿼리 {times}회 반복 (N+1 의심): {shape[:200]}')
+        return problems
+
+
+def repeat_threshold():
+    return getattr(settings, 'QUERY_BUDGET_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+
+
+def query_budget(max_queries, allow_repeats=False):
+    """뷰의 요청당 최대 쿼리 수 선언 (가장 바깥 데코레이터로 사용)"""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        view_func.query_budget_allow_repeats = allow_repeats
+        return view_func
+    return decorator
+
+
+class assert_query_budget:
+    """
+    테스트용: 블록 안의 쿼리가 예산을 넘거나 N+1이면 QueryBudgetExceeded
+
+        with assert_query_budget(3):
+            client.get('/')
+    """
+
+    def __init__(self, max_queries=None, allow_repeats=False, using=connection):
+        self.max_queries = max_queries
+        self.allow_repeats = allow_repeats
+        self.connection = using
+        self.recorder = QueryRecorder()
+
+    def __enter__(self):
+        self.wrapper = self.connection.execute_wrapper(self.recorder)
+        self.wrapper.__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            problems = self.recorder.problems(self.max_queries, self.allow_repeats)
+            if problems:
+                raise QueryBudgetExceeded('\n'.join(problems))
+
+
+class QueryBudgetMiddleware:
+    """개발 모드: 요청별 쿼리를 기록해 뷰에 선언된 예산 초과와 N+1을 보고"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        if is_generated_stream(response):
+            # 스트리밍 본문에서 실행되는 쿼리까지 센 뒤 확인
+            wrap_streaming_content(
+                response, lambda: connection.execute_wrapper(recorder), lambda: self.report(request, recorder),
+            )
+        else:
+            self.report(request, recorder)
+        return response
+
+    def report(self, request, recorder):
+        match = request.resolver_match
+        if match is None:
+            return
+        budget = getattr(match.func, 'query_budget', None)
+        allow_repeats = getattr(match.func, 'query_budget_allow_repeats', False)
+        problems = recorder.problems(budget, allow_repeats)
+        if not problems:
+            return
+
+        message = f'{match.view_name} ({request.method} {request.path}): ' + ' / '.join(problems)
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+@checks.register()
+def check_query_budgets(app_configs, **kwargs):
+    """board/urls.py의 모든 뷰에 쿼리 예산이 선언되어 있는지 확인"""
+    from . import urls
+
+    errors = []
+    for pattern in urls.urlpatterns:
+        if getattr(pattern.callback, 'query_budget', None) is None:
+            errors.append(checks.Warning(
+                f'{pattern.name} 뷰에 쿼리 예산이 없습니다.',
+                hint='@query_budget(n)을 가장 바깥 데코레이터로 추가하세요.',
+                obj=pattern.callback,
+                id='board.W001',
+            ))
+    return errors
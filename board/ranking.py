@@ -0,0 +1,100 @@
+"""
+인기글(hot) 점수
+
+조회/반응/댓글이 들어올 때마다 Post.hot_score를 증분 갱신하고,
+decay_hot_scores 명령으로 주기적으로 감쇠시킨다.
+"""
+from django.conf import settings
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Post, REACTION_TYPES
+from .tiered_cache import TieredCache
+
+DEFAULT_WEIGHTS = {
+    'post': 10.0,
+    'view': 1.0,
+    'reaction': 3.0,
+    'comment': 5.0,
+}
+
+# 이 값보다 작은 점수는 0으로 정리해 감쇠 UPDATE 대상에서 빠지게 한다.
+MIN_HOT_SCORE = 0.01
+
+# 인기글 목록은 모든 요청이 같은 값을 읽으므로 2단계 캐시에 짧게 보관
+TRENDING_DEFAULT_LIMIT = 5
+trending_cache = TieredCache('trending', l1_max_entries=8, l1_ttl=5, l2_ttl=30)
+
+
+def hot_weight(event):
+    """이벤트 종류별 가중치"""
+    weights = getattr(settings, 'HOT_SCORE_WEIGHTS', {})
+    return weights.get(event, DEFAULT_WEIGHTS[event])
+
+
+def half_life_hours():
+    return getattr(settings, 'HOT_SCORE_HALF_LIFE_HOURS', 12)
+
+
+def hot_score_delta(event, count=1):
+    """hot_score 증감식 (다른 필드 UPDATE와 함께 쓰기 위한 F 표현식)"""
+    return F('hot_score') + hot_weight(event) * count
+
+
+def bump_hot_score(post_id, event, count=1):
+    """게시글 하나의 hot_score 증분 갱신"""
+    Post.objects.filter(pk=post_id).update(hot_score=hot_score_delta(event, count))
+
+
+def decay_factor(hours):
+    """경과 시간에 대한 감쇠 배율"""
+    return 0.5 ** (hours / half_life_hours())
+
+
+def decay_hot_scores(hours):
+    """전체 hot_score를 경과 시간만큼 감쇠 (UPDATE 2회)"""
+    live = Post.objects.filter(hot_score__gt=0)
+    decayed = live.update(hot_score=F('hot_score') * decay_factor(hours))
+    live.filter(hot_score__lt=MIN_HOT_SCORE).update(hot_score=0)
+    return decayed
+
+
+def rebuild_hot_scores(chunk_size=500):
+    """현재 카운트와 작성 시각으로 hot_score 전체 재계산"""
+    now = timezone.now()
+    posts = Post.objects.annotate(comment_total=Count('comments')).only(
+        'id', 'created_at', 'view_count', *[f'{reaction_type}s_count' for reaction_type in REACTION_TYPES]
+    )
+    batch = []
+    rebuilt = 0
+    for post in posts.iterator(chunk_size=chunk_size):
+        reactions = sum(getattr(post, f'{reaction_type}s_count') for reaction_type in REACTION_TYPES)
+        score = (
+            hot_weight('post')
+            + hot_weight('view') * post.view_count
+            + hot_weight('reaction') * reactions
+            + hot_weight('comment') * post.comment_total
+        )
+        age_hours = (now - post.created_at).total_seconds() / 3600
+        post.hot_score = score * decay_factor(age_hours)
+        batch.append(post)
+        if len(batch) >= chunk_size:
+            rebuilt += Post.objects.bulk_update(batch, ['hot_score'])
+            batch = []
+    if batch:
+        rebuilt += Post.objects.bulk_update(batch, ['hot_score'])
+    return rebuilt
+
+
+def trending_posts(limit=TRENDING_DEFAULT_LIMIT):
+    """인기글 목록 (hot_score 인덱스로 상위 N개만 읽음, 2단계 캐시에 잠깐 보관)"""
+    return trending_cache.get_or_set(limit, lambda: list(
+        Post.objects.filter(is_deleted=False, hot_score__gt=0).order_by('-hot_score', '-id').only(
+            'id', 'title', 'hot_score', 'created_at'
+        )[:limit]
+    ))
+
+
+def invalidate_trending_posts():
+    """게시글이 목록에서 빠질 때 모든 워커의 인기글 캐시를 비움"""
+    trending_cache.delete(TRENDING_DEFAULT_LIMIT)
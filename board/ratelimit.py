@@ -0,0 +1,252 @@
+"""
+쓰기 API 요청 제한
+
+- 방문자(세션)별 / IP별 토큰 버킷: Redis(Lua 스크립트 1회 호출) 또는 프로세스 로컬 메모리
+  로컬 버킷은 워커마다 따로 세므로 한도를 워커 수($WEB_CONCURRENCY, serve가 설정)로 나눠 가진다.
+  서버 전체로는 설정한 한도를 넘지 않지만, 연결이 한 워커에 몰리면 그보다 일찍 막힐 수 있다.
+  (정확한 한도가 필요하면 Redis 사용)
+- 적응형 동시성 제한: 쿼리 지연이 임계값을 넘으면 한도를 줄이고, 한도를 넘는 요청은 대기 없이 바로 503 반환
+  (요청의 DB 시간 합계가 아니라 가장 느린 쿼리로 판단해, 쿼리가 많을 뿐인 요청이 한도를 깎지 않게 한다.)
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_rate(rate):
+    """'5/m' 형식을 (버킷 크기, 초당 충전량)으로 변환"""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+# 여러 버킷을 한 번에 확인하고, 모두 허용될 때만 토큰을 차감한다.
+# 버킷보다 큰 요청은 버킷이 가득 찼을 때만 허용하고 버킷을 전부 비운다.
+# KEYS: 버킷 키들 / ARGV: now, cost, (capacity, refill_rate) * len(KEYS)
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local states = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[1 + i * 2])
+    local rate = tonumber(ARGV[2 + i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    local need = math.min(cost, capacity)
+    tokens = math.min(capacity, tokens + (now - ts) * rate)
+    states[i] = {tokens, capacity, rate, need}
+    if tokens < need then
+        retry_after = math.max(retry_after, (need - tokens) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local tokens = states[i][1]
+    if retry_after == 0 then
+        tokens = tokens - states[i][4]
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(states[i][2] / states[i][3] * 1000) + 1000)
+end
+return tostring(retry_after)
+"""
+
+
+def local_worker_count():
+    """같은 한도를 나눠 받는 워커 프로세스 수"""
+    try:
+        return max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+    except ValueError:
+        return 1
+
+
+class LocalTokenBuckets:
+    """프로세스 로컬 토큰 버킷 (Redis가 없거나 장애일 때 사용, 워커 수만큼 나눈 한도)"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, limits, cost=1):
+        """limits: [(key, capacity, rate)] / 반환값: 재시도까지 남은 초 (0이면 허용)"""
+        now = time.monotonic()
+        workers = local_worker_count()
+        with self.lock:
+            states = []
+            retry_after = 0
+            for key, capacity, rate in limits:
+                capacity, rate = capacity / workers, rate / workers
+                need = min(cost, capacity)
+                tokens, ts = self.buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - ts) * rate)
+                states.append((key, tokens, need))
+                if tokens < need:
+                    retry_after = max(retry_after, (need - tokens) / rate)
+
+            for key, tokens, need in states:
+                if not retry_after:
+                    tokens -= need
+                self.buckets[key] = (tokens, now)
+                self.buckets.move_to_end(key)
+
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return retry_after
+
+
+class RedisTokenBuckets:
+    """Redis 토큰 버킷 (모든 워커가 공유, 확인과 차감을 한 번의 왕복으로 처리)"""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, limits, cost=1):
+        args = [time.time(), cost]
+        for key, capacity, rate in limits:
+            args += [capacity, rate]
+        return float(self.script(keys=[key for key, capacity, rate in limits], args=args))
+
+
+class AdaptiveConcurrencyLimiter:
+    """쿼리 지연에 따라 동시 처리 한도를 조절 (AIMD)"""
+
+    def __init__(self, latency_threshold, initial_limit=16, min_limit=1, max_limit=64):
+        self.latency_threshold = latency_threshold
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.inflight = 0
+        self.latency = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.inflight >= int(self.limit):
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, query_latency=None):
+        """query_latency: 요청에서 가장 느린 쿼리 시간 (쿼리가 없었으면 None, 한도는 그대로)"""
+        with self.lock:
+            self.inflight -= 1
+            if query_latency is None:
+                return
+            self.latency = self.latency * 0.8 + query_latency * 0.2
+            if self.latency > self.latency_threshold:
+                self.limit = max(self.min_limit, self.limit * 0.75)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class DatabaseTimer:
+    """요청 처리 중 쿼리별 시간 측정 (connection.execute_wrapper용)"""
+
+    def __init__(self):
+        self.total = 0.0
+        self.slowest = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.total += elapsed
+            self.slowest = elapsed if self.slowest is None else max(self.slowest, elapsed)
+
+
+local_buckets = LocalTokenBuckets()
+redis_buckets = None
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    latency_threshold=getattr(settings, 'RATE_LIMIT_DB_LATENCY_THRESHOLD', 0.25),
+)
+
+
+def get_buckets():
+    global redis_buckets
+    url = getattr(settings, 'RATE_LIMIT_REDIS_URL', None)
+    if url and redis_buckets is None:
+        redis_buckets = RedisTokenBuckets(url)
+    return redis_buckets or local_buckets
+
+
+def get_client_ip(request):
+    """클라이언트 IP (프록시 뒤에서는 X-Forwarded-For의 첫 번째 값)"""
+    if getattr(settings, 'RATE_LIMIT_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_rate_limit(request, scope, cost=1):
+    """요청 제한 확인 (cost: 차감할 토큰 수) / 반환값: 재시도까지 남은 초 (0이면 허용)"""
+    config = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+    if not config:
+        return 0
+
+    limits = []
+    if 'ip' in config:
+        limits.append((f'ratelimit:{scope}:ip:{get_client_ip(request)}', *parse_rate(config['ip'])))
+    session_key = request.session.session_key
+    if 'visitor' in config and session_key:
+        limits.append((f'ratelimit:{scope}:visitor:{session_key}', *parse_rate(config['visitor'])))
+    if not limits:
+        return 0
+
+    buckets = get_buckets()
+    try:
+        return buckets.consume(limits, cost)
+    except Exception:
+        # Redis 장애 시 로컬 버킷으로 계속 제한
+        logger.warning('Redis 요청 제한 실패, 로컬 버킷 사용', exc_info=True)
+        return local_buckets.consume(limits, cost)
+
+
+def rate_limit(scope, cost=1):
+    """쓰기 API용 요청 제한 데코레이터 (토큰 버킷 + 동시성 제한, cost: 토큰 수 또는 요청별로 계산하는 함수)"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            retry_after = check_rate_limit(request, scope, cost(request) if callable(cost) else cost)
+            if retry_after:
+                response = JsonResponse(
+                    {'success': False, 'error': '요청이 너무 많습니다. 잠시 후 다시 시도해주세요.'},
+                    status=429
+                )
+                response['Retry-After'] = str(max(1, round(retry_after)))
+                return response
+
+            if not concurrency_limiter.acquire():
+                response = JsonResponse(
+                    {'success': False, 'error': '서버가 혼잡합니다. 잠시 후 다시 시도해주세요.'},
+                    status=503
+                )
+                response['Retry-After'] = '1'
+                return response
+
+            timer = DatabaseTimer()
+            try:
+                with connection.execute_wrapper(timer):
+                    return view_func(request, *args, **kwargs)
+            finally:
+                concurrency_limiter.release(timer.slowest)
+        return wrapped
+    return decorator
@@ -0,0 +1,14 @@
+"""
+본문 렌더링
+
+게시글/댓글 본문은 저장할 때 한 번만 이스케이프 + 문단 변환해 content_html에 저장한다.
+렌더링 방식이 바뀌면 RENDERER_VERSION을 올리고 render_bodies 명령으로 다시 렌더링한다.
+"""
+from django.utils.html import linebreaks
+
+RENDERER_VERSION = 1
+
+
+def render_body(text):
+    """본문을 이스케이프된 HTML 문단으로 변환 (linebreaks 필터와 같은 결과)"""
+    return linebreaks(text, autoescape=True)
@@ -0,0 +1,270 @@
+"""
+프로덕션 ASGI 서버 (pre-fork, uvicorn 워커)
+
+마스터 프로세스가 리스닝 소켓을 한 번 열고 워커 프로세스 N개를 fork한다.
+워커는 같은 소켓에서 연결을 받아 HTTP와 WebSocket(BoardConsumer)을 모두 처리한다.
+
+- 워밍업: 워커는 템플릿 / URL / 인기글 캐시를 준비한 뒤에야 accept를 시작한다.
+  (그동안 들어온 연결은 커널 backlog에서 다른 워커가 가져간다.)
+  DB 연결은 미리 열지 않는다: ASGI에서는 요청마다 새 스레드에서 연결을 열고 요청이 끝나면 닫으므로
+  워밍업 스레드의 연결을 요청이 다시 쓸 수 없다.
+- 재활용: max_requests(+jitter)개를 처리한 워커는 스스로 graceful 종료하고 마스터가 새로 띄운다.
+- 드레인: 마스터가 SIGTERM/SIGINT를 받으면 워커에 SIGTERM을 보내 새 연결을 끊고
+  처리 중인 요청을 graceful_timeout까지 기다린 뒤, 남은 워커는 SIGKILL한다.
+- job_workers를 주면 작업 큐 워커(run_jobs와 같은 루프)도 함께 띄우고 감시한다.
+- Unix 소켓 채널 레이어를 쓰면 허브를 별도 자식 프로세스로 띄워 워커 재활용과 무관하게 유지한다.
+"""
+import asyncio
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+
+RESPAWN_BACKOFF = 1  # 초, 시작 직후 죽는 워커를 다시 띄우기 전 대기
+CRASH_WINDOW = 5  # 초, 이 안에 비정상 종료하면 시작 실패로 보고 대기
+KILL_GRACE = 5  # 초, graceful_timeout 이후 SIGKILL 전 추가 여유
+
+
+def bind_socket(host, port, backlog=2048):
+    """워커가 공유할 리스닝 소켓"""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def warmup():
+    """요청을 받기 전 준비 / 반환값: 항목별 개수"""
+    from django.db import connections
+    from django.template import engines
+    from django.urls import get_resolver
+
+    from .ranking import trending_posts
+
+    templates = 0
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.endswith('.html'):
+                        engine.get_template(os.path.relpath(os.path.join(root, name), directory))
+                        templates += 1
+
+    # reverse()용 URL 테이블과 인기글 캐시 채우기
+    resolver = get_resolver()
+    resolver.reverse_dict
+    trending = len(trending_posts())
+    # 인기글을 읽느라 이 스레드에 열린 연결은 요청이 다시 쓰지 않으므로 닫는다.
+    connections.close_all()
+    return {'templates': templates, 'urls': len(resolver.url_patterns), 'trending': trending}
+
+
+def flush_activity():
+    from .activity import activity_buffer
+
+    try:
+        activity_buffer.flush()
+    except Exception:
+        traceback.print_exc()
+
+
+class PreforkServer:
+    """워커 프로세스를 띄우고 감시하는 마스터"""
+
+    def __init__(self, application, host, port, workers, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30, warmup=True, access_log=False, job_workers=0, log=print):
+        self.application = application
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.warmup = warmup
+        self.access_log = access_log
+        self.job_worker_count = job_workers
+        self.log = log
+        self.workers = {}  # pid -> (시작 시각, 다시 띄울 함수)
+        self.hub_pid = None
+        self.stopping = False
+
+    def run(self):
+        from django.db import connections
+
+        self.socket = bind_socket(self.host, self.port)
+        # 워커 안의 프로세스 로컬 한도(요청 제한 버킷 등)가 워커 수를 알 수 있도록
+        os.environ['WEB_CONCURRENCY'] = str(self.worker_count)
+        # 마스터가 연 DB 연결을 워커가 나눠 쓰지 않도록 fork 전에 닫는다.
+        connections.close_all()
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+
+        self.log(f'{self.host}:{self.port}에서 워커 {self.worker_count}개로 시작 (마스터 pid {os.getpid()})')
+        self.spawn_hub()
+        for _ in range(self.worker_count):
+            self.spawn_worker()
+        for _ in range(self.job_worker_count):
+            self.spawn_job_worker()
+
+        while not self.stopping:
+            self.reap()
+            time.sleep(0.5)
+
+        self.drain()
+        self.socket.close()
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def reap(self):
+        """종료된 워커를 거두고 다시 띄움"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid == self.hub_pid:
+                if self.stopping:
+                    self.hub_pid = None
+                    continue
+                self.log(f'채널 허브 프로세스 {pid} 종료 (상태 {status}), 다시 시작')
+                self.spawn_hub()
+                continue
+            entry = self.workers.pop(pid, None)
+            if entry is None or self.stopping:
+                continue
+            started, respawn = entry
+            if os.waitstatus_to_exitcode(status) == 0:
+                self.log(f'워커 {pid} 재활용')
+            else:
+                self.log(f'워커 {pid} 비정상 종료 (종료 코드 {os.waitstatus_to_exitcode(status)})')
+                if time.monotonic() - started < CRASH_WINDOW:
+                    time.sleep(RESPAWN_BACKOFF)
+            respawn()
+
+    def drain(self):
+        """워커에 SIGTERM을 보내고 graceful_timeout까지 기다린 뒤 남은 워커를 SIGKILL"""
+        self.log(f'종료 중: 워커 {len(self.workers)}개 드레인 (최대 {self.graceful_timeout}초)')
+        for pid in list(self.workers):
+            self.signal_child(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + KILL_GRACE
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            self.log(f'워커 {pid} 강제 종료')
+            self.signal_child(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            del self.workers[pid]
+        if self.hub_pid is not None:
+            self.signal_child(self.hub_pid, signal.SIGTERM)
+            try:
+                os.waitpid(self.hub_pid, 0)
+            except ChildProcessError:
+                pass
+
+    def signal_child(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (time.monotonic(), self.spawn_worker)
+            return
+        exit_code = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            asyncio.run(self.serve_worker())
+            exit_code = 0
+        except Exception:
+            traceback.print_exc()
+        finally:
+            # os._exit는 데몬 스레드를 기다리지 않으므로 아직 넘기지 않은 활동 집계를 직접 넘긴다.
+            flush_activity()
+            os._exit(exit_code)
+
+    async def serve_worker(self):
+        import uvicorn
+        from asgiref.sync import sync_to_async
+
+        if self.warmup:
+            started = time.perf_counter()
+            counts = await sync_to_async(warmup)()
+            elapsed = (time.perf_counter() - started) * 1000
+            self.log(f'워커 {os.getpid()} 워밍업 {elapsed:.0f}ms {counts}')
+
+        limit = None
+        if self.max_requests:
+            # 워커가 한꺼번에 재시작하지 않도록 흩뿌림
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        config = uvicorn.Config(
+            self.application,
+            lifespan='off',
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            access_log=self.access_log,
+        )
+        await uvicorn.Server(config).serve(sockets=[self.socket])
+
+    def spawn_job_worker(self):
+        from .jobs import JobWorker
+
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = (time.monotonic(), self.spawn_job_worker)
+            return
+        exit_code = 1
+        try:
+            self.socket.close()
+            worker = JobWorker()
+
+            # SIGTERM이면 처리 중인 묶음은 끝내고 종료
+            def stop(signum, frame):
+                worker.stopping = True
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+            self.log(f'작업 큐 워커 {os.getpid()} 시작')
+            worker.run()
+            exit_code = 0
+        except Exception:
+            traceback.print_exc()
+        finally:
+            os._exit(exit_code)
+
+    def spawn_hub(self):
+        """Unix 소켓 채널 레이어면 허브 전용 프로세스를 띄움 (워커 재활용에도 큐와 그룹 유지)"""
+        from channels.layers import get_channel_layer
+
+        from .channel_layers import UnixSocketChannelLayer, start_hub_if_free
+
+        layer = get_channel_layer()
+        if not isinstance(layer, UnixSocketChannelLayer):
+            return
+        pid = os.fork()
+        if pid:
+            self.hub_pid = pid
+            return
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.socket.close()
+            # 재시작 사이에 워커가 허브를 맡았다면 그 워커가 끝날 때까지 기다렸다가 넘겨받는다.
+            hub = start_hub_if_free(layer)
+            while hub is None:
+                time.sleep(1)
+                hub = start_hub_if_free(layer)
+            self.log(f'채널 허브 프로세스 {os.getpid()} 시작')
+            hub.thread.join()
+        finally:
+            os._exit(0)
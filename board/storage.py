@@ -0,0 +1,45 @@
+"""
+프로덕션 정적 파일 저장소
+
+collectstatic 시 앱 CSS/JS를 압축(minify)한 뒤 해시 이름을 붙이고,
+WhiteNoise가 gzip/brotli로 미리 압축해 둔다.
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:  # 압축 패키지가 없으면 해시/사전 압축만 수행
+    rcssmin = rjsmin = None
+
+MINIFIERS = {
+    '.css': lambda source: rcssmin.cssmin(source),
+    '.js': lambda source: rjsmin.jsmin(source),
+}
+
+
+class MinifiedCompressedManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """minify → 해시 → gzip/brotli 사전 압축"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run and rjsmin is not None:
+            for path in paths:
+                if self.minify(path):
+                    # 해시 계산이 원본 대신 압축된 사본을 읽도록 교체
+                    paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minify(self, path):
+        prefixes = tuple(getattr(settings, 'STATIC_MINIFY_PREFIXES', ('css/', 'js/')))
+        extension = path[path.rfind('.'):]
+        if not path.startswith(prefixes) or extension not in MINIFIERS or '.min.' in path:
+            return False
+
+        with self.open(path) as source_file:
+            source = source_file.read().decode('utf-8')
+        minified = MINIFIERS[extension](source)
+        self.delete(path)
+        self.save(path, ContentFile(minified.encode('utf-8')))
+        return True
@@ -0,0 +1,66 @@
+"""
+스트리밍 응답 도우미
+
+- ASGI에서 Django는 동기 이터레이터 본문을 sync_to_async(list)로 전부 읽은 뒤에야 보낸다.
+  그래서 ASGI 요청에는 동기 제너레이터를 한 덩어리씩 sync_to_async로 꺼내는 비동기 이터레이터를 돌려준다.
+  (thread_sensitive라 요청의 다른 동기 코드와 같은 스레드 / 같은 DB 연결에서 실행)
+- 미들웨어가 스트리밍 본문에서 실행되는 쿼리까지 세려면 본문을 만드는 스레드에서
+  계측 컨텍스트에 들어가야 하므로, 동기 / 비동기 본문 모두 wrap_streaming_content로 감싼다.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse
+
+DONE = object()
+
+
+def streaming_content_for(request, chunks):
+    """요청 종류에 맞는 스트리밍 본문 (WSGI: 동기 제너레이터 그대로, ASGI: 한 덩어리씩 꺼내는 비동기 이터레이터)"""
+    if isinstance(request, ASGIRequest):
+        return iterate_in_thread(chunks)
+    return chunks
+
+
+async def iterate_in_thread(chunks):
+    """동기 이터레이터를 한 덩어리씩 스레드에서 꺼냄 (다음 덩어리는 앞 덩어리를 보낸 뒤에 만든다)"""
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, DONE)) is not DONE:
+            yield chunk
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def is_generated_stream(response):
+    """뷰가 만든 스트리밍 본문인지 (파일 응답은 쿼리가 없고, 감싸면 sendfile 같은 파일 전송 최적화를 못 쓴다)"""
+    return response.streaming and not isinstance(response, FileResponse)
+
+
+def wrap_streaming_content(response, context, finish):
+    """스트리밍 본문을 본문이 만들어지는 스레드에서 context() 안에서 돌리고, 끝까지 보낸 뒤 finish() 호출"""
+    content = response.streaming_content
+    if response.is_async:
+        response.streaming_content = wrap_async(content, context, finish)
+    else:
+        response.streaming_content = wrap_sync(content, context, finish)
+
+
+def wrap_sync(content, context, finish):
+    with context():
+        yield from content
+    finish()
+
+
+async def wrap_async(content, context, finish):
+    # 본문 덩어리는 thread_sensitive 스레드에서 만들어지므로 계측 컨텍스트도 그 스레드에서 연다.
+    manager = await sync_to_async(context)()
+    await sync_to_async(manager.__enter__)()
+    try:
+        async for chunk in content:
+            yield chunk
+    finally:
+        await sync_to_async(manager.__exit__)(None, None, None)
+    await sync_to_async(finish)()
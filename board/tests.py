@@ -1,3 +1,1260 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import presence, profiling, views
+from .activity import activity_buffer, apply_deltas, backfill, hour_start, record
+from .archive import archive_posts
+from .channel_layers import (
+    CLOSED, HALF_OPEN, LAYERS, OPEN, CircuitBreaker, ResilientChannelLayer, UnixSocketChannelLayer, runtime_dir,
+)
+from .counters import reconcile_counters
+from .jobs import MAX_ATTEMPTS, JobWorker, enqueue
+from .metrics import Histogram
+from .models import (
+    REACTION_BITS, ArchivedComment, ArchivedPost, Comment, CommentReaction, HourlyActivity, Job, Post, PostReaction,
+    ReactionSet, Visitor,
+)
+from .pagination import EstimatedCountPaginator
+from .presence import HubPresenceStore
+from .querybudget import assert_query_budget
+from .ranking import decay_hot_scores, hot_weight, rebuild_hot_scores, trending_posts
+from .ratelimit import AdaptiveConcurrencyLimiter, LocalTokenBuckets, concurrency_limiter, local_buckets
+from .rendering import RENDERER_VERSION
+from .server import RESPAWN_BACKOFF, PreforkServer
+from .tiered_cache import INVALIDATION_GROUP, KEYSPACES, MISSING, TieredCache, apply_invalidation
+
+# 테스트에서는 Redis 없이 프로세스 내 채널 레이어 사용
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def make_post(**fields):
+    return Post.objects.create(**{'title': '제목', 'content': '내용', **fields})
+
+
+def make_comment(post, **fields):
+    return Comment.objects.create(**{'post': post, 'content': '댓글', **fields})
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS, JOB_QUEUE_INLINE=False)
+class BoardTestCase(TestCase):
+    """캐시 / 요청 제한 버킷을 비운 상태에서 시작하는 테스트 (작업은 바로 실행하지 않고 큐에 쌓음)"""
+
+    def setUp(self):
+        cache.clear()
+        for tiered in KEYSPACES.values():
+            tiered.l1.clear()
+        local_buckets.buckets.clear()
+
+    def tearDown(self):
+        # 남은 활동 증가량이 프로세스 종료 시 실제 DB로 넘어가지 않도록 버림
+        activity_buffer.take()
+
+    def post_json(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+
+class TieredCacheTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tiered = TieredCache('test_tiered', l1_ttl=60, l2_ttl=60)
+
+    def test_delete_clears_both_levels(self):
+        self.tiered.set('a', 1)
+        self.tiered.delete('a')
+        self.assertIs(self.tiered.get('a', MISSING), MISSING)
+
+    def test_get_many_fills_l1_from_l2(self):
+        self.tiered.set_many({'a': 1, 'b': 0})
+        self.tiered.l1.clear()
+        self.assertEqual(self.tiered.get_many(['a', 'b', 'c']), {'a': 1, 'b': 0})
+        self.assertEqual(self.tiered.l1.get('b'), 0)
+
+    def test_invalidation_is_published_after_commit(self):
+        self.tiered.set('a', 1)
+        with mock.patch('board.tiered_cache.publish_invalidation') as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.tiered.delete('a', 'b')
+                # 트랜잭션 안에서도 이 요청은 지운 값을 다시 읽지 않음
+                self.assertIs(self.tiered.get('a', MISSING), MISSING)
+                # 커밋 전에 다른 요청이 옛 값을 다시 채움
+                self.tiered.set('a', 1)
+                publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+        publish.assert_called_once_with('test_tiered', ('a', 'b'))
+        self.assertIs(self.tiered.get('a', MISSING), MISSING)
+
+    def test_rolled_back_delete_is_not_published(self):
+        with mock.patch('board.tiered_cache.publish_invalidation') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(DatabaseError):
+                    with transaction.atomic():
+                        self.tiered.delete('a')
+                        raise DatabaseError
+        publish.assert_not_called()
+
+    def test_invalidation_reaches_other_workers(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(INVALIDATION_GROUP, channel)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tiered.delete('a')
+        self.assertEqual(async_to_sync(layer.receive)(channel), {
+            'type': 'cache.invalidate', 'keyspace': 'test_tiered', 'keys': ['a'],
+        })
+
+    def test_remote_invalidation_keeps_a_shared_l2(self):
+        self.tiered.set('a', 1)
+        with mock.patch('board.tiered_cache.l2_is_local', return_value=False):
+            apply_invalidation({'keyspace': 'test_tiered', 'keys': ['a']})
+        self.assertIs(self.tiered.l1.get('a'), MISSING)
+        # L2(Redis)는 지운 워커가 이미 지웠으므로 받은 워커는 L1만 버림
+        self.assertEqual(cache.get(self.tiered.l2_key('a')), 1)
+        self.assertEqual(self.tiered.get('a'), 1)
+
+    def test_remote_invalidation_drops_process_local_l2(self):
+        # 다른 워커가 지운 항목: 이 워커의 L1과 (LocMemCache인) L2에 남아 있음
+        self.tiered.set('a', 1)
+        apply_invalidation({'keyspace': 'test_tiered', 'keys': ['a']})
+        self.assertIs(self.tiered.l1.get('a'), MISSING)
+        self.assertIs(cache.get(self.tiered.l2_key('a'), MISSING), MISSING)
+
+
+class ReactionMaskTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = make_post()
+        self.visitor = Visitor.objects.create(session_key='a' * 32)
+
+    def toggle(self, mask):
+        new_mask = views.toggle_reaction_mask(PostReaction, 'post', self.post.pk, self.visitor.pk, mask)
+        views.apply_reaction_deltas(Post, self.post.pk, mask, new_mask)
+        self.post.refresh_from_db()
+        return new_mask
+
+    def test_mask_round_trip(self):
+        mask = ReactionSet.mask_from_types(['heart', 'sad'])
+        self.assertEqual(mask, REACTION_BITS['heart'] | REACTION_BITS['sad'])
+        self.assertEqual(ReactionSet.types_from_mask(mask), ['heart', 'sad'])
+
+    def test_xor_toggle_creates_flips_and_counts(self):
+        self.assertEqual(self.toggle(REACTION_BITS['heart']), 1)
+        self.assertEqual(self.toggle(REACTION_BITS['heart'] | REACTION_BITS['wow']), 4)
+        self.assertEqual((self.post.hearts_count, self.post.wows_count), (0, 1))
+        self.assertEqual(PostReaction.objects.filter(post=self.post).count(), 1)
+
+    def test_counts_never_go_negative(self):
+        self.toggle(REACTION_BITS['laugh'])
+        Post.objects.filter(pk=self.post.pk).update(laughs_count=0)
+        self.toggle(REACTION_BITS['laugh'])
+        self.assertEqual(self.post.laughs_count, 0)
+
+
+class ReactionErrorTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f'/api/post/{make_post().pk}/reaction/'
+
+    def test_malformed_json_is_a_client_error(self):
+        response = self.client.post(self.url, '{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'success': False, 'error': views.INVALID_JSON_ERROR})
+
+    def test_unexpected_errors_are_logged_but_not_shown(self):
+        with mock.patch.object(views, 'toggle_reaction_mask', side_effect=DatabaseError('secret detail')), \
+                self.assertLogs('board.views', 'ERROR'):
+            response = self.post_json(self.url, {'reaction_type': 'heart'})
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn('secret detail', response.content.decode())
+
+
+class FlakyRedisLayer(InMemoryChannelLayer):
+    """down이면 모든 호출이 실패하고, hang이면 응답하지 않는 Redis 채널 레이어 대역"""
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+        self.hang = False
+        self.calls = Counter()
+
+    async def check(self, operation):
+        self.calls[operation] += 1
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.down:
+            raise ConnectionError('redis down')
+
+    async def send(self, channel, message):
+        await self.check('send')
+        await super().send(channel, message)
+
+    async def receive(self, channel):
+        await self.check('receive')
+        return await super().receive(channel)
+
+    async def group_add(self, group, channel):
+        await self.check('group_add')
+        await super().group_add(group, channel)
+
+    async def group_send(self, group, message):
+        await self.check('group_send')
+        await super().group_send(group, message)
+
+
+class ResilientChannelLayerTests(TestCase):
+    def setUp(self):
+        self.layer = ResilientChannelLayer(hosts=['redis://127.0.0.1:1/0'], timeout=0.05, reset_timeout=10)
+        self.addCleanup(LAYERS.remove, self.layer)
+        self.redis = self.layer.primary = FlakyRedisLayer()
+
+    def receive(self, channel):
+        return asyncio.wait_for(self.layer.receive(channel), 1)
+
+    async def test_redis_outage_falls_back_to_in_process_delivery(self):
+        self.redis.down = True
+        channel = await self.layer.new_channel()
+        with self.assertLogs('board.channel_layers', 'WARNING'):
+            await self.layer.group_add('posts', channel)
+            await self.layer.group_send('posts', {'type': 'post.new', 'n': 1})
+            self.assertEqual(await self.receive(channel), {'type': 'post.new', 'n': 1})
+        self.assertEqual(self.layer.breaker.state, OPEN)
+
+        # 서킷이 열린 동안에는 Redis를 호출하지 않고 바로 대체 전달
+        calls = sum(self.redis.calls.values())
+        await self.layer.send(channel, {'type': 'post.new', 'n': 2})
+        self.assertEqual(await self.receive(channel), {'type': 'post.new', 'n': 2})
+        self.assertEqual(sum(self.redis.calls.values()), calls)
+        self.assertGreaterEqual(self.layer.stats['fallback'], 3)
+
+    async def test_slow_redis_counts_as_a_failure(self):
+        self.redis.hang = True
+        channel = await self.layer.new_channel()
+        await self.layer.send(channel, {'type': 'ping'})
+        self.assertEqual(self.layer.stats['failure'], 1)
+        self.redis.hang = False
+        self.assertEqual(await self.receive(channel), {'type': 'ping'})
+
+    async def test_recovery_resubscribes_groups(self):
+        self.redis.down = True
+        channel = await self.layer.new_channel()
+        with self.assertLogs('board.channel_layers', 'WARNING'):
+            await self.layer.group_add('posts', channel)
+            for _ in range(2):
+                await self.layer.group_send('posts', {'type': 'post.new'})
+        self.assertEqual(self.layer.breaker.state, OPEN)
+        self.assertNotIn('posts', self.redis.groups)
+        # 장애 중 대체 전달된 메시지는 버려서 아래에서 Redis로 온 메시지만 받게 함
+        await self.layer.flush()
+
+        # reset_timeout이 지나고 Redis가 돌아옴: 시험 호출이 성공하면 그룹을 다시 등록
+        self.redis.down = False
+        self.layer.breaker.opened_at -= self.layer.breaker.reset_timeout
+        await self.layer.send(await self.layer.new_channel(), {'type': 'ping'})
+        self.assertEqual(self.layer.breaker.state, CLOSED)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        self.assertEqual(self.layer.stats['resubscribe'], 1)
+        self.assertIn(channel, self.redis.groups['posts'])
+
+        await self.layer.group_send('posts', {'type': 'post.new', 'n': 3})
+        self.assertEqual(await self.receive(channel), {'type': 'post.new', 'n': 3})
+        self.assertEqual(self.redis.calls['group_send'], 3)
+
+    def test_failed_trial_reopens_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        with self.assertLogs('board.channel_layers', 'WARNING'):
+            breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        breaker.opened_at -= 10
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        # 시험 호출 중에는 다른 호출을 막고, 실패하면 바로 다시 열림
+        self.assertFalse(breaker.allow())
+        with self.assertLogs('board.channel_layers', 'WARNING'):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.opened_at -= 10
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.record_success())
+        self.assertFalse(breaker.record_success())
+
+
+class UnixSocketChannelLayerTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_default_path_is_in_a_private_directory(self):
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': self.tmp.name}):
+            path = UnixSocketChannelLayer().path
+        self.assertEqual(os.path.dirname(path), os.path.join(self.tmp.name, 'anonymous_board'))
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+
+    def test_shared_runtime_directory_is_refused(self):
+        os.mkdir(os.path.join(self.tmp.name, 'anonymous_board'), 0o755)
+        os.chmod(os.path.join(self.tmp.name, 'anonymous_board'), 0o755)
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': self.tmp.name}):
+            with self.assertRaises(ImproperlyConfigured):
+                runtime_dir()
+
+    def test_group_send_through_hub(self):
+        layer = UnixSocketChannelLayer(path=os.path.join(self.tmp.name, 'hub.sock'))
+
+        async def exchange():
+            channel = await layer.new_channel()
+            await layer.group_add('readers', channel)
+            await layer.group_send('readers', {'type': 'hello', 'n': 1})
+            return await layer.receive(channel)
+
+        self.assertEqual(async_to_sync(exchange)(), {'type': 'hello', 'n': 1})
+
+
+class PreforkServerTests(TestCase):
+    def make_server(self, **options):
+        self.logs = []
+        return PreforkServer(None, '127.0.0.1', 0, workers=2, log=self.logs.append, **options)
+
+    def fork_child(self, ignore_term=False):
+        """SIGTERM을 받으면 끝나는(ignore_term이면 무시하는) 자식 프로세스"""
+        ready, signal_ready = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                if ignore_term:
+                    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+                os.write(signal_ready, b'1')
+                time.sleep(30)
+            finally:
+                os._exit(0)
+        os.close(signal_ready)
+        os.read(ready, 1)
+        os.close(ready)
+        return pid
+
+    def test_recycled_worker_is_replaced(self):
+        server = self.make_server()
+        respawn = mock.Mock()
+        server.workers = {101: (time.monotonic() - 60, respawn)}
+        with mock.patch('board.server.os.waitpid', side_effect=[(101, 0), (0, 0)]):
+            server.reap()
+        respawn.assert_called_once_with()
+        self.assertEqual(server.workers, {})
+        self.assertIn('워커 101 재활용', self.logs)
+
+    def test_worker_crashing_at_startup_is_respawned_after_a_backoff(self):
+        server = self.make_server()
+        respawn = mock.Mock()
+        server.workers = {101: (time.monotonic(), respawn)}
+        with mock.patch('board.server.os.waitpid', side_effect=[(101, 1 << 8), (0, 0)]), \
+                mock.patch('board.server.time.sleep') as sleep:
+            server.reap()
+        sleep.assert_called_once_with(RESPAWN_BACKOFF)
+        respawn.assert_called_once_with()
+        self.assertIn('워커 101 비정상 종료 (종료 코드 1)', self.logs)
+
+    def test_exited_workers_are_not_respawned_while_stopping(self):
+        server = self.make_server()
+        respawn = mock.Mock()
+        server.workers = {101: (time.monotonic() - 60, respawn)}
+        server.stopping = True
+        with mock.patch('board.server.os.waitpid', side_effect=[(101, 0), ChildProcessError]):
+            server.reap()
+        respawn.assert_not_called()
+
+    def test_dead_hub_is_restarted(self):
+        server = self.make_server()
+        server.hub_pid = 200
+        with mock.patch('board.server.os.waitpid', side_effect=[(200, 9), (0, 0)]), \
+                mock.patch.object(server, 'spawn_hub') as spawn_hub:
+            server.reap()
+        spawn_hub.assert_called_once_with()
+
+    def test_drain_waits_for_workers_then_kills_stragglers(self):
+        server = self.make_server(graceful_timeout=0)
+        graceful = self.fork_child()
+        stuck = self.fork_child(ignore_term=True)
+        server.workers = {graceful: (0, mock.Mock()), stuck: (0, mock.Mock())}
+        server.stopping = True
+        started = time.monotonic()
+        with mock.patch('board.server.KILL_GRACE', 0.5):
+            server.drain()
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(server.workers, {})
+        self.assertEqual(self.logs[1:], [f'워커 {stuck} 강제 종료'])
+        for pid in (graceful, stuck):
+            with self.assertRaises(ChildProcessError):
+                os.waitpid(pid, os.WNOHANG)
+
+    def test_max_requests_is_jittered_per_worker(self):
+        server = self.make_server(max_requests=100, max_requests_jitter=10, warmup=False)
+        server.socket = mock.Mock()
+        with mock.patch('board.server.random.randint', return_value=7) as randint, \
+                mock.patch('uvicorn.Server') as uvicorn_server:
+            uvicorn_server.return_value.serve = mock.AsyncMock()
+            asyncio.run(server.serve_worker())
+        randint.assert_called_once_with(0, 10)
+        config = uvicorn_server.call_args.args[0]
+        self.assertEqual(config.limit_max_requests, 107)
+        self.assertEqual(config.timeout_graceful_shutdown, 30)
+        uvicorn_server.return_value.serve.assert_awaited_once_with(sockets=[server.socket])
+
+
+class LocalTokenBucketTests(TestCase):
+    def allowed(self, buckets, requests):
+        return sum(1 for _ in range(requests) if not buckets.consume([('key', 20, 20 / 60)]))
+
+    def test_single_worker_gets_the_full_limit(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '1'}):
+            self.assertEqual(self.allowed(LocalTokenBuckets(), 30), 20)
+
+    def test_workers_split_the_limit(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual(self.allowed(LocalTokenBuckets(), 30), 5)
+
+
+class RateLimitTests(BoardTestCase):
+    def create_post(self):
+        return self.post_json('/api/post/create/', {'title': '제목', 'content': '내용'})
+
+    @override_settings(RATE_LIMITS={'create_post': {'ip': '1/m'}})
+    def test_exhausted_bucket_returns_429_with_retry_after(self):
+        self.assertEqual(self.create_post().status_code, 200)
+        response = self.create_post()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_requests_over_the_concurrency_limit_are_shed(self):
+        with mock.patch.object(concurrency_limiter, 'inflight', int(concurrency_limiter.limit)):
+            response = self.create_post()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(Post.objects.count(), 0)
+
+    @override_settings(RATE_LIMITS={'create_post': {'ip': '1/m'}}, RATE_LIMIT_REDIS_URL='redis://127.0.0.1:1/0')
+    def test_unreachable_redis_falls_back_to_local_buckets(self):
+        with mock.patch('board.ratelimit.redis_buckets', None), self.assertLogs('board.ratelimit', 'WARNING'):
+            self.assertEqual(self.create_post().status_code, 200)
+            self.assertEqual(self.create_post().status_code, 429)
+
+    def test_many_fast_queries_do_not_shrink_the_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(latency_threshold=0.25, initial_limit=16)
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(0.01)  # 쿼리 500개 x 10ms짜리 요청도 가장 느린 쿼리는 10ms
+        self.assertGreater(limiter.limit, 16)
+
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(1.0)
+        self.assertEqual(limiter.limit, limiter.min_limit)
+
+
+class PresenceTests(BoardTestCase):
+    def serve(self, workers):
+        err = StringIO()
+        with mock.patch('board.management.commands.serve.PreforkServer'):
+            call_command('serve', '--workers', str(workers), stdout=StringIO(), stderr=err)
+        return err.getvalue()
+
+    def test_post_detail_tells_the_client_which_post_is_read(self):
+        post = make_post()
+        response = self.client.get(f'/post/{post.pk}/')
+        self.assertContains(response, f'id="presence-reading" data-post-id="{post.id}"')
+        self.assertContains(response, 'id="presence-online"')
+
+    def hub_layer(self):
+        # 프로세스마다 허브는 하나이므로 이 테스트의 소켓으로 새 허브를 띄움
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch('board.channel_layers._hub', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return {'default': {
+            'BACKEND': 'board.channel_layers.UnixSocketChannelLayer',
+            'CONFIG': {'path': os.path.join(tmp.name, 'hub.sock')},
+        }}
+
+    @override_settings(PRESENCE_REDIS_URL=None)
+    def test_workers_share_counts_through_the_hub(self):
+        config = self.hub_layer()['default']
+        # 같은 허브 소켓에 붙은 두 워커
+        first = HubPresenceStore(UnixSocketChannelLayer(**config['CONFIG']))
+        second = HubPresenceStore(UnixSocketChannelLayer(**config['CONFIG']))
+        bucket = presence.current_bucket()
+        scope = presence.post_scope(uuid.uuid4())
+
+        first.exchange(bucket, {presence.BOARD_SCOPE: {'a', 'b'}, scope: {'a'}})
+        counts = second.exchange(bucket, {presence.BOARD_SCOPE: {'b', 'c'}, scope: {'c'}})
+        self.assertEqual(counts, {presence.BOARD_SCOPE: 3, scope: 2})
+        self.assertEqual(first.count([presence.BOARD_SCOPE, scope], bucket), {presence.BOARD_SCOPE: 3, scope: 2})
+
+        # 직전 버킷까지만 셈: 다음 주기에 하트비트가 없던 방문자는 그다음 주기에 빠짐
+        second.exchange(bucket + 1, {presence.BOARD_SCOPE: {'c'}})
+        self.assertEqual(second.exchange(bucket + 2, {presence.BOARD_SCOPE: {'c'}}), {presence.BOARD_SCOPE: 1})
+
+        with override_settings(CHANNEL_LAYERS=self.hub_layer()):
+            self.assertTrue(presence.is_shared())
+            self.assertIsInstance(presence.get_store(), HubPresenceStore)
+            self.assertEqual(self.serve(2), '')
+
+    @override_settings(PRESENCE_REDIS_URL=None)
+    def test_serve_warns_that_local_counts_are_per_worker(self):
+        self.assertFalse(presence.is_shared())
+        self.assertIn('PRESENCE_REDIS_URL', self.serve(2))
+        self.assertEqual(self.serve(1), '')
+
+    @override_settings(PRESENCE_REDIS_URL='redis://localhost:6379/0')
+    def test_serve_does_not_warn_with_redis(self):
+        self.assertEqual(self.serve(2), '')
+
+
+class MyReactionsTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = make_post()
+
+    def toggle(self, reaction_type):
+        return self.post_json(f'/api/post/{self.post.pk}/reaction/', {'reaction_type': reaction_type}).json()
+
+    def mine(self):
+        response = self.client.get('/api/reactions/mine/', {'post_ids': str(self.post.pk)})
+        return response.json()['posts'].get(str(self.post.pk), [])
+
+    def test_cached_mask_follows_toggles(self):
+        self.toggle('heart')
+        self.assertEqual(self.mine(), ['heart'])
+        self.toggle('wow')
+        self.assertEqual(self.mine(), ['heart', 'wow'])
+        self.toggle('heart')
+        self.assertEqual(self.mine(), ['wow'])
+
+    def test_toggle_invalidates_other_workers(self):
+        self.toggle('sad')
+        self.mine()
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(INVALIDATION_GROUP, channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.toggle('sad')
+        message = async_to_sync(layer.receive)(channel)
+        self.assertEqual(message['keyspace'], 'my_reactions')
+        # 다른 워커가 같은 메시지를 받으면 지난 비트마스크를 버린다.
+        apply_invalidation(message)
+        self.assertEqual(self.mine(), [])
+
+
+class ReactionBatchTests(BoardTestCase):
+    def send(self, *toggles):
+        return self.post_json('/api/reactions/batch/', {'toggles': [
+            {'target_type': target_type, 'target_id': str(target.pk), 'reaction_type': reaction_type}
+            for target_type, target, reaction_type in toggles
+        ]})
+
+    def batch(self, *toggles):
+        return self.send(*toggles).json()
+
+    def test_mixed_new_and_existing_rows(self):
+        posts = [make_post() for _ in range(3)]
+        self.batch(('post', posts[0], 'heart'), ('post', posts[1], 'wow'))
+        result = self.batch(('post', posts[0], 'heart'), ('post', posts[1], 'sad'), ('post', posts[2], 'laugh'))
+        self.assertEqual([result['posts'][str(post.pk)]['reactions'] for post in posts], [[], ['wow', 'sad'], ['laugh']])
+        self.assertEqual(
+            [(post.hearts_count, post.wows_count, post.sads_count, post.laughs_count)
+             for post in Post.objects.filter(pk__in=[post.pk for post in posts]).order_by('pk')],
+            [(0, 0, 0, 0), (0, 1, 1, 0), (0, 0, 0, 1)],
+        )
+
+    @override_settings(RATE_LIMITS={'reaction': {'ip': '10/m'}})
+    def test_batch_is_charged_per_reaction(self):
+        posts = [make_post() for _ in range(6)]
+        self.assertEqual(self.send(*[('post', post, 'heart') for post in posts]).status_code, 200)
+        response = self.send(*[('post', post, 'wow') for post in posts])
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+    def test_repeated_toggles_cancel_out(self):
+        post = make_post()
+        result = self.batch(('post', post, 'heart'), ('post', post, 'wow'), ('post', post, 'heart'))
+        self.assertEqual(result['posts'][str(post.pk)]['reactions'], ['wow'])
+        post.refresh_from_db()
+        self.assertEqual((post.hearts_count, post.wows_count), (0, 1))
+        self.assertEqual(PostReaction.objects.get(post=post).reactions, 4)
+
+    def test_toggling_off_decrements_counts(self):
+        post = make_post()
+        comment = make_comment(post)
+        self.batch(('post', post, 'laugh'), ('comment', comment, 'sad'))
+        result = self.batch(('post', post, 'laugh'), ('comment', comment, 'sad'))
+        self.assertEqual(result['posts'][str(post.pk)], {
+            'counts': {'heart': 0, 'laugh': 0, 'wow': 0, 'sad': 0}, 'reactions': [],
+        })
+        comment.refresh_from_db()
+        self.assertEqual(comment.sads_count, 0)
+
+    def test_deleted_posts_and_their_comments_are_skipped(self):
+        post = make_post(is_deleted=True)
+        comment = make_comment(post)
+        result = self.batch(('post', post, 'heart'), ('comment', comment, 'heart'))
+        self.assertEqual((result['posts'], result['comments']), ({}, {}))
+        post.refresh_from_db()
+        comment.refresh_from_db()
+        self.assertEqual((post.hearts_count, comment.hearts_count), (0, 0))
+
+    def test_single_comment_toggle_rejects_deleted_post(self):
+        comment = make_comment(make_post(is_deleted=True))
+        response = self.post_json(f'/api/comment/{comment.pk}/reaction/', {'reaction_type': 'heart'})
+        self.assertEqual(response.status_code, 404)
+
+
+class HotRankingTests(BoardTestCase):
+    def create_post(self, title):
+        response = self.post_json('/api/post/create/', {'title': title, 'content': '내용'})
+        return Post.objects.get(pk=response.json()['post_id'])
+
+    def test_writes_bump_the_score_incrementally(self):
+        post = self.create_post('새 글')
+        self.assertEqual(post.hot_score, hot_weight('post'))
+
+        self.client.get(f'/post/{post.pk}/')
+        self.post_json(f'/api/post/{post.pk}/reaction/', {'reaction_type': 'heart'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_json(f'/api/post/{post.pk}/comment/', {'content': '댓글'})
+        JobWorker().run_once()
+
+        post.refresh_from_db()
+        self.assertEqual(
+            post.hot_score,
+            hot_weight('post') + hot_weight('view') + hot_weight('reaction') + hot_weight('comment'),
+        )
+
+    @override_settings(HOT_SCORE_HALF_LIFE_HOURS=12)
+    def test_decay_halves_per_half_life_and_drops_tiny_scores(self):
+        post = make_post(hot_score=8.0)
+        tiny = make_post(hot_score=0.015)
+        self.assertEqual(decay_hot_scores(12), 2)
+        post.refresh_from_db()
+        tiny.refresh_from_db()
+        self.assertAlmostEqual(post.hot_score, 4.0)
+        self.assertEqual(tiny.hot_score, 0)
+
+    def test_rebuild_matches_counts(self):
+        post = make_post(view_count=3, hearts_count=2)
+        make_comment(post)
+        rebuild_hot_scores()
+        post.refresh_from_db()
+        expected = hot_weight('post') + 3 * hot_weight('view') + 2 * hot_weight('reaction') + hot_weight('comment')
+        self.assertAlmostEqual(post.hot_score, expected, places=3)
+
+    def test_sort_hot_and_trending_skip_deleted_posts(self):
+        quiet = make_post(title='조용한 글', hot_score=1)
+        busy = make_post(title='인기 글', hot_score=50)
+        make_post(title='삭제된 글', hot_score=100, is_deleted=True)
+
+        page = self.client.get('/', {'sort': 'hot'}).context['page_obj']
+        self.assertEqual([post.pk for post in page], [busy.pk, quiet.pk])
+        self.assertEqual([post.pk for post in trending_posts()], [busy.pk, quiet.pk])
+
+    def test_deleting_a_post_clears_the_trending_cache(self):
+        post = make_post(hot_score=10)
+        self.assertEqual([trending.pk for trending in trending_posts()], [post.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_json(f'/api/post/{post.pk}/delete/', {})
+        JobWorker().run_once()
+        self.assertEqual(trending_posts(), [])
+
+
+class ArchiveTests(BoardTestCase):
+    def make_reactions(self, post, comment, visitors):
+        for i in range(visitors):
+            visitor = Visitor.objects.create(session_key=f'visitor{i}'.ljust(32, 'x'))
+            PostReaction.objects.create(post=post, visitor=visitor, reactions=REACTION_BITS['heart'])
+            CommentReaction.objects.create(comment=comment, visitor=visitor, reactions=REACTION_BITS['sad'])
+
+    def test_deleted_post_moves_after_grace_period(self):
+        post = make_post(is_deleted=True, deleted_at=timezone.now() - timedelta(days=40))
+        comment = make_comment(post)
+        self.make_reactions(post, comment, 2)
+        recent = make_post(is_deleted=True, deleted_at=timezone.now() - timedelta(days=5))
+
+        self.assertEqual(archive_posts(grace_days=30), (1, 1))
+        self.assertEqual(list(Post.objects.values_list('pk', flat=True)), [recent.pk])
+        archived = ArchivedPost.objects.get(pk=post.pk)
+        # 저장된 카운트가 아니라 반응 행에서 접은 최종 카운트
+        self.assertEqual((archived.hearts_count, archived.is_deleted), (2, True))
+        self.assertEqual(ArchivedComment.objects.get(pk=comment.pk).sads_count, 2)
+        self.assertFalse(PostReaction.objects.exists())
+        self.assertFalse(CommentReaction.objects.exists())
+
+    def test_archived_post_is_read_only(self):
+        post = make_post()
+        make_comment(post)
+        Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(days=400))
+        # 존재 확인 캐시를 채워 둔 뒤 보관
+        self.post_json(f'/api/post/{post.pk}/reaction/', {'reaction_type': 'heart'})
+        archive_posts(grace_days=30, older_than_days=365)
+
+        response = self.client.get(f'/post/{post.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_archived'])
+        self.assertEqual(response.context['comment_count'], 1)
+        response = self.post_json(f'/api/post/{post.pk}/reaction/', {'reaction_type': 'heart'})
+        self.assertEqual(response.status_code, 404)
+
+
+class EstimatedCountPaginatorTests(BoardTestCase):
+    def test_sqlite_count_is_exact_and_reused(self):
+        for _ in range(3):
+            make_post()
+        make_post(is_deleted=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).count, 4)
+        make_post()
+        # 캐시된 동안은 같은 목록의 COUNT를 다시 실행하지 않음
+        with self.assertNumQueries(0):
+            self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).num_pages, 2)
+        # 조건이 다른 목록은 따로 셈
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Post.objects.filter(is_deleted=True), 2).count, 1)
+        cache.clear()
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).count, 5)
+
+    def test_pages_past_the_old_cap_are_reachable(self):
+        Post.objects.bulk_create([Post(title=f'글{n}', content='내용') for n in range(30)])
+        with mock.patch('board.pagination.COUNT_CAP', 10):
+            paginator = EstimatedCountPaginator(Post.objects.order_by('title'), 10)
+            self.assertEqual(paginator.num_pages, 3)
+            self.assertEqual(len(paginator.page(3)), 10)
+
+
+class PostDetailStreamingTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = make_post(title='긴 스레드')
+        Comment.objects.bulk_create([Comment(post=self.post, content=f'댓글{n:03}') for n in range(250)])
+        self.url = f'/post/{self.post.pk}/?stream=1'
+
+    async def test_asgi_sends_the_head_before_reading_comments(self):
+        with mock.patch('board.views.islice', wraps=islice) as chunk_reads, \
+                mock.patch('board.metrics.db_queries.observe') as observe:
+            response = await self.async_client.get(self.url)
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+
+            head = (await anext(chunks)).decode()
+            self.assertIn('긴 스레드', head)
+            self.assertNotIn('댓글000', head)
+            self.assertEqual(chunk_reads.call_count, 0)
+
+            first = (await anext(chunks)).decode()
+            self.assertIn('댓글000', first)
+            self.assertNotIn('댓글100', first)
+            self.assertEqual(chunk_reads.call_count, 1)
+
+            observe.assert_not_called()
+            rest = [chunk.decode() async for chunk in chunks]
+        self.assertEqual(len(rest), 3)  # 댓글 100개 + 50개 묶음과 꼬리
+        self.assertIn('댓글249', rest[1])
+        # 본문에서 읽은 댓글 쿼리까지 센 값은 본문을 다 보낸 뒤 한 번 기록
+        with mock.patch('board.metrics.db_queries.observe') as sync_observe:
+            await sync_to_async(lambda: b''.join(self.client.get(self.url).streaming_content))()
+        observe.assert_called_once_with(*sync_observe.call_args.args)
+
+    def test_streamed_queries_are_recorded(self):
+        with mock.patch('board.metrics.db_queries.observe') as observe:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+                self.assertFalse(response.is_async)
+                observe.assert_not_called()
+                body = b''.join(response.streaming_content).decode()
+        self.assertIn('댓글249', body)
+        observe.assert_called_once_with(('board:post_detail',), len(queries))
+        self.assertTrue(any('board_comment' in query['sql'] and 'LIMIT' not in query['sql'] for query in queries))
+
+
+class PostExcerptTests(BoardTestCase):
+    def test_excerpt_matches_the_old_template_filter(self):
+        content = ' '.join(f'단어{n}' for n in range(40))
+        post = make_post(content=content)
+        self.assertEqual(post.excerpt, Template('{{ content|truncatewords:30 }}').render(Context({'content': content})))
+        self.assertLessEqual(len(make_post(content='가' * 1000).excerpt), 300)
+
+    def test_excerpt_follows_content_updates(self):
+        post = make_post(content='처음 내용')
+        post.content = '바뀐 내용'
+        post.save(update_fields=['content'])
+        post.title = '새 제목'
+        Post.objects.filter(pk=post.pk).update(excerpt='그대로')
+        post.save(update_fields=['title'])
+        self.assertEqual(Post.objects.get(pk=post.pk).excerpt, '그대로')
+
+        post.save(update_fields=['content'])
+        self.assertEqual(Post.objects.get(pk=post.pk).excerpt, '바뀐 내용')
+
+    def test_list_reads_only_card_columns(self):
+        make_post(content='본문 ' * 100)
+        response = self.client.get('/')
+        post = response.context['page_obj'][0]
+        self.assertIn('content', post.get_deferred_fields())
+        self.assertIn('content_html', post.get_deferred_fields())
+        self.assertContains(response, post.excerpt)
+
+
+class RenderedBodyTests(BoardTestCase):
+    def test_body_is_escaped_and_rendered_on_save(self):
+        post = make_post(content='<b>굵게</b>\n\n둘째 문단')
+        self.assertEqual(post.content_html, '<p>&lt;b&gt;굵게&lt;/b&gt;</p>\n\n<p>둘째 문단</p>')
+        self.assertEqual(post.content_render_version, RENDERER_VERSION)
+
+        comment = make_comment(post, content='한 줄\n다음 줄')
+        comment.content = '고친 댓글'
+        comment.save(update_fields=['content'])
+        self.assertEqual(Comment.objects.get(pk=comment.pk).content_html, '<p>고친 댓글</p>')
+
+    def test_stale_rows_render_on_the_fly_until_backfilled(self):
+        post = make_post(content='새 렌더러')
+        Post.objects.filter(pk=post.pk).update(content_html='<p>옛 HTML</p>', content_render_version=0)
+        post.refresh_from_db()
+        self.assertEqual(post.rendered_content, '<p>새 렌더러</p>')
+        self.assertContains(self.client.get(f'/post/{post.pk}/'), '<p>새 렌더러</p>')
+
+        call_command('render_bodies', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.content_html, post.content_render_version), ('<p>새 렌더러</p>', RENDERER_VERSION))
+
+    def test_detail_page_outputs_stored_html(self):
+        post = make_post(content='원문')
+        Post.objects.filter(pk=post.pk).update(content_html='<p>저장된 HTML</p>')
+        self.assertContains(self.client.get(f'/post/{post.pk}/'), '<p>저장된 HTML</p>')
+
+
+class FragmentResponseTests(BoardTestCase):
+    def test_create_post_returns_the_list_card(self):
+        result = self.post_json('/api/post/create/', {
+            'title': '<새 글>', 'content': '내용', 'author_nickname': '작성자', 'fragment': True,
+        }).json()
+        self.assertIn(f'data-post-id="{result["post_id"]}"', result['html'])
+        self.assertIn('&lt;새 글&gt;', result['html'])
+        self.assertIn(f'/post/{result["post_id"]}/', result['html'])
+
+    def test_fragment_is_only_rendered_on_request(self):
+        result = self.post_json('/api/post/create/', {'title': '제목', 'content': '내용'}).json()
+        self.assertTrue(result['success'])
+        self.assertNotIn('html', result)
+
+    def test_create_comment_returns_the_comment_and_new_count(self):
+        post = make_post()
+        make_comment(post)
+        result = self.post_json(f'/api/post/{post.pk}/comment/', {
+            'content': '<script>댓글</script>', 'fragment': True,
+        }).json()
+        self.assertEqual(result['comment_count'], 2)
+        self.assertIn('<p>&lt;script&gt;댓글&lt;/script&gt;</p>', result['html'])
+        self.assertIn('comment-item', result['html'])
+
+
+class PerformanceMetricsTests(BoardTestCase):
+    def test_server_timing_reports_the_request_queries(self):
+        make_post()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/')
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_requests_are_recorded_per_view(self):
+        with mock.patch('board.metrics.request_duration.observe') as observe:
+            self.client.get('/')
+            self.client.get(f'/post/{uuid.uuid4()}/')
+        self.assertEqual([call.args[0] for call in observe.call_args_list], [('board:index',), ('board:post_detail',)])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_seconds', '테스트', ('view',), (0.1, 1.0))
+        histogram.observe(('a',), 0.05)
+        histogram.observe(('a',), 0.5)
+        histogram.observe(('a',), 5.0)
+        self.assertEqual(histogram.expose()[2:], [
+            'test_seconds_bucket{view="a",le="0.1"} 1',
+            'test_seconds_bucket{view="a",le="1.0"} 2',
+            'test_seconds_bucket{view="a",le="+Inf"} 3',
+            'test_seconds_sum{view="a"} 5.55',
+            'test_seconds_count{view="a"} 3',
+        ])
+
+    @override_settings(DEBUG=False, METRICS_TOKEN=None)
+    def test_metrics_are_closed_without_a_token_in_production(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_require_the_bearer_token(self):
+        self.client.get('/')
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE board_request_duration_seconds histogram', body)
+        self.assertIn('board_db_queries_count{view="board:index"}', body)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = self.settings(PROFILE_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(profiling.profile_writer.drain)
+        self.addCleanup(profiling.stop_window)
+
+    def other_worker(self):
+        worker = profiling.WindowProfiler()
+        self.addCleanup(worker.finish)
+        return worker
+
+    def test_profiles_are_written_off_the_request_thread(self):
+        writers = []
+        original = profiling.write_file
+        with mock.patch('board.profiling.write_file', side_effect=lambda *args: (
+            writers.append(threading.current_thread().name), original(*args),
+        )):
+            path = profiling.write_profile('board:index', Counter({'a;b': 3, 'a': 1}))
+            profiling.profile_writer.drain()
+        self.assertEqual(writers, ['board-profile-writer'])
+        self.assertEqual(profiling.read_profile(path), Counter({'a;b': 3, 'a': 1}))
+
+    @override_settings(PROFILE_MAX_FILES=2)
+    def test_old_profiles_are_pruned(self):
+        paths = [profiling.write_profile(f'p{n}', Counter({'a': 1})) for n in range(4)]
+        profiling.profile_writer.drain()
+        self.assertEqual(profiling.list_profiles(), paths[:-3:-1])
+
+    def test_window_flag_is_shared_through_the_profile_dir_without_redis(self):
+        out = StringIO()
+        call_command('profiles', 'start', '--seconds', '30', stdout=out)
+        self.assertIn(str(profiling.window_flag_path()), out.getvalue())
+
+        # 다른 워커(다른 프로세스의 LocMem 캐시)도 플래그 파일로 구간을 본다.
+        worker = self.other_worker()
+        worker.poll()
+        self.assertIsNotNone(worker.sampler)
+        self.assertIsNotNone(profiling.window_until())
+
+        call_command('profiles', 'stop', stdout=StringIO())
+        self.assertFalse(profiling.window_flag_path().exists())
+        worker.next_check = 0.0
+        worker.poll()
+        self.assertIsNone(worker.sampler)
+        self.assertIsNone(profiling.window_until())
+
+    def test_window_flag_uses_a_shared_cache(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(self.tmp.name, 'cache'),
+        }}):
+            until = profiling.start_window(30)
+            self.assertFalse(profiling.window_flag_path().exists())
+            self.assertEqual(profiling.window_until(), until)
+            worker = self.other_worker()
+            worker.poll()
+            self.assertIsNotNone(worker.sampler)
+            profiling.stop_window()
+            self.assertIsNone(profiling.window_until())
+
+
+class ReconcileCountersTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = make_post()
+        for i, mask in enumerate((REACTION_BITS['heart'], REACTION_BITS['heart'] | REACTION_BITS['wow'])):
+            visitor = Visitor.objects.create(session_key=f'visitor{i}'.ljust(32, 'x'))
+            PostReaction.objects.create(post=self.post, visitor=visitor, reactions=mask)
+        Post.objects.filter(pk=self.post.pk).update(hearts_count=5, wows_count=1, sads_count=3)
+        make_post()
+
+    def test_dry_run_reports_drift_only(self):
+        report = reconcile_counters(Post, chunk_size=1, apply=False)
+        self.assertEqual((report.scanned, report.drifted, report.fixed), (2, 1, 0))
+        self.assertEqual(report.net_by_field['hearts_count'], -3)
+        self.assertEqual(report.net_by_field['sads_count'], -3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.hearts_count, 5)
+
+    def test_drifted_counts_are_fixed(self):
+        report = reconcile_counters(Post)
+        self.assertEqual(report.fixed, 1)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.hearts_count, self.post.wows_count, self.post.sads_count), (2, 1, 0))
+        self.assertEqual(reconcile_counters(Post).drifted, 0)
+
+
+class JobQueueTests(BoardTestCase):
+    def setUp(self):
+        super().setUp()
+        self.worker = JobWorker()
+
+    def test_bad_payload_does_not_fail_its_batch(self):
+        post = make_post()
+        Job.objects.create(kind='hot_score', payload={'post_id': str(post.pk), 'event': 'comment'})
+        bad = Job.objects.create(kind='hot_score', payload={'bad': 1})
+        Job.objects.create(kind='hot_score', payload={'post_id': str(post.pk), 'event': 'comment'})
+
+        with self.assertLogs('board.jobs', 'WARNING'):
+            self.worker.run_once()
+
+        self.assertEqual((self.worker.processed['hot_score'], self.worker.failed['hot_score']), (2, 1))
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [bad.pk])
+        post.refresh_from_db()
+        self.assertGreater(post.hot_score, 0)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = Job.objects.create(kind='hot_score', payload={'bad': 1})
+        with self.assertLogs('board.jobs', 'WARNING'):
+            self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIsNone(job.locked_by)
+        self.assertIsNone(job.failed_at)
+        self.assertIn('KeyError', job.last_error)
+        # 백오프 동안은 다시 점유되지 않는다.
+        self.assertEqual(self.worker.run_once(), 0)
+
+    def test_job_is_dead_after_max_attempts(self):
+        job = Job.objects.create(kind='hot_score', payload={'bad': 1}, attempts=MAX_ATTEMPTS - 1)
+        with self.assertLogs('board.jobs', 'WARNING'):
+            self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+        self.assertIsNotNone(job.failed_at)
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(self.worker.run_once(), 0)
+
+    def broadcast_job(self, n):
+        return Job.objects.create(kind='broadcast', payload={
+            'update_type': 'new_post', 'message': '새 글', 'data': {'post_id': str(uuid.uuid4()), 'n': n},
+        })
+
+    def test_broadcasts_sent_before_a_failure_are_not_resent(self):
+        jobs = [self.broadcast_job(n) for n in range(3)]
+        layer = mock.Mock(group_send=mock.AsyncMock(side_effect=[None, ConnectionError('down'), None]))
+        with mock.patch('board.jobs.get_channel_layer', return_value=layer), \
+                self.assertLogs('board.jobs', 'WARNING'):
+            self.worker.run_once()
+        sent = [call.args[1]['data']['n'] for call in layer.group_send.call_args_list]
+        self.assertEqual(sent, [0, 1, 2])
+        self.assertEqual((self.worker.processed['broadcast'], self.worker.failed['broadcast']), (2, 1))
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [jobs[1].pk])
+        self.assertIn('ConnectionError', Job.objects.get().last_error)
+
+    def test_retried_jobs_are_removed_before_the_next_one_runs(self):
+        good = Job.objects.create(kind='hot_score', payload={'n': 1})
+        bad = Job.objects.create(kind='hot_score', payload={'n': 2})
+        seen = []
+
+        def handler(payloads):
+            seen.append([payload['n'] for payload in payloads])
+            if payloads == [bad.payload]:
+                # 앞에서 성공한 작업은 이미 지워져 워커가 여기서 죽어도 다시 실행되지 않음
+                self.assertFalse(Job.objects.filter(pk=good.pk).exists())
+            if bad.payload in payloads:
+                raise ValueError('bad')
+
+        with mock.patch.dict('board.jobs.HANDLERS', {'hot_score': handler}), \
+                self.assertLogs('board.jobs', 'WARNING'):
+            self.worker.run_once()
+        self.assertEqual(seen, [[1, 2], [1], [2]])
+        self.assertEqual(list(Job.objects.values_list('pk', flat=True)), [bad.pk])
+
+    @override_settings(JOB_QUEUE_INLINE=True)
+    def test_inline_mode_runs_jobs_after_commit(self):
+        post = make_post()
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(('hot_score', {'post_id': str(post.pk), 'event': 'comment'}))
+            self.assertEqual(Post.objects.get(pk=post.pk).hot_score, 0)
+        self.assertGreater(Post.objects.get(pk=post.pk).hot_score, 0)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_QUEUE_INLINE=True)
+    def test_inline_mode_queues_only_what_failed(self):
+        layer = mock.Mock(group_send=mock.AsyncMock(side_effect=[None, ConnectionError('down')]))
+        payloads = [{'update_type': 'new_post', 'message': '새 글', 'data': {'post_id': str(uuid.uuid4()), 'n': n}}
+                    for n in range(3)]
+        with mock.patch('board.jobs.get_channel_layer', return_value=layer), \
+                self.assertLogs('board.jobs', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            enqueue(*[('broadcast', payload) for payload in payloads])
+        self.assertEqual([job.payload['data']['n'] for job in Job.objects.order_by('id')], [1, 2])
+
+    def test_enqueue_after_commit_logs_insert_errors(self):
+        with mock.patch('board.jobs.insert_jobs', side_effect=DatabaseError('down')):
+            with self.assertLogs('board.jobs', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    enqueue(('invalidate_trending', {}))
+
+    def test_rolled_back_writes_enqueue_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                enqueue(('invalidate_trending', {}))
+                raise DatabaseError('rollback')
+            enqueue(('invalidate_trending', {}))
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class ActivityRollupTests(BoardTestCase):
+    def test_recorded_events_reach_the_hour_row(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record('posts')
+            record('hearts', 2)
+        activity_buffer.flush()
+        JobWorker().run_once()
+        row = HourlyActivity.objects.get()
+        self.assertEqual((row.posts, row.hearts, row.views), (1, 2, 0))
+
+    def test_rolled_back_writes_are_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                record('comments')
+                raise ValueError
+        self.assertEqual(activity_buffer.take(), {})
+
+    def test_deltas_from_several_processes_are_merged(self):
+        hour = hour_start(timezone.now()).isoformat()
+        apply_deltas([{'deltas': {hour: {'views': 2}}}, {'deltas': {hour: {'views': 3, 'posts': 1}}}])
+        apply_deltas([{'deltas': {hour: {'views': 1}}}])
+        row = HourlyActivity.objects.get()
+        self.assertEqual((row.views, row.posts), (6, 1))
+
+    def test_backfill_recounts_posts_and_comments_only(self):
+        hour = hour_start(timezone.now() - timedelta(days=2))
+        post = make_post()
+        make_comment(post)
+        Post.objects.filter(pk=post.pk).update(created_at=hour + timedelta(minutes=5))
+        Comment.objects.filter(post=post).update(created_at=hour + timedelta(minutes=7))
+        ArchivedPost.objects.create(
+            id=uuid.uuid4(), title='보관', content='x', author_nickname='익명', created_at=hour + timedelta(minutes=9),
+        )
+        HourlyActivity.objects.create(hour=hour, posts=9, views=7)
+        HourlyActivity.objects.create(hour=hour - timedelta(hours=1), posts=4)
+
+        self.assertEqual(backfill(), 1)
+        row = HourlyActivity.objects.get(hour=hour)
+        self.assertEqual((row.posts, row.comments, row.views), (2, 1, 7))
+        self.assertEqual(HourlyActivity.objects.get(hour=hour - timedelta(hours=1)).posts, 0)
+
+    def test_stats_endpoint(self):
+        now = timezone.now()
+        busy = hour_start(now - timedelta(hours=2))
+        HourlyActivity.objects.create(hour=busy, posts=1, hearts=3)
+        HourlyActivity.objects.create(hour=hour_start(now - timedelta(hours=1)), comments=2, views=10)
+
+        data = self.client.get('/api/stats/activity/').json()
+        self.assertEqual(len(data['series']), 2)
+        self.assertEqual(
+            (data['totals']['posts'], data['totals']['comments'], data['totals']['hearts'], data['totals']['views']),
+            (1, 2, 3, 10),
+        )
+        self.assertEqual(data['top_hours'][0], {'hour': timezone.localtime(busy).hour, 'activity': 4})
+
+    def test_stats_endpoint_rejects_bad_ranges(self):
+        for query in ({'bucket': 'week'}, {'start': 'yesterday'}, {'start': '2026-01-01', 'end': '2026-03-01'}):
+            self.assertEqual(self.client.get('/api/stats/activity/', query).status_code, 400)
+
+
+class QueryBudgetTests(BoardTestCase):
+    """뷰에 선언된 쿼리 예산 고정 (첫 방문의 세션 / 방문자 생성과 커밋 후 작업 등록까지 포함)"""
+
+    def setUp(self):
+        super().setUp()
+        self.post = make_post()
+        self.comment = make_comment(self.post)
+
+    def assert_within_budget(self, view, request):
+        with assert_query_budget(view.query_budget, view.query_budget_allow_repeats):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = request()
+        self.assertLess(response.status_code, 400)
+        return response
+
+    def test_index(self):
+        self.assert_within_budget(views.index, lambda: self.client.get('/'))
+        self.assert_within_budget(views.index, lambda: self.client.get('/', {'sort': 'hot', 'search': '제목'}))
+
+    def test_post_detail(self):
+        for _ in range(10):
+            make_comment(self.post)
+        self.assert_within_budget(views.post_detail, lambda: self.client.get(f'/post/{self.post.pk}/'))
+
+    def test_create_post(self):
+        self.assert_within_budget(views.create_post, lambda: self.post_json(
+            '/api/post/create/', {'title': '새 글', 'content': '내용'},
+        ))
+
+    def test_create_comment(self):
+        self.assert_within_budget(views.create_comment, lambda: self.post_json(
+            f'/api/post/{self.post.pk}/comment/', {'content': '새 댓글'},
+        ))
+
+    def test_reaction_toggles_for_new_and_returning_visitors(self):
+        for _ in range(2):
+            self.assert_within_budget(views.toggle_post_reaction, lambda: self.post_json(
+                f'/api/post/{self.post.pk}/reaction/', {'reaction_type': 'heart'},
+            ))
+            self.assert_within_budget(views.toggle_comment_reaction, lambda: self.post_json(
+                f'/api/comment/{self.comment.pk}/reaction/', {'reaction_type': 'wow'},
+            ))
+            self.client.cookies.clear()
+
+    @override_settings(RATE_LIMITS={})
+    def test_reaction_batch(self):
+        # 새 행과 기존 행이 섞인 최대 크기 묶음도 대상 수와 무관한 쿼리 수
+        posts = [make_post() for _ in range(50)]
+        comments = [make_comment(self.post) for _ in range(50)]
+        toggles = [('post', post) for post in posts] + [('comment', comment) for comment in comments]
+        for reaction_type in ('laugh', 'laugh', 'wow'):
+            self.assert_within_budget(views.toggle_reactions_batch, lambda: self.post_json('/api/reactions/batch/', {
+                'toggles': [
+                    {'target_type': target_type, 'target_id': str(target.pk), 'reaction_type': reaction_type}
+                    for target_type, target in toggles
+                ],
+            }))
+
+    def test_my_reactions(self):
+        self.post_json(f'/api/post/{self.post.pk}/reaction/', {'reaction_type': 'heart'})
+        self.assert_within_budget(views.my_reactions, lambda: self.client.get('/api/reactions/mine/', {
+            'post_ids': str(self.post.pk), 'comment_ids': str(self.comment.pk),
+        }))
+
+    def test_delete_post(self):
+        self.assert_within_budget(views.delete_post, lambda: self.post_json(f'/api/post/{self.post.pk}/delete/', {}))
+
+    def test_check_updates(self):
+        self.assert_within_budget(views.check_updates, lambda: self.client.get('/api/updates/'))
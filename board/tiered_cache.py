@@ -0,0 +1,242 @@
+"""
+2단계 캐시 (프로세스 로컬 LRU + 공유 캐시)
+
+- L1: 워커 프로세스 안의 크기 제한 LRU (짧은 TTL)
+- L2: Django 기본 캐시 (프로덕션에서는 Redis)
+- 무효화: 쓰기 트랜잭션이 커밋된 뒤 채널 레이어 그룹으로 모든 워커에 알려 L1 항목을 버린다.
+  메시지를 놓치더라도 L1 TTL이 지나면 L2에서 다시 읽는다.
+  L2가 프로세스 로컬(LocMemCache, REDIS_URL 없는 배포)이면 받은 워커가 L2 항목도 버린다.
+- 키 공간별 적중/미스/축출/무효화 횟수는 /metrics에 노출
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+from .metrics import CounterFamily, register
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_GROUP = 'cache_invalidation'
+GROUP_REJOIN_INTERVAL = 600  # 초
+LISTENER_RETRY_DELAY = 5  # 초
+MISSING = object()
+
+
+class LRUCache:
+    """크기 제한과 TTL이 있는 스레드 안전 LRU"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """값 반환 (없거나 만료되면 MISSING)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return MISSING
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """저장 / 반환값: 크기 제한으로 밀려난 항목 수"""
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            evicted = 0
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TieredCache:
+    """키 공간 하나의 2단계 캐시"""
+
+    def __init__(self, keyspace, l1_max_entries=1000, l1_ttl=5, l2_ttl=300):
+        self.keyspace = keyspace
+        self.l1 = LRUCache(l1_max_entries, l1_ttl)
+        self.l2_ttl = l2_ttl
+        self.stats = Counter()
+        KEYSPACES[keyspace] = self
+
+    def l2_key(self, key):
+        return f'tiered:{self.keyspace}:{key}'
+
+    def get(self, key, default=None):
+        value = self.l1.get(key)
+        if value is not MISSING:
+            self.stats['l1_hit'] += 1
+            return value
+
+        value = cache.get(self.l2_key(key), MISSING)
+        if value is MISSING:
+            self.stats['miss'] += 1
+            return default
+        self.stats['l2_hit'] += 1
+        self.stats['eviction'] += self.l1.set(key, value)
+        return value
+
+    def set(self, key, value):
+        cache.set(self.l2_key(key), value, self.l2_ttl)
+        self.stats['eviction'] += self.l1.set(key, value)
+
+    def get_many(self, keys):
+        """있는 키만 {키: 값}으로 반환 (L1에 없는 키는 L2에서 한 번에)"""
+        found = {}
+        l2_keys = {}
+        for key in keys:
+            value = self.l1.get(key)
+            if value is MISSING:
+                l2_keys[self.l2_key(key)] = key
+            else:
+                found[key] = value
+        self.stats['l1_hit'] += len(found)
+
+        if l2_keys:
+            from_l2 = cache.get_many(list(l2_keys))
+            for l2_key, value in from_l2.items():
+                found[l2_keys[l2_key]] = value
+                self.stats['eviction'] += self.l1.set(l2_keys[l2_key], value)
+            self.stats['l2_hit'] += len(from_l2)
+            self.stats['miss'] += len(l2_keys) - len(from_l2)
+        return found
+
+    def set_many(self, values):
+        cache.set_many({self.l2_key(key): value for key, value in values.items()}, self.l2_ttl)
+        for key, value in values.items():
+            self.stats['eviction'] += self.l1.set(key, value)
+
+    def get_or_set(self, key, loader):
+        """없으면 loader()로 계산해 두 단계에 모두 저장"""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def delete(self, *keys):
+        """L1 / L2에서 지우고, 트랜잭션이 커밋되면 다시 지운 뒤 다른 워커의 L1에도 무효화를 알림"""
+        self.discard(keys)
+        self.stats['invalidation'] += len(keys)
+        # 커밋 전에 다른 요청이 옛 값을 다시 채웠을 수 있고, 롤백되면 알릴 것이 없다.
+        # (채널 레이어 전송도 쓰기 트랜잭션을 잡고 있는 동안 하지 않음)
+        transaction.on_commit(lambda: self.after_commit(keys))
+
+    def discard(self, keys):
+        cache.delete_many([self.l2_key(key) for key in keys])
+        for key in keys:
+            self.l1.delete(key)
+
+    def after_commit(self, keys):
+        self.discard(keys)
+        publish_invalidation(self.keyspace, keys)
+
+
+KEYSPACES = {}
+
+
+def publish_invalidation(keyspace, keys):
+    """채널 레이어로 무효화 전파 (실패해도 L1 TTL 안에 정리되므로 로그만 남김)"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    message = {'type': 'cache.invalidate', 'keyspace': keyspace, 'keys': list(keys)}
+    try:
+        async_to_sync(channel_layer.group_send)(INVALIDATION_GROUP, message)
+    except Exception:
+        logger.warning('캐시 무효화 전파 실패: %s', keyspace, exc_info=True)
+
+
+def l2_is_local():
+    """기본 캐시가 워커 프로세스마다 따로인지 (다른 워커가 지운 L2 항목이 남아 있을 수 있음)"""
+    return isinstance(caches['default'], LocMemCache)
+
+
+def apply_invalidation(message):
+    tiered = KEYSPACES.get(message.get('keyspace'))
+    if tiered is None:
+        return
+    keys = list(message.get('keys', ()))
+    for key in keys:
+        tiered.l1.delete(key)
+    if l2_is_local():
+        cache.delete_many([tiered.l2_key(key) for key in keys])
+
+
+async def listen_for_invalidations():
+    """워커마다 하나: 무효화 그룹 메시지를 받아 L1(로컬 L2면 L2도)에서 지움"""
+    channel_layer = get_channel_layer()
+    channel = await channel_layer.new_channel()
+    joined_at = None
+    while True:
+        try:
+            # 그룹 멤버십은 채널 레이어에서 만료되므로 주기적으로 다시 참가
+            if joined_at is None or time.monotonic() - joined_at > GROUP_REJOIN_INTERVAL:
+                await channel_layer.group_add(INVALIDATION_GROUP, channel)
+                joined_at = time.monotonic()
+            message = await asyncio.wait_for(channel_layer.receive(channel), GROUP_REJOIN_INTERVAL)
+            apply_invalidation(message)
+        except asyncio.TimeoutError:
+            continue
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning('캐시 무효화 수신 실패, %s초 후 재시도', LISTENER_RETRY_DELAY, exc_info=True)
+            joined_at = None
+            await asyncio.sleep(LISTENER_RETRY_DELAY)
+
+
+_listener = None
+
+
+def ensure_invalidation_listener():
+    """실행 중인 이벤트 루프에 수신 작업을 한 번만 띄움 (ASGI 앱에서 호출)"""
+    global _listener
+    if _listener is None or _listener.done():
+        if get_channel_layer() is not None:
+            _listener = asyncio.get_running_loop().create_task(listen_for_invalidations())
+
+
+class InvalidationListenerMiddleware:
+    """ASGI 미들웨어: 첫 연결에서 무효화 수신 작업 시작"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        ensure_invalidation_listener()
+        return await self.app(scope, receive, send)
+
+
+def cache_event_counts():
+    for keyspace, tiered in sorted(KEYSPACES.items()):
+        for event in ('l1_hit', 'l2_hit', 'miss', 'eviction', 'invalidation'):
+            yield (keyspace, event), tiered.stats[event]
+
+
+register(CounterFamily(
+    'board_tiered_cache_events_total', '2단계 캐시 키 공간별 이벤트 수', ('keyspace', 'event'), cache_event_counts,
+))
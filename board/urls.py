@@ -10,7 +10,14 @@ urlpatterns = [
     path('api/post/<uuid:post_id>/comment/', views.create_comment, name='create_comment'),
     path('api/post/<uuid:post_id>/reaction/', views.toggle_post_reaction, name='toggle_post_reaction'),
     path('api/comment/<uuid:comment_id>/reaction/', views.toggle_comment_reaction, name='toggle_comment_reaction'),
+    path('api/reactions/batch/', views.toggle_reactions_batch, name='toggle_reactions_batch'),
+    path('api/reactions/mine/', views.my_reactions, name='my_reactions'),
     path('api/post/<uuid:post_id>/delete/', views.delete_post, name='delete_post'),
     path('api/updates/', views.check_updates, name='check_updates'),
+    path('api/presence/', views.presence, name='presence'),
+    path('api/stats/activity/', views.activity_stats, name='activity_stats'),
     path('health/', views.health_check, name='health_check'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('admin-tools/profiling/', views.profiling_window, name='profiling_window'),
+    path('admin-tools/reactions/<str:target_type>/', views.reaction_rows, name='reaction_rows'),
 ]
@@ -1,21 +1,86 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.template.loader import get_template, render_to_string
+from django.http import Http404, JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.paginator import Paginator
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.crypto import constant_time_compare
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
 from datetime import datetime, timedelta
+from itertools import islice
 import json
+import logging
 import uuid
-from .models import Post, Comment, PostReaction, CommentReaction
+from . import activity, profiling
+from .archive import get_archived_post
+from .jobs import enqueue
+from .lookups import get_comment_meta, get_live_post_meta, get_post_meta, invalidate_posts
+from .metrics import render_prometheus
+from .pagination import keyset_page
+from .presence import presence_counts
+from .querybudget import query_budget
+from .ranking import hot_score_delta, hot_weight, trending_posts
+from .ratelimit import rate_limit
+from .streaming import streaming_content_for
+from .tiered_cache import TieredCache
+from .models import (
+    Post, Comment, PostReaction, CommentReaction, ReactionSet, Visitor, LegacyPostId,
+    REACTION_BITS, REACTION_TYPES,
+)
 
+logger = logging.getLogger(__name__)
 
+# 방문자별 "내 반응" 캐시 설정
+# 토글은 모든 워커에 무효화를 알린다. (워커별 캐시에 지난 비트마스크가 남지 않도록)
+MY_REACTIONS_CACHE_TIMEOUT = 60 * 30
+MY_REACTIONS_MAX_IDS = 200
+my_reactions_cache = TieredCache('my_reactions', l1_max_entries=10000, l1_ttl=30, l2_ttl=MY_REACTIONS_CACHE_TIMEOUT)
+
+# 상세 페이지 댓글 스트리밍 설정 (댓글이 임계값보다 많으면 스트리밍)
+POST_DETAIL_STREAM_THRESHOLD = 200
+POST_DETAIL_STREAM_CHUNK = 100
+COMMENTS_STREAM_MARKER = '<!-- comments-stream -->'  # post_detail.html의 댓글 목록 자리
+
+# 반응 일괄 토글 설정
+REACTION_BATCH_MAX_TOGGLES = 100
+REACTION_COUNT_FIELDS = [f'{reaction_type}s_count' for reaction_type in REACTION_TYPES]
+
+POST_NOT_FOUND_ERROR = '게시글을 찾을 수 없습니다.'
+INVALID_JSON_ERROR = '잘못된 데이터 형식입니다.'
+
+# 관리자 반응 목록 한 페이지 크기
+REACTION_ROWS_PAGE_SIZE = 100
+
+
+def invalid_json():
+    return JsonResponse({'success': False, 'error': INVALID_JSON_ERROR}, status=400)
+
+
+def server_error(message):
+    """예상하지 못한 오류: 내용은 로그에만 남기고 클라이언트에는 일반 안내를 500으로"""
+    logger.exception(message)
+    return JsonResponse({'success': False, 'error': message}, status=500)
+
+
+@query_budget(4)
 def index(request):
     """메인 게시판 페이지"""
     # 검색 기능
     search_query = request.GET.get('search', '')
-    posts = Post.objects.filter(is_deleted=False)
+    sort = request.GET.get('sort', '')
+    posts = Post.objects.filter(is_deleted=False).only(*Post.LIST_FIELDS)
+    
+    # 정렬 (hot: 미리 계산된 인기 점수 인덱스 사용)
+    if sort == 'hot':
+        posts = posts.order_by('-hot_score', '-id')
+    else:
+        sort = ''
     
     if search_query:
         posts = posts.filter(
@@ -32,30 +97,85 @@ def index(request):
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
+        'sort': sort,
+        'trending_posts': trending_posts(),
     }
     return render(request, 'board/index.html', context)
 
 
+@query_budget(6)
 def post_detail(request, post_id):
     """게시글 상세 페이지"""
-    post = get_object_or_404(Post, id=post_id, is_deleted=False)
+    try:
+        post = get_object_or_404(Post, id=post_id, is_deleted=False)
+    except Http404:
+        # UUIDv7로 재발급되기 전의 링크는 새 주소로 보냄
+        legacy = LegacyPostId.objects.filter(old_id=post_id).values_list('new_id', flat=True).first()
+        if legacy:
+            return redirect('board:post_detail', post_id=legacy, permanent=True)
+        
+        # 보관된 게시글은 읽기 전용으로 표시 (느린 경로)
+        archived_post = get_archived_post(post_id)
+        if archived_post is None:
+            raise
+        comments = list(archived_post.comments.all())
+        return render(request, 'board/post_detail.html', {
+            'post': archived_post,
+            'comments': comments,
+            'comment_count': len(comments),
+            'is_archived': True,
+        })
     
-    # 조회수 증가
+    # 조회수 증가 (인기 점수도 같은 UPDATE로 반영)
+    Post.objects.filter(pk=post.pk).update(
+        view_count=F('view_count') + 1,
+        hot_score=hot_score_delta('view'),
+    )
     post.view_count += 1
-    post.save()
+    activity.record('views')
     
-    # 댓글 가져오기
-    comments = post.comments.all()
+    # 댓글 가져오기 (임계값 이하면 한 번에 렌더링)
+    comments = list(post.comments.all()[:POST_DETAIL_STREAM_THRESHOLD + 1])
+    streaming = len(comments) > POST_DETAIL_STREAM_THRESHOLD or request.GET.get('stream') == '1'
     
+    if not streaming:
+        context = {
+            'post': post,
+            'comments': comments,
+            'comment_count': len(comments),
+        }
+        return render(request, 'board/post_detail.html', context)
+    
+    # 댓글이 많으면 본문까지 먼저 보내고 댓글은 묶음 단위로 스트리밍
     context = {
         'post': post,
-        'comments': comments,
+        'comment_count': post.comments.count(),
+        'streaming': True,
     }
-    return render(request, 'board/post_detail.html', context)
+    page = render_to_string('board/post_detail.html', context, request=request)
+    head, tail = page.split(COMMENTS_STREAM_MARKER, 1)
+    return StreamingHttpResponse(streaming_content_for(request, stream_comments(head, post, tail)))
 
 
+def stream_comments(head, post, tail):
+    """상세 페이지 스트리밍: 머리 → 댓글 묶음들 → 꼬리 (메모리는 묶음 크기로 고정, ASGI에서는 묶음마다 스레드에서 실행)"""
+    yield head
+    
+    comment_list = get_template('board/_comment_list.html')
+    comments = post.comments.iterator(chunk_size=POST_DETAIL_STREAM_CHUNK)
+    while True:
+        chunk = list(islice(comments, POST_DETAIL_STREAM_CHUNK))
+        if not chunk:
+            break
+        yield comment_list.render({'comments': chunk})
+    
+    yield tail
+
+
+@query_budget(6)
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('create_post')
 def create_post(request):
     """새 게시글 작성"""
     try:
@@ -76,30 +196,55 @@ def create_post(request):
         post = Post.objects.create(
             title=title,
             content=content,
-            author_nickname=author_nickname or '익명'
+            author_nickname=author_nickname or '익명',
+            hot_score=hot_weight('post')
         )
         
+        activity.record('posts')
+        
+        # WebSocket 알림은 커밋 후 작업 큐에서 전송
+        enqueue(('broadcast', {
+            'update_type': 'new_post',
+            'message': '새로운 게시글이 작성되었습니다.',
+            'data': {
+                'post_id': str(post.id),
+                'title': post.title,
+                'author': post.author_nickname,
+                'created_at': post.created_at.isoformat(),
+            },
+        }))
+        
         # 새 게시글 작성 시간 기록 (폴링용)
         request.session['last_check_time'] = timezone.now().isoformat()
         
-        return JsonResponse({
+        result = {
             'success': True, 
             'post_id': str(post.id),
             'message': '게시글이 작성되었습니다.'
-        })
+        }
+        
+        # 요청 시 목록 카드 HTML을 함께 반환 (클라이언트가 새로고침 없이 삽입)
+        if data.get('fragment'):
+            result['html'] = render_to_string('board/_post_card.html', {'post': post}, request=request)
+        
+        return JsonResponse(result)
         
     except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': '잘못된 데이터 형식입니다.'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': '게시글 작성 중 오류가 발생했습니다.'})
+        return invalid_json()
+    except Exception:
+        return server_error('게시글 작성 중 오류가 발생했습니다.')
 
 
+@query_budget(10)
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('create_comment')
 def create_comment(request, post_id):
     """댓글 작성"""
     try:
-        post = get_object_or_404(Post, id=post_id)
+        # 캐시된 메타데이터로 존재만 확인하고 id로 바로 INSERT
+        if get_live_post_meta(post_id) is None:
+            return JsonResponse({'success': False, 'error': POST_NOT_FOUND_ERROR}, status=404)
         data = json.loads(request.body)
         content = data.get('content', '').strip()
         author_nickname = data.get('author_nickname', '익명').strip()
@@ -111,202 +256,50 @@ def create_comment(request, post_id):
             author_nickname = author_nickname[:50]
         
         comment = Comment.objects.create(
-            post=post,
+            post_id=post_id,
             content=content,
             author_nickname=author_nickname or '익명'
         )
+        activity.record('comments')
+        
+        # 인기 점수 반영과 WebSocket 알림은 커밋 후 작업 큐에서 처리 (INSERT 1회)
+        enqueue(
+            ('hot_score', {'post_id': str(post_id), 'event': 'comment'}),
+            ('broadcast', {
+                'update_type': 'new_comment',
+                'message': '새로운 댓글이 작성되었습니다.',
+                'data': {
+                    'comment_id': str(comment.id),
+                    'post_id': str(post_id),
+                    'author': comment.author_nickname,
+                    'created_at': comment.created_at.isoformat(),
+                },
+            }),
+        )
         
         # 새 댓글 작성 시간 기록 (폴링용)
         request.session['last_check_time'] = timezone.now().isoformat()
         
-        return JsonResponse({
+        result = {
             'success': True,
             'comment_id': str(comment.id),
             'message': '댓글이 작성되었습니다.'
-        })
+        }
+        
+        # 요청 시 댓글 HTML과 갱신된 댓글 수를 함께 반환
+        if data.get('fragment'):
+            result['html'] = render_to_string('board/_comment.html', {'comment': comment}, request=request)
+            result['comment_count'] = Comment.objects.filter(post_id=post_id).count()
+        
+        return JsonResponse(result)
         
     except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': '잘못된 데이터 형식입니다.'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': '댓글 작성 중 오류가 발생했습니다.'})
-
-
-@csrf_exempt
-@require_http_methods(["POST"])
-def toggle_post_reaction(request, post_id):
-    """게시글 반응 토글 (좋아요/싫어요)"""
-    try:
-        post = get_object_or_404(Post, id=post_id)
-        data = json.loads(request.body)
-        reaction_type = data.get('reaction_type')  # 'like' or 'dislike'
-        session_id = data.get('session_id', str(uuid.uuid4()))
-        
-        if reaction_type not in ['like', 'dislike']:
-            return JsonResponse({'success': False, 'error': '잘못된 반응 타입입니다.'})
-        
-        # 기존 반응 확인
-        existing_reaction = PostReaction.objects.filter(
-            post=post, session_id=session_id
-        ).first()
-        
-        if existing_reaction:
-            # 기존 반응과 같으면 제거
-            if existing_reaction.reaction_type == reaction_type:
-                existing_reaction.delete()
-                # 카운트 감소
-                if reaction_type == 'like':
-                    post.likes_count = max(0, post.likes_count - 1)
-                else:
-                    post.dislikes_count = max(0, post.dislikes_count - 1)
-                post.save()
-                
-                return JsonResponse({
-                    'success': True,
-                    'action': 'removed',
-                    'likes_count': post.likes_count,
-                    'dislikes_count': post.dislikes_count
-                })
-            else:
-                # 다른 반응으로 변경
-                old_type = existing_reaction.reaction_type
-                existing_reaction.reaction_type = reaction_type
-                existing_reaction.save()
-                
-                # 카운트 조정
-                if old_type == 'like':
-                    post.likes_count = max(0, post.likes_count - 1)
-                else:
-                    post.dislikes_count = max(0, post.dislikes_count - 1)
-                
-                if reaction_type == 'like':
-                    post.likes_count += 1
-                else:
-                    post.dislikes_count += 1
-                
-                post.save()
-                
-                return JsonResponse({
-                    'success': True,
-                    'action': 'changed',
-                    'likes_count': post.likes_count,
-                    'dislikes_count': post.dislikes_count
-                })
-        else:
-            # 새 반응 추가
-            PostReaction.objects.create(
-                post=post,
-                session_id=session_id,
-                reaction_type=reaction_type
-            )
-            
-            # 카운트 증가
-            if reaction_type == 'like':
-                post.likes_count += 1
-            else:
-                post.dislikes_count += 1
-            post.save()
-            
-            return JsonResponse({
-                'success': True,
-                'action': 'added',
-                'likes_count': post.likes_count,
-                'dislikes_count': post.dislikes_count
-            })
-            
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': '잘못된 데이터 형식입니다.'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': '반응 처리 중 오류가 발생했습니다.'})
-
-
-@csrf_exempt
-@require_http_methods(["POST"])
-def toggle_comment_reaction(request, comment_id):
-    """댓글 반응 토글 (좋아요/싫어요)"""
-    try:
-        comment = get_object_or_404(Comment, id=comment_id)
-        data = json.loads(request.body)
-        reaction_type = data.get('reaction_type')  # 'like' or 'dislike'
-        session_id = data.get('session_id', str(uuid.uuid4()))
-        
-        if reaction_type not in ['like', 'dislike']:
-            return JsonResponse({'success': False, 'error': '잘못된 반응 타입입니다.'})
-        
-        # 기존 반응 확인
-        existing_reaction = CommentReaction.objects.filter(
-            comment=comment, session_id=session_id
-        ).first()
-        
-        if existing_reaction:
-            # 기존 반응과 같으면 제거
-            if existing_reaction.reaction_type == reaction_type:
-                existing_reaction.delete()
-                # 카운트 감소
-                if reaction_type == 'like':
-                    comment.likes_count = max(0, comment.likes_count - 1)
-                else:
-                    comment.dislikes_count = max(0, comment.dislikes_count - 1)
-                comment.save()
-                
-                return JsonResponse({
-                    'success': True,
-                    'action': 'removed',
-                    'likes_count': comment.likes_count,
-                    'dislikes_count': comment.dislikes_count
-                })
-            else:
-                # 다른 반응으로 변경
-                old_type = existing_reaction.reaction_type
-                existing_reaction.reaction_type = reaction_type
-                existing_reaction.save()
-                
-                # 카운트 조정
-                if old_type == 'like':
-                    comment.likes_count = max(0, comment.likes_count - 1)
-                else:
-                    comment.dislikes_count = max(0, comment.dislikes_count - 1)
-                
-                if reaction_type == 'like':
-                    comment.likes_count += 1
-                else:
-                    comment.dislikes_count += 1
-                
-                comment.save()
-                
-                return JsonResponse({
-                    'success': True,
-                    'action': 'changed',
-                    'likes_count': comment.likes_count,
-                    'dislikes_count': comment.dislikes_count
-                })
-        else:
-            # 새 반응 추가
-            CommentReaction.objects.create(
-                comment=comment,
-                session_id=session_id,
-                reaction_type=reaction_type
-            )
-            
-            # 카운트 증가
-            if reaction_type == 'like':
-                comment.likes_count += 1
-            else:
-                comment.dislikes_count += 1
-            comment.save()
-            
-            return JsonResponse({
-                'success': True,
-                'action': 'added',
-                'likes_count': comment.likes_count,
-                'dislikes_count': comment.dislikes_count
-            })
-            
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': '잘못된 데이터 형식입니다.'})
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': '반응 처리 중 오류가 발생했습니다.'})
+        return invalid_json()
+    except Exception:
+        return server_error('댓글 작성 중 오류가 발생했습니다.')
 
 
+@query_budget(6)
 @require_http_methods(["GET"])
 def check_updates(request):
     """업데이트 확인 API (폴링용)"""
@@ -365,21 +358,26 @@ def check_updates(request):
             'updates': updates
         })
         
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': '업데이트 확인 중 오류가 발생했습니다.'})
+    except Exception:
+        return server_error('업데이트 확인 중 오류가 발생했습니다.')
 
 
+@query_budget(7)
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('delete_post')
 def delete_post(request, post_id):
     """게시글 삭제"""
     try:
-        post = get_object_or_404(Post, id=post_id)
+        if get_post_meta(post_id) is None:
+            return JsonResponse({'success': False, 'error': POST_NOT_FOUND_ERROR}, status=404)
         
-        # 게시글 삭제 처리 (비밀번호 없이 바로 삭제)
-        post.is_deleted = True
-        post.deleted_at = timezone.now()
-        post.save()
+        # 게시글 삭제 처리 (비밀번호 없이 바로 삭제, 행을 읽지 않고 UPDATE 1회)
+        Post.objects.filter(pk=post_id).update(is_deleted=True, deleted_at=timezone.now())
+        
+        # 존재 확인 캐시는 바로, 인기글 캐시는 작업 큐에서 묶어서 모든 워커에서 비움
+        invalidate_posts([post_id])
+        enqueue(('invalidate_trending', {}))
         
         # 마지막 확인 시간 업데이트 (다른 사용자들에게 알림)
         request.session['last_check_time'] = timezone.now().isoformat()
@@ -389,61 +387,239 @@ def delete_post(request, post_id):
             'message': '게시글이 삭제되었습니다.'
         })
         
-    except Exception as e:
+    except Exception:
+        return server_error('게시글 삭제 중 오류가 발생했습니다.')
+
+
+@query_budget(0)
+@require_http_methods(["GET"])
+def presence(request):
+    """접속자 수 API (전체 / ?post=<id> 게시글을 보고 있는 방문자 수)"""
+    post_id = request.GET.get('post')
+    if post_id:
+        try:
+            post_id = uuid.UUID(post_id)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': '잘못된 게시글 ID입니다.'}, status=400)
+    return JsonResponse({'success': True, **presence_counts(post_id)})
+
+
+STATS_MAX_DAYS = {'hour': 31, 'day': 366}
+
+
+def parse_stats_time(value, default):
+    """ISO 8601 시각 파싱 (시간대가 없으면 현지 시각으로 간주)"""
+    if not value:
+        return default
+    parsed = datetime.fromisoformat(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+@query_budget(2)
+@require_http_methods(["GET"])
+def activity_stats(request):
+    """시간대별 활동 통계 API (?start=&end= ISO 시각, ?bucket=hour|day, 기본: 최근 24시간)"""
+    bucket = request.GET.get('bucket', 'hour')
+    if bucket not in STATS_MAX_DAYS:
+        return JsonResponse({'success': False, 'error': 'bucket은 hour 또는 day여야 합니다.'}, status=400)
+    now = timezone.now()
+    try:
+        end = parse_stats_time(request.GET.get('end'), now)
+        start = parse_stats_time(request.GET.get('start'), end - timedelta(days=1))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': '잘못된 시각 형식입니다.'}, status=400)
+    if start >= end:
+        return JsonResponse({'success': False, 'error': '시작 시각이 종료 시각보다 앞서야 합니다.'}, status=400)
+    if end - start > timedelta(days=STATS_MAX_DAYS[bucket]):
         return JsonResponse({
-            'success': False, 
-            'error': '게시글 삭제 중 오류가 발생했습니다.'
-        })
+            'success': False, 'error': f'{bucket} 단위 조회는 최대 {STATS_MAX_DAYS[bucket]}일까지 가능합니다.',
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'bucket': bucket,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        **activity.activity_stats(start, end, bucket),
+    })
 
 
+@query_budget(0)
 def health_check(request):
     """Railway healthcheck 엔드포인트"""
     return HttpResponse("OK", status=200)
 
 
+@query_budget(1)
+def metrics(request):
+    """Prometheus 수집 엔드포인트 (뷰별 지연/쿼리/렌더링 히스토그램)"""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        # 토큰 없이 공개하는 것은 개발 모드에서만
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=403)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@query_budget(4)
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def profiling_window(request):
+    """구간 프로파일링 켜기/끄기와 최근 프로파일 목록 (관리자 전용)"""
+    if request.method == 'POST':
+        if 'stop' in request.POST:
+            profiling.stop_window()
+            messages.success(request, '구간 프로파일링을 종료했습니다.')
+        else:
+            try:
+                seconds = int(request.POST.get('seconds', 30))
+            except ValueError:
+                seconds = 30
+            profiling.start_window(seconds)
+            messages.success(request, f'구간 프로파일링을 시작했습니다. ({seconds}초, 각 워커는 다음 요청부터 샘플링)')
+        return redirect('board:profiling_window')
+    
+    until = profiling.window_until()
+    return render(request, 'admin/board/profiling.html', {
+        'title': '프로파일링',
+        'window_until': datetime.fromtimestamp(until, tz=timezone.get_current_timezone()) if until else None,
+        'max_seconds': profiling.MAX_WINDOW_SECONDS,
+        'profiles': profiling.list_profiles(limit=50),
+        'profile_header': profiling.PROFILE_HEADER,
+    })
+
+
+@query_budget(4)
+@staff_member_required
+@require_http_methods(["GET"])
+def reaction_rows(request, target_type):
+    """반응 행 목록 (관리자 전용, 복합 기본키 순서의 키셋 페이지네이션)"""
+    if target_type not in REACTION_TARGETS:
+        raise Http404
+    model, reaction_model, result_key = REACTION_TARGETS[target_type]
+    target_field = f'{target_type}_id'
+    label_field = 'title' if target_type == 'post' else 'author_nickname'
+    
+    reactions = reaction_model.objects.select_related(target_type).only(
+        'reactions', 'visitor', f'{target_type}__{label_field}',
+    )
+    target = request.GET.get('target', '').strip()
+    visitor = request.GET.get('visitor', '').strip()
+    try:
+        if target:
+            reactions = reactions.filter(**{target_field: uuid.UUID(target)})
+        if visitor:
+            reactions = reactions.filter(visitor_id=int(visitor))
+        after = request.GET.get('after')
+        if after:
+            after_target, after_visitor = after.split(':')
+            after = (uuid.UUID(after_target), int(after_visitor))
+    except ValueError:
+        return HttpResponse('잘못된 검색 조건입니다.', status=400)
+    
+    rows, next_key = keyset_page(reactions, (target_field, 'visitor_id'), after=after or None, size=REACTION_ROWS_PAGE_SIZE)
+    query = request.GET.copy()
+    if next_key:
+        query['after'] = f'{next_key[0]}:{next_key[1]}'
+    
+    return render(request, 'admin/board/reactions.html', {
+        'title': f'{model._meta.verbose_name} 반응',
+        'target_type': target_type,
+        'rows': [
+            (getattr(row, target_field), getattr(getattr(row, target_type), label_field), row.visitor_id, row.reaction_types)
+            for row in rows
+        ],
+        'target': target,
+        'visitor': visitor,
+        'next_query': query.urlencode() if next_key else None,
+        'change_url_name': f'admin:board_{target_type}_change',
+    })
+
+
+def get_visitor_id(request, create=True):
+    """현재 세션의 방문자 정수 ID 반환 (없으면 생성)"""
+    visitor_id = request.session.get('visitor_id')
+    if visitor_id or not create:
+        return visitor_id
+    
+    if not request.session.session_key:
+        request.session.create()
+    
+    visitor, created = Visitor.objects.get_or_create(session_key=request.session.session_key)
+    request.session['visitor_id'] = visitor.id
+    return visitor.id
+
+
+def toggle_reaction_mask(reaction_model, target_field, target_id, visitor_id, toggle_mask):
+    """반응 비트들을 XOR로 뒤집고 새 비트마스크 반환"""
+    lookup = {f'{target_field}_id': target_id, 'visitor_id': visitor_id}
+    reactions = reaction_model.objects.filter(**lookup)
+    
+    # 기존 행이 있으면 XOR 한 번으로 토글
+    if reactions.update(reactions=F('reactions').bitxor(toggle_mask)):
+        return reactions.values_list('reactions', flat=True).get()
+    
+    try:
+        with transaction.atomic():
+            reaction_model.objects.create(**lookup, reactions=toggle_mask)
+        return toggle_mask
+    except IntegrityError:
+        # 동시 요청이 먼저 행을 만든 경우
+        reactions.update(reactions=F('reactions').bitxor(toggle_mask))
+        return reactions.values_list('reactions', flat=True).get()
+
+
+def apply_reaction_deltas(model, object_id, toggle_mask, new_mask):
+    """뒤집힌 비트에 맞춰 비정규화된 반응 카운트 증감 (UPDATE 1회)"""
+    updates = {}
+    net_added = 0
+    for reaction_type, bit in REACTION_BITS.items():
+        if toggle_mask & bit:
+            count_field = f'{reaction_type}s_count'
+            if new_mask & bit:
+                updates[count_field] = F(count_field) + 1
+                net_added += 1
+                activity.record(f'{reaction_type}s')
+            else:
+                updates[count_field] = Greatest(F(count_field) - 1, 0)
+                net_added -= 1
+    
+    # 게시글 반응은 인기 점수에도 반영
+    if model is Post and net_added:
+        updates['hot_score'] = Greatest(hot_score_delta('reaction', net_added), 0)
+    
+    if updates:
+        model.objects.filter(pk=object_id).update(**updates)
+
+
+@query_budget(20)
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('reaction')
 def toggle_post_reaction(request, post_id):
     """게시글 이모지 반응 토글"""
     try:
         data = json.loads(request.body)
         reaction_type = data.get('reaction_type')
         
-        if reaction_type not in ['heart', 'laugh', 'wow', 'sad']:
+        if reaction_type not in REACTION_TYPES:
             return JsonResponse({'success': False, 'error': '유효하지 않은 반응 타입입니다.'})
         
-        post = get_object_or_404(Post, id=post_id)
-        session_id = request.session.session_key
-        
-        if not session_id:
-            request.session.create()
-            session_id = request.session.session_key
-        
-        # 기존 반응 확인 (특정 반응 타입)
-        existing_reaction = PostReaction.objects.filter(
-            post=post, 
-            session_id=session_id,
-            reaction_type=reaction_type
-        ).first()
+        if get_live_post_meta(post_id) is None:
+            return JsonResponse({'success': False, 'error': POST_NOT_FOUND_ERROR}, status=404)
+        visitor_id = get_visitor_id(request)
         
-        if existing_reaction:
-            # 같은 반응이면 제거
-            existing_reaction.delete()
-            is_active = False
-        else:
-            # 새 반응 생성 (get_or_create로 중복 방지)
-            reaction, created = PostReaction.objects.get_or_create(
-                post=post,
-                session_id=session_id,
-                reaction_type=reaction_type
-            )
-            is_active = True
-        
-        # 카운트 업데이트
-        update_post_reaction_counts(post)
-        
-        # 현재 카운트 반환
-        count = getattr(post, f'{reaction_type}s_count', 0)
+        bit = REACTION_BITS[reaction_type]
+        with transaction.atomic():
+            new_mask = toggle_reaction_mask(PostReaction, 'post', post_id, visitor_id, bit)
+            apply_reaction_deltas(Post, post_id, bit, new_mask)
+            count = Post.objects.values_list(f'{reaction_type}s_count', flat=True).get(pk=post_id)
+        is_active = bool(new_mask & bit)
+        my_reactions_cache.delete(my_reactions_cache_key(visitor_id, 'post', post_id))
         
         return JsonResponse({
             'success': True,
@@ -451,53 +627,37 @@ def toggle_post_reaction(request, post_id):
             'is_active': is_active
         })
         
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+    except json.JSONDecodeError:
+        return invalid_json()
+    except Exception:
+        return server_error('반응 처리 중 오류가 발생했습니다.')
 
 
+@query_budget(20)
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit('reaction')
 def toggle_comment_reaction(request, comment_id):
     """댓글 이모지 반응 토글"""
     try:
         data = json.loads(request.body)
         reaction_type = data.get('reaction_type')
         
-        if reaction_type not in ['heart', 'laugh', 'wow', 'sad']:
+        if reaction_type not in REACTION_TYPES:
             return JsonResponse({'success': False, 'error': '유효하지 않은 반응 타입입니다.'})
         
-        comment = get_object_or_404(Comment, id=comment_id)
-        session_id = request.session.session_key
-        
-        if not session_id:
-            request.session.create()
-            session_id = request.session.session_key
+        meta = get_comment_meta(comment_id)
+        if meta is None or get_live_post_meta(meta['post_id']) is None:
+            return JsonResponse({'success': False, 'error': '댓글을 찾을 수 없습니다.'}, status=404)
+        visitor_id = get_visitor_id(request)
         
-        # 기존 반응 확인 (특정 반응 타입)
-        existing_reaction = CommentReaction.objects.filter(
-            comment=comment, 
-            session_id=session_id,
-            reaction_type=reaction_type
-        ).first()
-        
-        if existing_reaction:
-            # 같은 반응이면 제거
-            existing_reaction.delete()
-            is_active = False
-        else:
-            # 새 반응 생성 (get_or_create로 중복 방지)
-            reaction, created = CommentReaction.objects.get_or_create(
-                comment=comment,
-                session_id=session_id,
-                reaction_type=reaction_type
-            )
-            is_active = True
-        
-        # 카운트 업데이트
-        update_comment_reaction_counts(comment)
-        
-        # 현재 카운트 반환
-        count = getattr(comment, f'{reaction_type}s_count', 0)
+        bit = REACTION_BITS[reaction_type]
+        with transaction.atomic():
+            new_mask = toggle_reaction_mask(CommentReaction, 'comment', comment_id, visitor_id, bit)
+            apply_reaction_deltas(Comment, comment_id, bit, new_mask)
+            count = Comment.objects.values_list(f'{reaction_type}s_count', flat=True).get(pk=comment_id)
+        is_active = bool(new_mask & bit)
+        my_reactions_cache.delete(my_reactions_cache_key(visitor_id, 'comment', comment_id))
         
         return JsonResponse({
             'success': True,
@@ -505,31 +665,265 @@ def toggle_comment_reaction(request, comment_id):
             'is_active': is_active
         })
         
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
+    except json.JSONDecodeError:
+        return invalid_json()
+    except Exception:
+        return server_error('반응 처리 중 오류가 발생했습니다.')
+
+
+def my_reactions_cache_key(visitor_id, target_field, target_id):
+    """방문자별 반응 비트마스크 캐시 키"""
+    return f'{visitor_id}:{target_field}:{target_id}'
+
+
+def parse_id_list(value):
+    """쉼표로 구분된 UUID 목록 파싱 (중복 제거, 순서 유지)"""
+    ids = []
+    for raw in value.split(','):
+        raw = raw.strip()
+        if raw:
+            target_id = uuid.UUID(raw)
+            if target_id not in ids:
+                ids.append(target_id)
+    return ids
+
+
+def load_my_reactions(reaction_model, target_field, visitor_id, target_ids):
+    """대상 목록에 대한 방문자의 반응 비트마스크 조회 (캐시 우선, 미스는 쿼리 1회)"""
+    keys = {my_reactions_cache_key(visitor_id, target_field, target_id): target_id for target_id in target_ids}
+    masks = {keys[key]: mask for key, mask in my_reactions_cache.get_many(list(keys)).items()}
+    
+    missing = [target_id for target_id in target_ids if target_id not in masks]
+    if missing:
+        found = dict(
+            reaction_model.objects.filter(
+                visitor_id=visitor_id, **{f'{target_field}_id__in': missing}
+            ).values_list(f'{target_field}_id', 'reactions')
+        )
+        # 반응이 없는 대상도 0으로 캐시해 다음 요청에서 쿼리를 생략한다.
+        fetched = {target_id: found.get(target_id, 0) for target_id in missing}
+        my_reactions_cache.set_many(
+            {my_reactions_cache_key(visitor_id, target_field, target_id): mask for target_id, mask in fetched.items()}
+        )
+        masks.update(fetched)
+    
+    return {
+        str(target_id): ReactionSet.types_from_mask(mask)
+        for target_id, mask in masks.items() if mask
+    }
+
+
+@query_budget(4)
+@require_http_methods(["GET"])
+def my_reactions(request):
+    """현재 방문자가 누른 반응 일괄 조회 (게시글/댓글 한 페이지 분량)"""
+    try:
+        post_ids = parse_id_list(request.GET.get('post_ids', ''))
+        comment_ids = parse_id_list(request.GET.get('comment_ids', ''))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': '잘못된 ID 형식입니다.'})
+    
+    if len(post_ids) + len(comment_ids) > MY_REACTIONS_MAX_IDS:
+        return JsonResponse({'success': False, 'error': '한 번에 조회할 수 있는 개수를 초과했습니다.'})
+    
+    visitor_id = get_visitor_id(request, create=False)
+    if not visitor_id:
+        return JsonResponse({'success': True, 'posts': {}, 'comments': {}})
+    
+    return JsonResponse({
+        'success': True,
+        'posts': load_my_reactions(PostReaction, 'post', visitor_id, post_ids) if post_ids else {},
+        'comments': load_my_reactions(CommentReaction, 'comment', visitor_id, comment_ids) if comment_ids else {},
+    })
+
+
+REACTION_TARGETS = {
+    'post': (Post, PostReaction, 'posts'),
+    'comment': (Comment, CommentReaction, 'comments'),
+}
+# 삭제된 게시글과 그 댓글에는 반응할 수 없다. (단건 토글의 get_live_post_meta와 같은 조건)
+LIVE_REACTION_TARGETS = {
+    'post': Q(is_deleted=False),
+    'comment': Q(post__is_deleted=False),
+}
+
+
+def collapse_toggles(toggles):
+    """순서대로 들어온 토글 목록을 대상별 순 XOR 마스크로 압축"""
+    net = {}
+    for toggle in toggles:
+        target_type = toggle.get('target_type')
+        reaction_type = toggle.get('reaction_type')
+        if target_type not in REACTION_TARGETS or reaction_type not in REACTION_TYPES:
+            raise ValueError(toggle)
+        
+        key = (target_type, uuid.UUID(str(toggle.get('target_id'))))
+        net[key] = net.get(key, 0) ^ REACTION_BITS[reaction_type]
+    return net
+
+
+def reaction_counts(obj):
+    """객체의 반응 타입별 카운트"""
+    return {reaction_type: getattr(obj, f'{reaction_type}s_count') for reaction_type in REACTION_TYPES}
+
+
+def reaction_batch_cost(request):
+    """일괄 토글의 요청 제한 비용: 상쇄 후 실제로 뒤집히는 반응 수 (단건 토글과 같은 한도를 쓰도록)"""
+    try:
+        net = collapse_toggles(json.loads(request.body).get('toggles') or [])
+    except (ValueError, TypeError, AttributeError):
+        return 1  # 잘못된 요청은 뷰에서 거절
+    return max(1, sum(mask.bit_count() for mask in net.values()))
+
+
+def by_target(values, output_field=None):
+    """대상 id별 값을 고르는 CASE 식 (한 번의 UPDATE로 대상마다 다른 값 적용)"""
+    return Case(
+        *[When(pk=target_id, then=Value(value)) for target_id, value in values.items()],
+        default=Value(0), output_field=output_field,
+    )
+
+
+def xor_reaction_masks(reaction_model, target_field, visitor_id, toggle_masks):
+    """방문자의 반응 비트마스크를 대상별로 한꺼번에 XOR (조회 1회 + UPDATE 1회 + INSERT 1회)"""
+    rows = reaction_model.objects.filter(visitor_id=visitor_id)
+    existing = set(
+        rows.filter(**{f'{target_field}_id__in': list(toggle_masks)}).values_list(f'{target_field}_id', flat=True)
+    )
+    if existing:
+        rows.filter(**{f'{target_field}_id__in': existing}).update(reactions=F('reactions').bitxor(Case(
+            *[When(**{f'{target_field}_id': target_id}, then=Value(toggle_masks[target_id])) for target_id in existing],
+        )))
+    
+    missing = [target_id for target_id in toggle_masks if target_id not in existing]
+    if not missing:
+        return
+    try:
+        with transaction.atomic():
+            reaction_model.objects.bulk_create([
+                reaction_model(visitor_id=visitor_id, reactions=toggle_masks[target_id], **{f'{target_field}_id': target_id})
+                for target_id in missing
+            ])
+    except IntegrityError:
+        # 동시 요청이 먼저 행을 만든 경우 (드묾): 대상별로 토글
+        for target_id in missing:
+            toggle_reaction_mask(reaction_model, target_field, target_id, visitor_id, toggle_masks[target_id])
+
+
+def apply_reaction_deltas_many(model, toggle_masks, new_masks):
+    """대상별로 뒤집힌 비트에 맞춰 반응 카운트 증감 (대상 수와 무관하게 UPDATE 1회)"""
+    deltas = {count_field: {} for count_field in REACTION_COUNT_FIELDS}
+    net_added = {}
+    for target_id, toggle_mask in toggle_masks.items():
+        new_mask = new_masks.get(target_id, 0)
+        for reaction_type, bit in REACTION_BITS.items():
+            if toggle_mask & bit:
+                delta = 1 if new_mask & bit else -1
+                deltas[f'{reaction_type}s_count'][target_id] = delta
+                net_added[target_id] = net_added.get(target_id, 0) + delta
+                if delta > 0:
+                    activity.record(f'{reaction_type}s')
+    
+    updates = {
+        count_field: Greatest(F(count_field) + by_target(values), 0)
+        for count_field, values in deltas.items() if values
+    }
+    # 게시글 반응은 인기 점수에도 반영
+    hot_deltas = {target_id: hot_weight('reaction') * net for target_id, net in net_added.items() if net}
+    if model is Post and hot_deltas:
+        updates['hot_score'] = Greatest(F('hot_score') + by_target(hot_deltas, FloatField()), 0)
+    
+    if updates:
+        model.objects.filter(pk__in=list(toggle_masks)).update(**updates)
+
+
+@query_budget(32)
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limit('reaction', cost=reaction_batch_cost)
+def toggle_reactions_batch(request):
+    """여러 반응 토글을 한 번에 처리 (같은 반응을 짝수 번 누르면 상쇄, 대상 수와 무관하게 테이블별 쿼리 수 고정)"""
+    try:
+        data = json.loads(request.body)
+        toggles = data.get('toggles')
+        if not isinstance(toggles, list) or not toggles:
+            return JsonResponse({'success': False, 'error': '토글 목록이 비어 있습니다.'})
+        
+        if len(toggles) > REACTION_BATCH_MAX_TOGGLES:
+            return JsonResponse({'success': False, 'error': '한 번에 처리할 수 있는 개수를 초과했습니다.'})
+        
+        try:
+            net = collapse_toggles(toggles)
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': '유효하지 않은 반응 요청입니다.'})
+        
+        visitor_id = get_visitor_id(request)
+        masks = {}
+        
+        # 모든 순 변경을 트랜잭션 하나로 적용
+        with transaction.atomic():
+            for target_type, (model, reaction_model, result_key) in REACTION_TARGETS.items():
+                target_ids = [target_id for (kind, target_id) in net if kind == target_type]
+                if not target_ids:
+                    continue
+                
+                live = set(
+                    model.objects.filter(LIVE_REACTION_TARGETS[target_type], pk__in=target_ids).values_list('pk', flat=True)
+                )
+                toggle_masks = {
+                    target_id: net[(target_type, target_id)]
+                    for target_id in target_ids if target_id in live and net[(target_type, target_id)]
+                }
+                if toggle_masks:
+                    xor_reaction_masks(reaction_model, target_type, visitor_id, toggle_masks)
+                
+                # 바뀐 비트마스크는 쓰기 후 다시 읽어 카운트 증감과 응답에 함께 사용
+                masks[target_type] = {target_id: 0 for target_id in target_ids if target_id in live}
+                masks[target_type].update(
+                    reaction_model.objects.filter(
+                        visitor_id=visitor_id, **{f'{target_type}_id__in': list(masks[target_type])}
+                    ).values_list(f'{target_type}_id', 'reactions')
+                )
+                if toggle_masks:
+                    apply_reaction_deltas_many(model, toggle_masks, masks[target_type])
+        
+        # 결과 카운트는 테이블별 쿼리 1회로 조회
+        result = {'success': True, 'posts': {}, 'comments': {}}
+        for target_type, target_masks in masks.items():
+            if not target_masks:
+                continue
+            model, reaction_model, result_key = REACTION_TARGETS[target_type]
+            my_reactions_cache.delete(*[my_reactions_cache_key(visitor_id, target_type, target_id) for target_id in target_masks])
+            for obj in model.objects.filter(pk__in=list(target_masks)).only(*REACTION_COUNT_FIELDS):
+                result[result_key][str(obj.pk)] = {
+                    'counts': reaction_counts(obj),
+                    'reactions': ReactionSet.types_from_mask(target_masks[obj.pk]),
+                }
+        
+        return JsonResponse(result)
+        
+    except json.JSONDecodeError:
+        return invalid_json()
+    except Exception:
+        return server_error('반응 처리 중 오류가 발생했습니다.')
+
+
+def recount_reactions(reactions):
+    """비트마스크 행들로부터 반응 타입별 개수 계산 (집계 쿼리 1회)"""
+    return ReactionSet.counts_from_totals(reactions.aggregate(**ReactionSet.count_aggregates()))
 
 
 def update_post_reaction_counts(post):
     """게시글 반응 카운트 업데이트"""
-    reactions = PostReaction.objects.filter(post=post)
-    
-    post.likes_count = reactions.filter(reaction_type='like').count()
-    post.hearts_count = reactions.filter(reaction_type='heart').count()
-    post.laughs_count = reactions.filter(reaction_type='laugh').count()
-    post.wows_count = reactions.filter(reaction_type='wow').count()
-    post.sads_count = reactions.filter(reaction_type='sad').count()
+    for field, value in recount_reactions(PostReaction.objects.filter(post=post)).items():
+        setattr(post, field, value)
     
     post.save()
 
 
 def update_comment_reaction_counts(comment):
     """댓글 반응 카운트 업데이트"""
-    reactions = CommentReaction.objects.filter(comment=comment)
-    
-    comment.likes_count = reactions.filter(reaction_type='like').count()
-    comment.hearts_count = reactions.filter(reaction_type='heart').count()
-    comment.laughs_count = reactions.filter(reaction_type='laugh').count()
-    comment.wows_count = reactions.filter(reaction_type='wow').count()
-    comment.sads_count = reactions.filter(reaction_type='sad').count()
+    for field, value in recount_reactions(CommentReaction.objects.filter(comment=comment)).items():
+        setattr(comment, field, value)
     
-    comment.save()
\ No newline at end of file
+    comment.save()
@@ -4,12 +4,16 @@
 let sessionId = null;
 let pollingInterval = null;
 let lastUpdateTime = Date.now();
+let realtimeSocket = null;
+let realtimeRetryDelay = 1000;
 
 // DOM이 로드되면 실행
 document.addEventListener('DOMContentLoaded', function() {
     initializeSession();
     initializePolling();
+    initializeRealtime();
     initializeEventListeners();
+    loadMyReactions();
 });
 
 // 세션 초기화
@@ -45,6 +49,54 @@ function getCookie(name) {
     return cookieValue;
 }
 
+// 내 반응 상태 불러오기 (페이지의 게시글/댓글을 한 번에 조회)
+async function loadMyReactions() {
+    const postIds = new Set();
+    const commentIds = new Set();
+    document.querySelectorAll('.emoji-reaction').forEach(btn => {
+        if (btn.dataset.postId) {
+            postIds.add(btn.dataset.postId);
+        } else if (btn.dataset.commentId) {
+            commentIds.add(btn.dataset.commentId);
+        }
+    });
+    
+    if (!postIds.size && !commentIds.size) return;
+    
+    const params = new URLSearchParams({
+        post_ids: [...postIds].join(','),
+        comment_ids: [...commentIds].join(',')
+    });
+    
+    try {
+        const response = await fetch(`/api/reactions/mine/?${params}`);
+        if (!response.ok) return;
+        
+        const result = await response.json();
+        if (result.success) {
+            markActiveReactions('post', result.posts);
+            markActiveReactions('comment', result.comments);
+        }
+    } catch (error) {
+        console.error('내 반응 조회 실패:', error);
+    }
+}
+
+// 활성 반응 버튼 표시
+function markActiveReactions(targetType, reactions) {
+    Object.entries(reactions).forEach(([targetId, reactionTypes]) => {
+        reactionTypes.forEach(reactionType => {
+            const button = document.querySelector(
+                `.emoji-reaction[data-${targetType}-id="${targetId}"][data-reaction-type="${reactionType}"]`
+            );
+            if (button) {
+                button.classList.remove('btn-outline-primary');
+                button.classList.add('btn-primary');
+            }
+        });
+    });
+}
+
 // 폴링 초기화
 function initializePolling() {
     updateConnectionStatus(true);
@@ -136,6 +188,57 @@ function handleReactionUpdate(data) {
     console.log('반응 업데이트:', data);
 }
 
+// 실시간 연결 (접속자 수): 상세 페이지면 보고 있는 게시글을 함께 알림
+function initializeRealtime() {
+    if (!('WebSocket' in window)) return;
+    
+    const readingElement = document.getElementById('presence-reading');
+    const postId = readingElement ? readingElement.dataset.postId : '';
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const query = postId ? `?post=${encodeURIComponent(postId)}` : '';
+    realtimeSocket = new WebSocket(`${protocol}//${window.location.host}/ws/board/${query}`);
+    
+    realtimeSocket.addEventListener('open', () => {
+        realtimeRetryDelay = 1000;
+        updateConnectionStatus(true);
+    });
+    
+    realtimeSocket.addEventListener('message', event => {
+        let data;
+        try {
+            data = JSON.parse(event.data);
+        } catch (error) {
+            return;
+        }
+        if (data.type === 'presence') {
+            updatePresence(data);
+        }
+    });
+    
+    // 끊기면 숫자를 숨기고 점점 길게 기다리며 다시 연결 (최대 30초)
+    realtimeSocket.addEventListener('close', () => {
+        updatePresence({ online: null, reading: null });
+        updateConnectionStatus(false);
+        setTimeout(initializeRealtime, realtimeRetryDelay);
+        realtimeRetryDelay = Math.min(realtimeRetryDelay * 2, 30000);
+    });
+}
+
+// 접속자 수 표시 (null이면 숨김)
+function updatePresence(data) {
+    [['presence-online', data.online], ['presence-reading', data.reading]].forEach(([id, count]) => {
+        const element = document.getElementById(id);
+        if (!element) return;
+        
+        if (count === null || count === undefined) {
+            element.classList.add('d-none');
+            return;
+        }
+        element.querySelector('.presence-count').textContent = count;
+        element.classList.remove('d-none');
+    });
+}
+
 // 연결 상태 업데이트
 function updateConnectionStatus(isConnected) {
     const statusElement = document.getElementById('realtime-status');
@@ -163,16 +266,17 @@ function initializeEventListeners() {
         form.addEventListener('submit', handleFormSubmit);
     });
     
-    // 반응 버튼 이벤트
-    const reactionButtons = document.querySelectorAll('.reaction-btn, .comment-reaction-btn');
+    // 반응 버튼 이벤트 (이모지 반응은 utils.toggleEmojiReaction에서 일괄 처리)
+    const reactionButtons = document.querySelectorAll('.reaction-btn:not(.emoji-reaction), .comment-reaction-btn:not(.emoji-reaction)');
     reactionButtons.forEach(btn => {
         btn.addEventListener('click', handleReactionClick);
     });
     
-    // 삭제 버튼 이벤트
-    const deleteButtons = document.querySelectorAll('.delete-post-btn');
-    deleteButtons.forEach(btn => {
-        btn.addEventListener('click', handleDeleteClick);
+    // 삭제 버튼 이벤트 (새로 삽입되는 카드도 처리하도록 위임)
+    document.addEventListener('click', function(event) {
+        if (event.target.closest('.delete-post-btn')) {
+            handleDeleteClick(event);
+        }
     });
     
     // 키보드 단축키
@@ -421,129 +525,96 @@ const utils = {
         }
     },
     
-    toggleEmojiReaction: async (targetType, targetId, reactionType) => {
-        // 디바운싱: 같은 반응에 대한 중복 요청 방지
-        const key = `${targetType}-${targetId}-${reactionType}`;
-        if (utils.reactionTimeouts && utils.reactionTimeouts[key]) {
-            clearTimeout(utils.reactionTimeouts[key]);
-        }
+    // 반응 버튼 찾기
+    findReactionButton: function(targetType, targetId, reactionType) {
+        return document.querySelector(
+            `.emoji-reaction[data-${targetType}-id="${targetId}"][data-reaction-type="${reactionType}"]`
+        );
+    },
+    
+    // 반응 버튼 활성 상태와 카운트를 뒤집기 (낙관적 업데이트/복원 공용)
+    flipReactionButton: function(button) {
+        const countElement = button.querySelector('.reaction-count');
+        const currentCount = parseInt(countElement.textContent) || 0;
         
-        if (!utils.reactionTimeouts) {
-            utils.reactionTimeouts = {};
+        if (button.classList.contains('btn-primary')) {
+            button.classList.remove('btn-primary');
+            button.classList.add('btn-outline-primary');
+            countElement.textContent = Math.max(0, currentCount - 1);
+        } else {
+            button.classList.remove('btn-outline-primary');
+            button.classList.add('btn-primary');
+            countElement.textContent = currentCount + 1;
         }
-        
+    },
+    
+    // 대기 중인 반응 토글 (디바운스 후 한 번에 전송)
+    pendingReactionToggles: [],
+    reactionFlushTimeout: null,
+    
+    toggleEmojiReaction: (targetType, targetId, reactionType) => {
         // 즉시 UI 업데이트 (낙관적 업데이트)
-        const button = document.querySelector(
-            targetType === 'post' 
-                ? `[data-post-id="${targetId}"][data-reaction-type="${reactionType}"]`
-                : `[data-comment-id="${targetId}"][data-reaction-type="${reactionType}"]`
-        );
-        
+        const button = utils.findReactionButton(targetType, targetId, reactionType);
         if (button) {
-            button.disabled = true; // 중복 클릭 방지
-            
-            // 현재 상태 확인 및 카운트 요소 찾기
-            const isActive = button.classList.contains('btn-primary');
-            const countElement = button.querySelector('.reaction-count');
-            let currentCount = parseInt(countElement.textContent) || 0;
-            
-            // 버튼 상태 토글 및 카운트 즉시 업데이트
-            if (isActive) {
-                button.classList.remove('btn-primary');
-                button.classList.add('btn-outline-primary');
-                // 활성 상태에서 비활성으로: 카운트 감소
-                countElement.textContent = Math.max(0, currentCount - 1);
-            } else {
-                button.classList.remove('btn-outline-primary');
-                button.classList.add('btn-primary');
-                // 비활성 상태에서 활성으로: 카운트 증가
-                countElement.textContent = currentCount + 1;
-            }
+            utils.flipReactionButton(button);
         }
         
-        utils.reactionTimeouts[key] = setTimeout(async () => {
-            try {
-                const url = targetType === 'post' 
-                    ? `/api/posts/${targetId}/toggle-reaction/`
-                    : `/api/comments/${targetId}/toggle-reaction/`;
-                
-                const response = await fetch(url, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                        'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
-                    },
-                    body: JSON.stringify({
-                        reaction_type: reactionType
-                    })
-                });
-                
-                if (response.ok) {
-                    const result = await response.json();
-                    if (result.success) {
-                        // 카운트 업데이트
-                        const selector = targetType === 'post' 
-                            ? `[data-post-id="${targetId}"][data-reaction-type="${reactionType}"] .reaction-count`
-                            : `[data-comment-id="${targetId}"][data-reaction-type="${reactionType}"] .reaction-count`;
-                        
-                        const countElement = document.querySelector(selector);
-                        if (countElement) {
-                            countElement.textContent = result.count;
-                        }
-                        
-                        // 서버 응답에 따라 버튼 상태 최종 확정
-                        if (button) {
-                            if (result.is_active) {
-                                button.classList.remove('btn-outline-primary');
-                                button.classList.add('btn-primary');
-                            } else {
-                                button.classList.remove('btn-primary');
-                                button.classList.add('btn-outline-primary');
-                            }
-                        }
-                    } else {
-                        // 에러 시 원래 상태로 복원
-                        if (button) {
-                            const isActive = button.classList.contains('btn-primary');
-                            const countElement = button.querySelector('.reaction-count');
-                            let currentCount = parseInt(countElement.textContent) || 0;
-                            
-                            if (isActive) {
-                                button.classList.remove('btn-primary');
-                                button.classList.add('btn-outline-primary');
-                                countElement.textContent = Math.max(0, currentCount - 1);
-                            } else {
-                                button.classList.remove('btn-outline-primary');
-                                button.classList.add('btn-primary');
-                                countElement.textContent = currentCount + 1;
-                            }
-                        }
-                    }
-                }
-            } catch (error) {
-                console.error('Reaction error:', error);
-                // 에러 시 원래 상태로 복원
-                if (button) {
-                    const isActive = button.classList.contains('btn-primary');
-                    const countElement = button.querySelector('.reaction-count');
-                    let currentCount = parseInt(countElement.textContent) || 0;
-                    
-                    if (isActive) {
-                        button.classList.remove('btn-primary');
-                        button.classList.add('btn-outline-primary');
-                        countElement.textContent = Math.max(0, currentCount - 1);
-                    } else {
-                        button.classList.remove('btn-outline-primary');
-                        button.classList.add('btn-primary');
-                        countElement.textContent = currentCount + 1;
-                    }
-                }
-            } finally {
+        utils.pendingReactionToggles.push({
+            target_type: targetType,
+            target_id: targetId,
+            reaction_type: reactionType
+        });
+        
+        clearTimeout(utils.reactionFlushTimeout);
+        utils.reactionFlushTimeout = setTimeout(utils.flushReactionToggles, 400); // 400ms 디바운싱
+    },
+    
+    flushReactionToggles: async () => {
+        const toggles = utils.pendingReactionToggles;
+        utils.pendingReactionToggles = [];
+        if (!toggles.length) return;
+        
+        try {
+            const response = await fetch('/api/reactions/batch/', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': getCookie('csrftoken')
+                },
+                body: JSON.stringify({ toggles: toggles })
+            });
+            
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+            
+            // 서버 응답에 따라 카운트와 버튼 상태 최종 확정
+            utils.applyReactionState('post', result.posts);
+            utils.applyReactionState('comment', result.comments);
+        } catch (error) {
+            console.error('Reaction error:', error);
+            // 에러 시 낙관적 업데이트를 역순으로 되돌림
+            toggles.reverse().forEach(toggle => {
+                const button = utils.findReactionButton(toggle.target_type, toggle.target_id, toggle.reaction_type);
                 if (button) {
-                    button.disabled = false; // 버튼 다시 활성화
+                    utils.flipReactionButton(button);
                 }
-                delete utils.reactionTimeouts[key];
-            }
-        }, 150); // 150ms 디바운싱
+            });
+        }
+    },
+    
+    applyReactionState: (targetType, states) => {
+        Object.entries(states).forEach(([targetId, state]) => {
+            Object.entries(state.counts).forEach(([reactionType, count]) => {
+                const button = utils.findReactionButton(targetType, targetId, reactionType);
+                if (!button) return;
+                
+                button.querySelector('.reaction-count').textContent = count;
+                const isActive = state.reactions.includes(reactionType);
+                button.classList.toggle('btn-primary', isActive);
+                button.classList.toggle('btn-outline-primary', !isActive);
+            });
+        });
     }
 };